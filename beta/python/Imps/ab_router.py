@@ -0,0 +1,214 @@
+import bisect
+import hashlib
+import importlib.util
+import inspect
+import os
+import sys
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+
+import flask
+
+from wsgi_body import ClosingBody
+
+VISITOR_COOKIE = 'portfolio_visitor'
+# Set by ?arm=<name>; overrides the hashed assignment until ?arm=auto
+ARM_COOKIE = 'portfolio_ab_arm'
+METRICS_PATH = '/_ab/metrics'
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir))
+
+# Upper bounds in milliseconds for the latency histogram; the last bucket is open
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, float('inf'))
+
+
+def load_module(path, module_name):
+    """Import the file at ``path`` as a new module named ``module_name``."""
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Dash and Flask resolve their root path through sys.modules
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_portfolio_app(path, module_name):
+    """Import an App.py by path and build its PortfolioApp on a fresh server.
+
+    Every variant's module is called ``App``, so each arm is loaded under a
+    unique module name. Stable apps create their own Flask server.
+    """
+    module = load_module(path, module_name)
+    if 'server' in inspect.signature(module.PortfolioApp).parameters:
+        return module.PortfolioApp(flask.Flask(module_name))
+    return module.PortfolioApp()
+
+
+class ArmMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+        self.latency_ms_total = 0.0
+        self.latency_histogram = [0] * len(LATENCY_BUCKETS_MS)
+        self._lock = threading.Lock()
+
+    def observe(self, status, size, latency_ms):
+        with self._lock:
+            self.requests += 1
+            self.errors += status >= 500
+            self.bytes += size
+            self.latency_ms_total += latency_ms
+            self.latency_histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the histogram bucket holding the given fraction."""
+        target = fraction * self.requests
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.latency_histogram):
+            seen += count
+            if count and seen >= target:
+                return bound
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            requests = self.requests or 1
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'error_rate': self.errors / requests,
+                'bytes': self.bytes,
+                'avg_bytes': self.bytes / requests,
+                'avg_latency_ms': self.latency_ms_total / requests,
+                'p50_latency_ms': self.percentile(0.5),
+                'p95_latency_ms': self.percentile(0.95),
+                'latency_histogram': dict(zip(map(str, LATENCY_BUCKETS_MS), self.latency_histogram))
+            }
+
+
+class ABRouter:
+    """WSGI middleware splitting visitors between app arms.
+
+    A visitor id cookie is hashed with ``salt`` into [0, 1) and mapped onto
+    the cumulative arm weights, so a visitor stays on one arm for every
+    request, including Dash's layout and callback requests. ``?arm=<name>``
+    forces an arm for testing; it is remembered in a cookie so the requests
+    the page goes on to make stay on that arm, and ``?arm=auto`` clears it.
+    Requests not claimed by an arm fall through
+    to ``fallback`` (the router's own Flask app).
+    """
+
+    def __init__(self, fallback, arms, weights=None, salt='portfolio-ab'):
+        self.fallback = fallback
+        self.arms = arms
+        self.salt = salt
+        self.metrics = {name: ArmMetrics() for name in arms}
+        self.set_weights(weights or {name: 1 for name in arms})
+
+    def set_weights(self, weights):
+        """Split new visitors by ``weights``, e.g. {'stable': 90, 'beta': 10}; arms left out get none."""
+        unknown = sorted(set(weights) - set(self.arms))
+        if unknown:
+            raise ValueError(f'weights for unknown arms: {", ".join(unknown)}')
+        negative = sorted(name for name, weight in weights.items() if weight < 0)
+        if negative:
+            raise ValueError(f'arm weights must not be negative: {", ".join(negative)}')
+        total = float(sum(weights.values()))
+        if total <= 0:
+            raise ValueError('at least one arm needs a positive weight')
+        self.weights = {name: weights.get(name, 0) / total for name in self.arms}
+        self._bounds = []
+        cumulative = 0.0
+        for name in self.arms:
+            cumulative += self.weights[name]
+            self._bounds.append((cumulative, name))
+
+    def assign(self, visitor):
+        digest = hashlib.sha256(f'{self.salt}:{visitor}'.encode('utf-8')).digest()
+        point = int.from_bytes(digest[:8], 'big') / 2 ** 64
+        for bound, name in self._bounds:
+            if point < bound:
+                return name
+        return self._bounds[-1][1]
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO', '').startswith('/_ab/'):
+            return self.fallback(environ, start_response)
+
+        cookies = SimpleCookie(environ.get('HTTP_COOKIE', ''))
+        visitor = cookies[VISITOR_COOKIE].value if VISITOR_COOKIE in cookies else None
+        new_visitor = visitor is None
+        if new_visitor:
+            visitor = uuid.uuid4().hex
+
+        forced = parse_qs(environ.get('QUERY_STRING', '')).get('arm', [None])[0]
+        remembered = cookies[ARM_COOKIE].value if ARM_COOKIE in cookies else None
+        arm_cookie = None
+        if forced in self.arms:
+            arm = forced
+            if forced != remembered:
+                arm_cookie = f'{ARM_COOKIE}={forced}; Path=/; SameSite=Lax'
+        elif forced == 'auto' or (remembered is not None and remembered not in self.arms):
+            arm = self.assign(visitor)
+            arm_cookie = f'{ARM_COOKIE}=; Max-Age=0; Path=/; SameSite=Lax'
+        else:
+            arm = remembered if remembered is not None else self.assign(visitor)
+        environ['portfolio.arm'] = arm
+
+        started = time.perf_counter()
+        status_holder = []
+
+        def arm_start_response(status, headers, exc_info=None):
+            status_holder.append(int(status.split(' ', 1)[0]))
+            headers = list(headers) + [('X-Portfolio-Arm', arm)]
+            if new_visitor:
+                headers.append(('Set-Cookie', f'{VISITOR_COOKIE}={visitor}; Max-Age=31536000; Path=/; SameSite=Lax'))
+            if arm_cookie is not None:
+                headers.append(('Set-Cookie', arm_cookie))
+            return start_response(status, headers, exc_info)
+
+        try:
+            body = self.arms[arm](environ, arm_start_response)
+        except Exception:
+            self.metrics[arm].observe(500, 0, (time.perf_counter() - started) * 1000.0)
+            raise
+        return ClosingBody(body, lambda size: self.metrics[arm].observe(
+            status_holder[0] if status_holder else 500, size, (time.perf_counter() - started) * 1000.0
+        ))
+
+
+def create_ab_server(variant, weights=None, salt='portfolio-ab'):
+    """One Flask server routing visitors between stable/ and beta/ of a variant.
+
+    gunicorn 'ab_router:create_ab_server("No.1", {"stable": 90, "beta": 10})'
+    """
+    arms = {}
+    for arm in ('stable', 'beta'):
+        path = os.path.join(REPO_ROOT, arm, 'python', variant, 'App.py')
+        portfolio_app = load_portfolio_app(path, f'{arm}_{variant.replace(".", "_")}_App')
+        arms[arm] = portfolio_app.app.server.wsgi_app
+
+    server = flask.Flask(__name__)
+    router = ABRouter(server.wsgi_app, arms, weights, salt)
+    server.wsgi_app = router
+    server.extensions['ab_router'] = router
+
+    @server.route(METRICS_PATH)
+    def ab_metrics():
+        return flask.jsonify({
+            'variant': variant,
+            'weights': router.weights,
+            'arms': {name: metrics.snapshot() for name, metrics in router.metrics.items()}
+        })
+
+    return server
+
+
+if __name__ == '__main__':
+    # python ab_router.py No.1 [beta_weight_percent]
+    beta_weight = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    create_ab_server(sys.argv[1], {'stable': 100 - beta_weight, 'beta': beta_weight}).run(port=8050)
@@ -0,0 +1,211 @@
+import atexit
+import collections
+import json
+import os
+import threading
+import time
+
+import flask
+
+from readiness import WARMUP_HEADER
+from tracing import add_event
+from wsgi_body import ClosingBody
+
+ENVIRON_KEY = 'portfolio.access'
+CACHE_ENVIRON_KEY = 'portfolio.cache'
+
+DASH_UPDATE_PATH = '/_dash-update-component'
+
+
+def note_cache(name, hit):
+    """Record a cache lookup in the access log entry and trace of the current request."""
+    add_event('cache.' + name, hit=hit)
+    if flask.has_request_context():
+        flask.request.environ.setdefault(CACHE_ENVIRON_KEY, {})[name] = 'hit' if hit else 'miss'
+
+
+class AccessLog:
+    """JSON-lines access log written off the request path.
+
+    WSGI middleware around the Flask app times each request from entry to
+    the close of its body, and Flask hooks add the URL rule, the Dash
+    callback output and the cache lookups components noted with
+    ``note_cache``. Latency is split into ``pre_ms`` (WSGI entry to the
+    first before_request hook), ``handler_ms`` (hooks and view),
+    ``post_ms`` (to start_response) and ``send_ms`` (body iteration).
+
+    Records go into a bounded deque; a background thread writes them and
+    rotates the file once it reaches ``max_bytes``, keeping ``backups`` old
+    files. Workers sharing a file notice a rotation by another worker and
+    reopen.
+    """
+
+    def __init__(self, path=None, max_bytes=10 * 1024 * 1024, backups=5, capacity=10000, flush_interval=0.5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.variant = None
+        self.dropped = 0
+        self._buffer = collections.deque(maxlen=capacity)
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+        self._handle = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._flush_at_exit = False
+
+    def init_app(self, portfolio_app, variant):
+        server = portfolio_app.app.server
+        self.variant = variant
+        if self.path is None:
+            os.makedirs(os.path.join(server.instance_path, 'logs'), exist_ok=True)
+            self.path = os.path.join(server.instance_path, 'logs', 'access.jsonl')
+
+        server.extensions['access_log'] = self
+        server.wsgi_app = self.wrap(server.wsgi_app)
+        server.before_request(self._enter_handler)
+        server.after_request(self._leave_handler)
+        if not self._flush_at_exit:
+            # init_app runs again for every reloaded generation; flush once at exit
+            atexit.register(self.flush)
+            self._flush_at_exit = True
+
+    def wrap(self, wsgi_app):
+        def logged_app(environ, start_response):
+            entry = environ[ENVIRON_KEY] = {'started': time.perf_counter()}
+
+            def logged_start_response(status, headers, exc_info=None):
+                entry['status'] = int(status.split(' ', 1)[0])
+                entry['responded'] = time.perf_counter()
+                return start_response(status, headers, exc_info)
+
+            try:
+                body = wsgi_app(environ, logged_start_response)
+            except Exception:
+                entry.setdefault('status', 500)
+                self._finish(environ, 0)
+                raise
+            return ClosingBody(body, lambda size: self._finish(environ, size))
+        return logged_app
+
+    def record(self, entry):
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(entry)
+        self._ensure_worker()
+
+    def flush(self):
+        lines = []
+        buffer = self._buffer
+        while buffer:
+            try:
+                lines.append(json.dumps(buffer.popleft(), separators=(',', ':')))
+            except IndexError:
+                break
+        if lines:
+            self._write('\n'.join(lines) + '\n')
+
+    def _enter_handler(self):
+        entry = flask.request.environ.get(ENVIRON_KEY)
+        if entry is not None:
+            entry['handler'] = time.perf_counter()
+
+    def _leave_handler(self, response):
+        request = flask.request
+        entry = request.environ.get(ENVIRON_KEY)
+        if entry is None:
+            return response
+        entry['handled'] = time.perf_counter()
+        entry['route'] = request.url_rule.rule if request.url_rule is not None else None
+        if request.path == DASH_UPDATE_PATH:
+            body = request.get_json(silent=True) or {}
+            entry['output'] = body.get('output')
+        return response
+
+    def _finish(self, environ, size):
+        entry = environ[ENVIRON_KEY]
+        if environ.get('HTTP_' + WARMUP_HEADER.upper().replace('-', '_')):
+            return
+        finished = time.perf_counter()
+        started = entry['started']
+        handler = entry.get('handler', started)
+        handled = entry.get('handled', handler)
+        responded = entry.get('responded', finished)
+        self.record({
+            'ts': round(time.time(), 3),
+            'variant': self.variant,
+            'arm': environ.get('portfolio.arm'),
+            'method': environ.get('REQUEST_METHOD'),
+            'path': environ.get('PATH_INFO'),
+            'route': entry.get('route'),
+            'output': entry.get('output'),
+            'status': entry.get('status', 500),
+            'bytes': size,
+            'cache': environ.get(CACHE_ENVIRON_KEY, {}),
+            'pre_ms': _ms(handler - started),
+            'handler_ms': _ms(handled - handler),
+            'post_ms': _ms(responded - handled),
+            'send_ms': _ms(finished - responded),
+            'total_ms': _ms(finished - started)
+        })
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        if self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            # Threads do not survive a fork, so each gunicorn worker starts its own
+            if self._worker_pid != pid or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='access-log-writer', daemon=True)
+                self._worker_pid = pid
+                self._handle = None
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except OSError:
+                # Keep the writer alive; a full disk or a vanished directory may recover
+                self._handle = None
+
+    def _write(self, text):
+        with self._write_lock:
+            handle = self._open()
+            handle.write(text)
+            handle.flush()
+            if handle.tell() >= self.max_bytes:
+                self._rotate()
+
+    def _open(self):
+        handle = self._handle
+        if handle is not None:
+            try:
+                rotated = os.stat(self.path).st_ino != os.fstat(handle.fileno()).st_ino
+            except FileNotFoundError:
+                rotated = True
+            if not rotated:
+                return handle
+            handle.close()
+        self._handle = open(self.path, 'a', encoding='utf-8')
+        return self._handle
+
+    def _rotate(self):
+        self._handle.close()
+        self._handle = None
+        for index in range(self.backups - 1, 0, -1):
+            source = f'{self.path}.{index}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.path}.{index + 1}')
+        if self.backups:
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+
+
+def _ms(seconds):
+    return round(seconds * 1000.0, 3)
@@ -0,0 +1,357 @@
+import atexit
+import collections
+import contextlib
+import hmac
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass, astuple
+from urllib.parse import urlsplit
+
+import flask
+import numpy as np
+import pandas as pd
+from dash import html
+
+DASH_UPDATE_PATH = '/_dash-update-component'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS page_views (
+    ts REAL NOT NULL,
+    variant TEXT NOT NULL,
+    route TEXT NOT NULL,
+    referrer TEXT NOT NULL,
+    source TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    duration_ms REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    views INTEGER NOT NULL,
+    total_ms REAL NOT NULL,
+    PRIMARY KEY (dimension, key, variant)
+);
+'''
+
+UPSERT_ROLLUP = '''
+INSERT INTO rollups (dimension, key, variant, views, total_ms) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (dimension, key, variant) DO UPDATE SET
+    views = views + excluded.views,
+    total_ms = total_ms + excluded.total_ms
+'''
+
+# Rollup dimensions; "hour" keys are epoch hours so the table grows by 24 rows a day
+DIMENSIONS = ('route', 'hour', 'referrer')
+
+DASHBOARD_TTL = 5.0
+
+# Operational JSON from every component: compression, mail, spam, blog, ...
+STATS_PREFIX = '/_stats/'
+
+
+@dataclass
+class PageView:
+    ts: float
+    variant: str
+    route: str
+    referrer: str
+    source: str  # "server" for full page loads, "location" for dcc.Location changes
+    status: int
+    duration_ms: float
+
+
+class PageViewRecorder:
+    """Records page views into an in-memory ring buffer.
+
+    The request path only appends to a bounded deque; a background thread
+    drains it and writes batches to SQLite, so recording never touches disk
+    while a request is being served.
+    """
+
+    def __init__(self, db_path=None, capacity=10000, batch_size=500, flush_interval=1.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.variant = None
+        self.dropped = 0
+        self._buffer = collections.deque(maxlen=capacity)
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        self._dashboard = None
+        self._dashboard_expires = 0.0
+        self._flush_at_exit = False
+
+    def init_app(self, portfolio_app, variant):
+        server = portfolio_app.app.server
+        self.variant = variant
+        if self.db_path is None:
+            os.makedirs(server.instance_path, exist_ok=True)
+            self.db_path = os.path.join(server.instance_path, 'analytics.sqlite3')
+
+        server.extensions['page_views'] = self
+        server.before_request(self._start_timer)
+        server.after_request(self._record_response)
+        if not self._flush_at_exit:
+            # init_app runs again for every reloaded generation; flush once at exit
+            atexit.register(self.flush)
+            self._flush_at_exit = True
+
+    def record(self, view):
+        # deque.append is atomic under the GIL; a full buffer drops the oldest view
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(view)
+        self._ensure_worker()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        batch = self._drain()
+        while batch:
+            self._write(batch)
+            batch = self._drain()
+
+    def dashboard(self):
+        """Traffic by route, variant, hour and referrer, read from the rollups."""
+        now = time.monotonic()
+        if self._dashboard is None or now >= self._dashboard_expires:
+            with contextlib.closing(self._connect()) as conn:
+                rollups = pd.read_sql_query('SELECT * FROM rollups', conn)
+            self._dashboard = _render_dashboard(rollups)
+            self._dashboard_expires = now + DASHBOARD_TTL
+        return self._dashboard
+
+    def rebuild_rollups(self, chunksize=1000000):
+        """Recompute the rollups from the raw page_views table."""
+        with contextlib.closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM rollups')
+            for chunk in pd.read_sql_query('SELECT * FROM page_views', conn, chunksize=chunksize):
+                conn.executemany(UPSERT_ROLLUP, _aggregate(chunk))
+
+    def _start_timer(self):
+        flask.g.page_view_started = time.perf_counter()
+
+    def _record_response(self, response):
+        started = flask.g.pop('page_view_started', None)
+        if started is None or flask.request.headers.get('X-Portfolio-Warmup'):
+            return response
+
+        source, route = self._classify(response)
+        if route is not None:
+            self.record(PageView(
+                ts=time.time(),
+                variant=self.variant,
+                route=route,
+                referrer=_referrer_host(flask.request.referrer),
+                source=source,
+                status=response.status_code,
+                duration_ms=(time.perf_counter() - started) * 1000.0
+            ))
+        return response
+
+    def _classify(self, response):
+        request = flask.request
+        if 'page_view_route' in flask.g:
+            # Set by components serving navigation outside the Dash callback path
+            return 'location', flask.g.page_view_route
+        if request.path == DASH_UPDATE_PATH:
+            body = request.get_json(silent=True) or {}
+            # The initial render also runs display_page; only count navigation
+            if 'url.pathname' not in body.get('changedPropIds', ()):
+                return None, None
+            for item in body.get('inputs', ()):
+                if isinstance(item, dict) and item.get('id') == 'url' and item.get('property') == 'pathname':
+                    return 'location', item.get('value') or '/'
+            return None, None
+        status = response.status_code
+        if request.method == 'GET' and response.mimetype == 'text/html' and (status < 300 or status == 304):
+            return 'server', request.path
+        return None, None
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        if self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            # Threads do not survive a fork, so each gunicorn worker starts its own
+            if self._worker_pid != pid or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='page-view-flusher', daemon=True)
+                self._worker_pid = pid
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error:
+                # Keep the flusher alive; the next interval retries with new events
+                pass
+
+    def _drain(self):
+        batch = []
+        buffer = self._buffer
+        while buffer and len(batch) < self.batch_size:
+            try:
+                batch.append(buffer.popleft())
+            except IndexError:
+                break
+        return batch
+
+    def _write(self, batch):
+        with contextlib.closing(self._connect()) as conn, conn:
+            conn.executemany(
+                'INSERT INTO page_views VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [astuple(view) for view in batch]
+            )
+            frame = pd.DataFrame.from_records(
+                [astuple(view) for view in batch], columns=list(PageView.__dataclass_fields__)
+            )
+            conn.executemany(UPSERT_ROLLUP, _aggregate(frame))
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        return conn
+
+
+class StatsAccess:
+    """Keeps /analytics and the /_stats/* endpoints private.
+
+    Both answer 404 unless server.config has a STATS_TOKEN
+    (PORTFOLIO_STATS_TOKEN). With one, a request gets in by sending the
+    token as a Bearer token, for scripts, or as the basic-auth password, so
+    a browser asks for it once and sends it on the page's own payload and
+    callback requests; anything else gets a 401 challenge. Register it
+    before the components that answer requests in before_request hooks.
+    """
+
+    def __init__(self, pages=('/analytics',)):
+        self.pages = frozenset(pages)
+        self.refused = 0
+
+    def init_app(self, portfolio_app):
+        server = portfolio_app.app.server
+        server.extensions['stats_access'] = self
+        server.before_request(self._guard)
+
+    def allowed(self):
+        """Whether the current request carries the configured STATS_TOKEN."""
+        token = flask.current_app.config.get('STATS_TOKEN')
+        auth = flask.request.authorization
+        if not token or auth is None:
+            return False
+        supplied = auth.token if auth.type == 'bearer' else auth.password
+        return hmac.compare_digest(str(supplied or '').encode('utf-8'), str(token).encode('utf-8'))
+
+    def _guard(self):
+        request = flask.request
+        name = (request.view_args or {}).get('name') if request.endpoint == 'route_payload' else None
+        if not (request.path in self.pages or request.path.startswith(STATS_PREFIX)
+                or (name is not None and '/' + name in self.pages)):
+            return None
+        if not flask.current_app.config.get('STATS_TOKEN'):
+            flask.abort(404)
+        if self.allowed():
+            return None
+        self.refused += 1
+        response = flask.Response('Authentication required.\n', 401, mimetype='text/plain')
+        response.headers['WWW-Authenticate'] = 'Basic realm="portfolio stats"'
+        response.cache_control.no_store = True
+        return response
+
+
+def analytics_page():
+    """/analytics for a PortfolioApp's routes: the dashboard, for requests StatsAccess lets in."""
+    page_views = flask.current_app.extensions.get('page_views')
+    access = flask.current_app.extensions.get('stats_access')
+    if page_views is None or access is None or not access.allowed():
+        return html.Div("Analytics are not enabled on this server.", className="text-center text-gray-500 py-20")
+    return page_views.dashboard()
+
+
+def _referrer_host(referrer):
+    if not referrer:
+        return ''
+    return urlsplit(referrer).netloc
+
+
+def _aggregate(frame):
+    """Group a batch of raw views into rollup rows with vectorized pandas ops."""
+    frame = frame.assign(hour=(frame['ts'].to_numpy() // 3600).astype(np.int64).astype(str))
+    rows = []
+    for dimension in DIMENSIONS:
+        grouped = frame.groupby([dimension, 'variant'], sort=False).agg(
+            views=('ts', 'size'), total_ms=('duration_ms', 'sum')
+        ).reset_index()
+        rows.extend(zip(
+            [dimension] * len(grouped),
+            grouped[dimension].astype(str),
+            grouped['variant'],
+            grouped['views'].astype(int).tolist(),
+            grouped['total_ms'].astype(float).tolist()
+        ))
+    return rows
+
+
+def _summarize(rollups, dimension, by='key', limit=None):
+    subset = rollups[rollups['dimension'] == dimension]
+    summary = subset.groupby(by, sort=False)[['views', 'total_ms']].sum()
+    summary['avg_ms'] = summary['total_ms'] / summary['views'].clip(lower=1)
+    summary = summary.sort_values('views', ascending=False)
+    return summary.head(limit) if limit else summary
+
+
+def _render_dashboard(rollups):
+    hours = _summarize(rollups, 'hour').sort_index(key=lambda index: index.astype(np.int64)).tail(24)
+    hours.index = pd.to_datetime(hours.index.astype(np.int64) * 3600, unit='s').strftime('%Y-%m-%d %H:00')
+    referrers = _summarize(rollups, 'referrer', limit=10)
+    referrers.index = referrers.index.where(referrers.index != '', '(direct)')
+
+    return html.Div([
+        html.H2("Analytics", className="text-4xl font-bold text-center mb-12"),
+        html.P(f"{int(rollups.loc[rollups['dimension'] == 'route', 'views'].sum())} page views recorded",
+               className="text-center text-gray-500 mb-8"),
+        html.Div([
+            _summary_table("Traffic by route", "Route", _summarize(rollups, 'route')),
+            _summary_table("Traffic by variant", "Variant", _summarize(rollups, 'route', by='variant')),
+            _summary_table("Traffic by hour (last 24)", "Hour (UTC)", hours),
+            _summary_table("Top referrers", "Referrer", referrers)
+        ], className="grid md:grid-cols-2 gap-8")
+    ], className="container mx-auto py-20")
+
+
+def _summary_table(title, label, summary):
+    return html.Div([
+        html.H3(title, className="text-2xl font-bold mb-4"),
+        html.Table([
+            html.Thead(html.Tr([
+                html.Th(label, className="text-left pr-4"),
+                html.Th("Views", className="text-right pr-4"),
+                html.Th("Avg ms", className="text-right")
+            ])),
+            html.Tbody([
+                html.Tr([
+                    html.Td(str(key), className="pr-4"),
+                    html.Td(f"{int(row.views)}", className="text-right pr-4"),
+                    html.Td(f"{row.avg_ms:.1f}", className="text-right")
+                ]) for key, row in summary.iterrows()
+            ])
+        ], className="w-full text-sm")
+    ], className="p-6 border border-gray-200 rounded-lg")
+
+
+if __name__ == '__main__':
+    # python analytics.py rebuild-rollups instance/analytics.sqlite3
+    if len(sys.argv) == 3 and sys.argv[1] == 'rebuild-rollups':
+        PageViewRecorder(db_path=sys.argv[2]).rebuild_rollups()
+    else:
+        sys.exit('usage: python analytics.py rebuild-rollups <db_path>')
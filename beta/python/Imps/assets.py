@@ -0,0 +1,196 @@
+"""Vendored, content-hashed CSS, JS and fonts served with immutable caching.
+
+    python assets.py vendor              # every beta variant
+    python assets.py vendor ../No.6      # only this variant's assets
+
+``vendor`` downloads each variant's external stylesheets and scripts, and
+the fonts and images those stylesheets reference, into vendor/ next to
+this file. Every file is renamed to ``<name>.<hash>.<ext>``; stylesheet
+``url()`` references are rewritten to the hashed names first, so a font
+change also changes the stylesheet's hash. vendor/manifest.json maps each
+original URL to its hashed file. Each run rebuilds the manifest from the
+URLs it was given and deletes files nothing points at any more, so a CDN
+link removed from an App.py stops being vendored.
+
+The Docker image runs ``vendor`` at build time; vendor/ is not committed.
+Without it, the site falls back to the CDN URLs.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import urllib.request
+from urllib.parse import urljoin, urlsplit
+
+import flask
+
+from ab_router import load_portfolio_app
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+VENDOR_DIR = os.path.join(HERE, 'vendor')
+MANIFEST_NAME = 'manifest.json'
+
+CSS_URL_PATTERN = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+COMPONENT_SUITES_PATH = '_dash-component-suites/'
+
+
+def hashed_name(url, data):
+    """``all.min.css`` -> ``all.min.3f2a1b9c0d1e.css`` for the given content."""
+    base = os.path.basename(urlsplit(url).path) or 'index'
+    stem, ext = os.path.splitext(base)
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+
+
+class AssetManifest:
+    """Points external_stylesheets and external_scripts at vendored copies.
+
+    Entries found in vendor/manifest.json are rewritten to
+    ``/_assets/<name>.<hash>.<ext>``, served from this process with
+    ``public, max-age=31536000, immutable``; the content hash in the name
+    is the cache buster, so returning visitors revalidate nothing and a
+    deploy only changes the URLs of files that changed. Entries that were
+    never vendored keep their CDN URL. Dash's fingerprinted component
+    bundles get ``immutable`` added to the year-long max-age Dash sets.
+    """
+
+    def __init__(self, vendor_dir=VENDOR_DIR, url_prefix='/_assets/', max_age=31536000):
+        self.vendor_dir = vendor_dir
+        self.url_prefix = url_prefix
+        self.max_age = max_age
+        self.manifest = {}
+        self._files = frozenset()
+        self._suites_prefix = None
+
+    def init_app(self, portfolio_app):
+        dash_app = portfolio_app.app
+        server = dash_app.server
+        manifest_path = os.path.join(self.vendor_dir, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as handle:
+                self.manifest = json.load(handle)
+        self._files = frozenset(self.manifest.values())
+
+        # Rewritten in place before anything renders the index shell
+        config = dash_app.config
+        config.external_stylesheets[:] = [self._rewrite(item, 'href') for item in config.external_stylesheets]
+        config.external_scripts[:] = [self._rewrite(item, 'src') for item in config.external_scripts]
+        self._suites_prefix = config.requests_pathname_prefix + COMPONENT_SUITES_PATH
+
+        server.extensions['assets'] = self
+        server.add_url_rule(self.url_prefix + '<path:filename>', 'vendored_asset', self.serve)
+        server.after_request(self._immutable_component_suites)
+
+    def url(self, original):
+        name = self.manifest.get(original)
+        return self.url_prefix + name if name else original
+
+    def serve(self, filename):
+        if filename not in self._files:
+            flask.abort(404)
+        response = flask.send_from_directory(self.vendor_dir, filename, max_age=self.max_age)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    def _rewrite(self, item, key):
+        if not isinstance(item, dict):
+            return self.url(item)
+        url = self.url(item[key])
+        if url == item[key]:
+            return item
+        # An SRI hash or crossorigin attribute belongs to the CDN copy
+        rewritten = {name: value for name, value in item.items() if name not in ('integrity', 'crossorigin')}
+        rewritten[key] = url
+        return rewritten
+
+    def _immutable_component_suites(self, response):
+        if (flask.request.path.startswith(self._suites_prefix)
+                and response.cache_control.max_age == self.max_age):
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+        return response
+
+
+def vendor(urls, vendor_dir=VENDOR_DIR, timeout=30.0):
+    """Download ``urls`` and what their stylesheets reference; returns the new manifest.
+
+    The manifest covers exactly ``urls``; entries and files from earlier
+    runs that are not among them are dropped.
+    """
+    os.makedirs(vendor_dir, exist_ok=True)
+    manifest_path = os.path.join(vendor_dir, MANIFEST_NAME)
+    manifest = {}
+
+    def fetch(url):
+        request = urllib.request.Request(url, headers={'User-Agent': 'portfolio-asset-vendor'})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read()
+
+    def store(url, data):
+        name = hashed_name(url, data)
+        path = os.path.join(vendor_dir, name)
+        if not os.path.exists(path):
+            with open(path + '.tmp', 'wb') as handle:
+                handle.write(data)
+            os.replace(path + '.tmp', path)
+        manifest[url] = name
+        return name
+
+    for url in urls:
+        data = fetch(url)
+        if urlsplit(url).path.endswith('.css'):
+            css = data.decode('utf-8')
+            referenced = {}
+            for _, reference in CSS_URL_PATTERN.findall(css):
+                if reference.startswith(('data:', '#')) or reference in referenced:
+                    continue
+                absolute = urljoin(url, reference)
+                # Query strings and fragments are cache busters and font hints
+                clean = absolute.split('#')[0].split('?')[0]
+                referenced[reference] = manifest.get(clean) or store(clean, fetch(absolute))
+            # All vendored files live in one flat directory, so bare names resolve
+            css = CSS_URL_PATTERN.sub(
+                lambda match: f'url({match.group(1)}{referenced.get(match.group(2), match.group(2))}{match.group(1)})',
+                css
+            )
+            data = css.encode('utf-8')
+        store(url, data)
+
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    # Files no manifest entry points at are left over from older versions
+    live = set(manifest.values()) | {MANIFEST_NAME}
+    for path in glob.glob(os.path.join(vendor_dir, '*')):
+        if os.path.basename(path) not in live:
+            os.remove(path)
+    return manifest
+
+
+def external_urls(variant_dir):
+    name = os.path.basename(os.path.abspath(variant_dir)).replace('.', '_')
+    config = load_portfolio_app(os.path.join(variant_dir, 'App.py'), f'vendor_{name}_App').app.config
+    urls = []
+    for item, key in [(item, 'href') for item in config.external_stylesheets] + \
+            [(item, 'src') for item in config.external_scripts]:
+        url = item[key] if isinstance(item, dict) else item
+        if urlsplit(url).netloc:
+            urls.append(url)
+    return urls
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 2 and sys.argv[1] == 'vendor':
+        variants = sys.argv[2:] or sorted(glob.glob(os.path.join(HERE, os.pardir, 'No.*')))
+        wanted = []
+        for variant in variants:
+            wanted += [url for url in external_urls(variant) if url not in wanted]
+        for url, name in sorted(vendor(wanted).items()):
+            print(f'{name}  <-  {url}')
+    else:
+        sys.exit('usage: python assets.py vendor [variant_dir ...]')
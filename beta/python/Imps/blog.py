@@ -0,0 +1,369 @@
+import datetime
+import functools
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import flask
+from dash import html
+from markdown_it import MarkdownIt
+from markdown_it.tree import SyntaxTreeNode
+
+from tracing import traced
+from version import route_providers
+
+PREFIX = '/blog/'
+LISTING_PATH = '/blog'
+PAGE_SIZE = 10
+SUMMARY_LENGTH = 200
+
+# 2024-05-01-my-post.md -> date 2024-05-01, slug my-post
+FILENAME_PATTERN = re.compile(r'^(?:(\d{4}-\d{2}-\d{2})-)?(.+)\.md$')
+FRONT_MATTER_PATTERN = re.compile(r'\A---\s*\n(.*?)\n---\s*(?:\n|\Z)', re.DOTALL)
+
+# Raw HTML in a post is shown as text, so the component tree below is the
+# whole of what a post can put on the page
+MARKDOWN = MarkdownIt('commonmark', {'html': False}).enable(['table', 'strikethrough'])
+
+# Markdown elements and the components they become; anything else is dropped
+TAGS = {
+    'p': html.P, 'h1': html.H1, 'h2': html.H2, 'h3': html.H3, 'h4': html.H4, 'h5': html.H5, 'h6': html.H6,
+    'ul': html.Ul, 'ol': html.Ol, 'li': html.Li, 'blockquote': html.Blockquote, 'hr': html.Hr,
+    'em': html.Em, 'strong': html.Strong, 's': html.S, 'table': html.Table, 'thead': html.Thead,
+    'tbody': html.Tbody, 'tr': html.Tr, 'th': html.Th, 'td': html.Td
+}
+CLASS_NAMES = {
+    'h1': 'text-3xl font-bold mt-8 mb-4', 'h2': 'text-2xl font-bold mt-8 mb-4', 'h3': 'text-xl font-bold mt-6 mb-3',
+    'p': 'mb-4 leading-relaxed', 'ul': 'list-disc pl-6 mb-4', 'ol': 'list-decimal pl-6 mb-4',
+    'blockquote': 'border-l-4 border-gray-300 pl-4 italic text-gray-600 mb-4', 'hr': 'my-8',
+    'table': 'table-auto mb-4', 'th': 'px-3 py-1 border', 'td': 'px-3 py-1 border',
+    'a': 'text-blue-600 underline', 'pre': 'bg-gray-100 rounded p-4 mb-4 overflow-x-auto text-sm',
+    'code': 'bg-gray-100 rounded px-1'
+}
+LINK_SCHEMES = {'', 'http', 'https', 'mailto'}
+IMAGE_SCHEMES = {'', 'http', 'https'}
+
+
+@dataclass(frozen=True)
+class Post:
+    slug: str
+    title: str
+    date: datetime.date
+    summary: str
+    body: list
+    digest: str
+
+    @property
+    def path(self):
+        return PREFIX + self.slug
+
+
+def slugify(text):
+    """Lower-case letters, digits and single hyphens; also safe in payload names."""
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+def parse_post(filename, text, digest):
+    """Compile one Markdown file with optional ``key: value`` front matter."""
+    match = FILENAME_PATTERN.match(filename)
+    file_date, stem = match.groups() if match else (None, filename)
+    fields = {}
+    front_matter = FRONT_MATTER_PATTERN.match(text)
+    if front_matter:
+        for line in front_matter.group(1).splitlines():
+            key, sep, value = line.partition(':')
+            if sep:
+                fields[key.strip().lower()] = value.strip().strip('"\'')
+        text = text[front_matter.end():]
+    if fields.get('draft', '').lower() in ('true', 'yes'):
+        return None
+
+    tree = SyntaxTreeNode(MARKDOWN.parse(text))
+    nodes = tree.children
+    title = fields.get('title')
+    if not title and nodes and nodes[0].tag == 'h1':
+        # A leading "# Title" is the post title, not part of the body
+        title, nodes = _text(nodes[0]).strip(), nodes[1:]
+    return Post(
+        slug=slugify(fields.get('slug') or stem) or digest[:12],
+        title=title or stem.replace('-', ' ').capitalize(),
+        date=_date(fields.get('date')) or _date(file_date) or datetime.date.min,
+        summary=fields.get('summary') or _shorten(_first_text(tree, 'paragraph')),
+        body=_components(nodes),
+        digest=digest
+    )
+
+
+class PostCache:
+    """Compiled posts keyed by filename and SHA-256, shared by every generation of the app.
+
+    A file is only read when its mtime or size changed, and only parsed when
+    its hash is new, so a content reload rebuilds just the edited posts.
+    One cache serves one posts directory.
+    """
+
+    def __init__(self):
+        self.parsed = 0
+        self._stats = {}
+        self._posts = {}
+        self._lock = threading.Lock()
+
+    def load(self, posts_dir):
+        """Compiled posts for every Markdown file in ``posts_dir``, by filename."""
+        try:
+            entries = sorted((entry for entry in os.scandir(posts_dir) if entry.name.endswith('.md')),
+                             key=lambda entry: entry.name)
+        except FileNotFoundError:
+            entries = []
+        with self._lock:
+            posts, live = {}, set()
+            for entry in entries:
+                stat = entry.stat()
+                signature = (stat.st_mtime_ns, stat.st_size)
+                known = self._stats.get(entry.path)
+                data = None
+                if known is not None and known[0] == signature:
+                    digest = known[1]
+                else:
+                    with open(entry.path, 'rb') as handle:
+                        data = handle.read()
+                    digest = hashlib.sha256(data).hexdigest()
+                    self._stats[entry.path] = (signature, digest)
+                # The filename carries the slug and date, so a rename is a new post
+                key = (entry.name, digest)
+                if key not in self._posts:
+                    if data is None:
+                        with open(entry.path, 'rb') as handle:
+                            data = handle.read()
+                    self.parsed += 1
+                    self._posts[key] = parse_post(entry.name, data.decode('utf-8', 'replace'), digest)
+                live.add(key)
+                if self._posts[key] is not None:
+                    posts[entry.name] = self._posts[key]
+            # Deleted and superseded files are not kept around
+            self._stats = {path: known for path, known in self._stats.items()
+                           if (os.path.basename(path), known[1]) in live}
+            self._posts = {key: post for key, post in self._posts.items() if key in live}
+        return posts
+
+
+class Blog:
+    """Markdown posts from a directory, served at /blog/<slug>.
+
+    Posts are compiled once into Dash component trees by a shared
+    PostCache. The index is sorted newest first when the app is built, and
+    listing pages of ``page_size`` posts (/blog, then /blog/page/2, ...) are
+    built from it once each. Post and listing pages reach the router,
+    prerenderer and sitemap as a route provider; the content reloader
+    watches the directory, so an edit builds a new generation in which only
+    the changed posts are parsed again.
+    """
+
+    prefix = PREFIX
+
+    def __init__(self, posts_dir, cache=None, page_size=PAGE_SIZE):
+        self.posts_dir = posts_dir
+        self.cache = cache if cache is not None else PostCache()
+        self.page_size = page_size
+        self.index = []
+        self._posts = {}
+        self._digest = ''
+        self._site = 'Blog'
+        self._listings = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, portfolio_app):
+        server = portfolio_app.app.server
+        self._site = portfolio_app.app.title
+        self.refresh()
+        server.extensions['blog'] = self
+        route_providers(server).append(self)
+        server.add_url_rule('/_stats/blog', 'blog_stats', self.stats)
+
+    def refresh(self):
+        posts = {}
+        for post in self.cache.load(self.posts_dir).values():
+            # Two files with one slug: the first by filename wins
+            posts.setdefault(post.slug, post)
+        self.index = sorted(posts.values(), key=lambda post: (post.date, post.slug), reverse=True)
+        self._posts = posts
+        self._digest = hashlib.sha256(
+            ''.join(f'{post.slug}:{post.digest}\n' for post in self.index).encode('utf-8')
+        ).hexdigest()
+        self._listings = {}
+
+    def stats(self):
+        return flask.jsonify(posts=len(self.index), pages=self.page_count(), parsed=self.cache.parsed)
+
+    def digest(self):
+        return self._digest
+
+    def page_count(self):
+        return max(1, -(-len(self.index) // self.page_size))
+
+    def public_paths(self):
+        paths = [post.path for post in self.index]
+        paths += [f'{PREFIX}page/{number}' for number in range(2, self.page_count() + 1)]
+        return paths
+
+    def page(self, pathname):
+        """The page callable for a path under /blog/, or None if there is none."""
+        parts = pathname[len(PREFIX):].split('/')
+        if len(parts) == 2 and parts[0] == 'page' and parts[1].isdigit():
+            number = int(parts[1])
+            if 2 <= number <= self.page_count() and parts[1] == str(number):
+                return functools.partial(self.listing, number)
+            return None
+        post = self._posts.get(parts[0]) if len(parts) == 1 else None
+        return functools.partial(self.post_page, post) if post is not None else None
+
+    def meta(self, pathname):
+        post = self._posts.get(pathname[len(PREFIX):])
+        if post is None:
+            return f'Blog | {self._site}', f'Posts by {self._site}.'
+        return f'{post.title} | {self._site}', post.summary
+
+    def listing(self, number=1):
+        """Listing page ``number``: the precomputed index, ``page_size`` posts at a time."""
+        page = self._listings.get(number)
+        if page is None:
+            with self._lock:
+                page = self._listings.get(number)
+                if page is None:
+                    page = self._listings[number] = self._build_listing(number)
+        return page
+
+    @traced('blog.post')
+    def post_page(self, post):
+        return html.Div([
+            html.Article([
+                html.A("← All posts", href=LISTING_PATH, className="text-sm text-gray-500 hover:text-gray-800"),
+                html.H1(post.title, className="text-4xl font-bold mt-4"),
+                html.Time(_format_date(post.date), dateTime=post.date.isoformat(), className="block text-gray-500 mt-2 mb-8"),
+                html.Div(post.body)
+            ], className="max-w-3xl mx-auto")
+        ], className="container mx-auto px-4 py-20")
+
+    @traced('blog.listing')
+    def _build_listing(self, number):
+        start = (number - 1) * self.page_size
+        posts = self.index[start:start + self.page_size]
+        entries = [
+            html.Div([
+                html.A(html.H3(post.title, className="text-2xl font-semibold"), href=post.path,
+                       className="hover:underline"),
+                html.Time(_format_date(post.date), dateTime=post.date.isoformat(), className="block text-sm text-gray-500 mt-1"),
+                html.P(post.summary, className="mt-2 text-gray-700")
+            ], className="mb-10")
+            for post in posts
+        ] or [html.P("No posts yet.", className="text-center text-gray-500")]
+
+        pager = []
+        if number > 1:
+            newer = LISTING_PATH if number == 2 else f'{PREFIX}page/{number - 1}'
+            pager.append(html.A("← Newer posts", href=newer, className="text-blue-600 hover:underline"))
+        if number < self.page_count():
+            pager.append(html.A("Older posts →", href=f'{PREFIX}page/{number + 1}',
+                                className="text-blue-600 hover:underline ml-auto"))
+        return html.Div([
+            html.H2("Blog", className="text-4xl font-bold text-center mb-16"),
+            html.Div(entries, className="max-w-3xl mx-auto"),
+            html.Div(pager, className="max-w-3xl mx-auto flex")
+        ], className="container mx-auto px-4 py-20")
+
+
+def blog_page():
+    """/blog for a PortfolioApp's routes: the listing, when main.py set up a Blog."""
+    blog = flask.current_app.extensions.get('blog')
+    if blog is None:
+        return html.Div("The blog is not enabled on this server.", className="text-center text-gray-500 py-20")
+    return blog.listing()
+
+
+def _components(nodes):
+    out = []
+    for node in nodes:
+        out.extend(_component(node))
+    return out
+
+
+def _component(node):
+    kind = node.type
+    if kind == 'text':
+        return [node.content]
+    if kind == 'softbreak':
+        return ['\n']
+    if kind == 'hardbreak':
+        return [html.Br()]
+    if kind == 'inline' or node.hidden:
+        # Paragraphs of tight list items are not rendered as <p>
+        return _components(node.children)
+    if kind == 'code_inline':
+        return [html.Code(node.content, className=CLASS_NAMES['code'])]
+    if kind in ('fence', 'code_block'):
+        language = slugify(node.info.split()[0]) if kind == 'fence' and node.info.strip() else ''
+        code = html.Code(node.content, className=f'language-{language}' if language else None)
+        return [html.Pre(code, className=CLASS_NAMES['pre'])]
+    if kind == 'link':
+        href = node.attrs.get('href', '')
+        if not _allowed(href, LINK_SCHEMES):
+            return _components(node.children)
+        return [html.A(_components(node.children), href=href, title=node.attrs.get('title'), className=CLASS_NAMES['a'])]
+    if kind == 'image':
+        src = node.attrs.get('src', '')
+        if not _allowed(src, IMAGE_SCHEMES):
+            return []
+        return [html.Img(src=src, alt=_text(node), title=node.attrs.get('title'), className='max-w-full my-4')]
+
+    factory = TAGS.get(node.tag)
+    if factory is None:
+        return _components(node.children)
+    props = {'className': CLASS_NAMES.get(node.tag)}
+    align = re.match(r'text-align:(left|right|center)$', node.attrs.get('style', ''))
+    if align:
+        props['style'] = {'textAlign': align.group(1)}
+    if node.tag == 'ol' and node.attrs.get('start'):
+        props['start'] = node.attrs['start']
+    if node.tag == 'hr':
+        return [factory(**props)]
+    return [factory(_components(node.children), **props)]
+
+
+def _allowed(url, schemes):
+    try:
+        return urlsplit(url).scheme.lower() in schemes
+    except ValueError:
+        return False
+
+
+def _text(node):
+    if node.type in ('text', 'code_inline'):
+        return node.content
+    return ''.join(_text(child) for child in node.children)
+
+
+def _first_text(tree, kind):
+    for node in tree.children:
+        if node.type == kind:
+            return _text(node).strip()
+    return ''
+
+
+def _shorten(text):
+    if len(text) <= SUMMARY_LENGTH:
+        return text
+    return text[:SUMMARY_LENGTH].rsplit(' ', 1)[0] + '…'
+
+
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _format_date(date):
+    return f'{date:%B} {date.day}, {date.year}' if date != datetime.date.min else ''
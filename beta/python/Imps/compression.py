@@ -0,0 +1,193 @@
+import collections
+import gzip
+import threading
+import time
+import zlib
+
+import flask
+
+from access_log import note_cache
+from tracing import span
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Every content coding this module (or a component precompressing with it) sends
+CODINGS = ('br', 'gzip')
+
+
+def encoded_etag(etag, encoding):
+    """The ETag of ``etag``'s representation in ``encoding``, e.g. "abc-gzip"."""
+    return etag if encoding in (None, 'identity') else f'{etag}-{encoding}'
+
+
+def matching_etag(etag, request):
+    """The form of ``etag``, plain or in an accepted encoding, that the request's
+    If-None-Match names, or None."""
+    accepted = request.accept_encodings
+    candidates = (etag,) + tuple(encoded_etag(etag, encoding) for encoding in CODINGS if accepted[encoding])
+    return next((candidate for candidate in candidates if candidate in request.if_none_match), None)
+
+
+class RouteCompressionStats:
+    __slots__ = ('responses', 'compressed', 'cache_hits', 'bytes_in', 'bytes_out', 'seconds')
+
+    def __init__(self):
+        self.responses = self.compressed = self.cache_hits = 0
+        self.bytes_in = self.bytes_out = 0
+        self.seconds = 0.0
+
+    def as_dict(self):
+        return {
+            'responses': self.responses,
+            'compressed': self.compressed,
+            'cache_hits': self.cache_hits,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'ratio': round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+            'compress_ms': round(self.seconds * 1000.0, 3)
+        }
+
+
+class JSONCompressor:
+    """gzip/brotli for the JSON responses Dash sends uncompressed.
+
+    /_dash-update-component, /_dash-layout and the route payloads are full of
+    repeated Tailwind class strings. Responses of at least ``threshold``
+    bytes are compressed with the best encoding the client accepts; brotli
+    is used when the module is installed. A response carrying an ETag is
+    the same bytes for everyone, so its compressed form is kept in an LRU
+    keyed on (ETag, encoding) and cache hits skip compression. The ETag
+    itself gets the encoding as a suffix (``encoded_etag``), since the
+    compressed bytes are a different representation; components answering
+    If-None-Match look it up with ``matching_etag``. Streamed responses are
+    compressed chunk by chunk. Ratios are kept per URL rule.
+    """
+
+    def __init__(self, threshold=1024, gzip_level=6, brotli_quality=4, max_cached=256):
+        self.threshold = threshold
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.max_cached = max_cached
+        self.stats = collections.defaultdict(RouteCompressionStats)
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, portfolio_app):
+        server = portfolio_app.app.server
+        server.extensions['compression'] = self
+        # after_request hooks run in reverse order: registered before the
+        # other components, this one sees their final bodies
+        server.after_request(self._compress)
+        server.add_url_rule('/_stats/compression', 'compression_stats', self.report)
+
+    def report(self):
+        with self._lock:
+            routes = {route: stats.as_dict() for route, stats in self.stats.items()}
+        return flask.jsonify(encodings=self.encodings(), cached=len(self._cache), routes=routes)
+
+    def encodings(self):
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def _compress(self, response):
+        request = flask.request
+        if (response.mimetype != 'application/json' or response.status_code != 200
+                or 'Content-Encoding' in response.headers or response.cache_control.no_transform):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        accepted = request.accept_encodings
+        encoding = next((name for name in self.encodings() if accepted[name]), None)
+        if encoding is None:
+            return response
+
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        etag, weak = response.get_etag()
+        if response.is_streamed:
+            response.response = self._stream(response.response, encoding, rule)
+            response.headers.pop('Content-Length', None)
+            response.headers['Content-Encoding'] = encoding
+            if etag:
+                response.set_etag(encoded_etag(etag, encoding), weak)
+            return response
+
+        data = response.get_data()
+        if len(data) < self.threshold:
+            with self._lock:
+                self.stats[rule].responses += 1
+            return response
+
+        key = (etag, encoding)
+        started = time.perf_counter()
+        body = self._cached(key) if etag else None
+        hit = body is not None
+        if etag:
+            note_cache('compression', hit)
+        if not hit:
+            with span('compression.compress', encoding=encoding, bytes=len(data)):
+                body = self.compress(data, encoding)
+            if etag:
+                self._store(key, body)
+        elapsed = time.perf_counter() - started
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            response.set_etag(encoded_etag(etag, encoding), weak)
+        self._count(rule, len(data), len(body), 0.0 if hit else elapsed, hit)
+        return response
+
+    def _cached(self, key):
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+            return body
+
+    def _store(self, key, body):
+        with self._lock:
+            self._cache[key] = body
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def _count(self, rule, size_in, size_out, seconds, hit):
+        with self._lock:
+            stats = self.stats[rule]
+            stats.responses += 1
+            stats.compressed += 1
+            stats.cache_hits += hit
+            stats.bytes_in += size_in
+            stats.bytes_out += size_out
+            stats.seconds += seconds
+
+    def _stream(self, chunks, encoding, rule):
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            feed, finish = compressor.process, compressor.finish
+        else:
+            # wbits=31 writes a gzip header and trailer
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+            feed, finish = compressor.compress, compressor.flush
+        size_in = size_out = 0
+        seconds = 0.0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            size_in += len(chunk)
+            started = time.perf_counter()
+            out = feed(chunk)
+            seconds += time.perf_counter() - started
+            if out:
+                size_out += len(out)
+                yield out
+        out = finish()
+        size_out += len(out)
+        yield out
+        self._count(rule, size_in, size_out, seconds, False)
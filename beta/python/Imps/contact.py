@@ -0,0 +1,247 @@
+import contextlib
+import os
+import re
+import sqlite3
+import time
+from email.errors import HeaderParseError
+from email.headerregistry import Address
+
+import dash
+from dash.dependencies import Input, Output, State
+from dash.development.base_component import Component
+from dash.exceptions import PreventUpdate
+
+# Element ids a page's contact form must use for ContactForm to wire it up
+NAME_ID = 'contact-name'
+EMAIL_ID = 'contact-email'
+MESSAGE_ID = 'contact-message'
+SUBMIT_ID = 'send-button'
+FEEDBACK_ID = 'contact-feedback'
+STATUS_ID = 'contact-status'
+SUBMISSION_ID = 'contact-submission'
+
+MAX_NAME_LENGTH = 100
+MAX_EMAIL_LENGTH = 254
+MIN_MESSAGE_LENGTH = 10
+MAX_MESSAGE_LENGTH = 2000
+
+# Deliberately loose: one @, no whitespace, a dot in the domain. The server
+# also requires the address to parse as an email header (see validate)
+EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    variant TEXT NOT NULL,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+'''
+
+# Shared by both clientside callbacks; mirrors validate() below. Lengths
+# count code points, as Python's len() does, not UTF-16 units.
+_CLIENTSIDE_RULES = """
+    var length = function(value) { return Array.from(value).length; };
+    var errors = function(name, email, message) {
+        var problems = [];
+        name = (name || '').trim();
+        email = (email || '').trim();
+        message = (message || '').trim();
+        if (!name) { problems.push(['name', 'Please enter your name.']); }
+        else if (length(name) > %(max_name)d) { problems.push(['name', 'Name must be at most %(max_name)d characters.']); }
+        if (!email) { problems.push(['email', 'Please enter your email address.']); }
+        else if (length(email) > %(max_email)d || !/%(email)s/.test(email)) { problems.push(['email', 'Please enter a valid email address.']); }
+        if (!message) { problems.push(['message', 'Please enter a message.']); }
+        else if (length(message) < %(min_message)d) { problems.push(['message', 'Message must be at least %(min_message)d characters.']); }
+        else if (length(message) > %(max_message)d) { problems.push(['message', 'Message must be at most %(max_message)d characters.']); }
+        return problems;
+    };
+""" % {
+    'max_name': MAX_NAME_LENGTH,
+    'max_email': MAX_EMAIL_LENGTH,
+    'min_message': MIN_MESSAGE_LENGTH,
+    'max_message': MAX_MESSAGE_LENGTH,
+    'email': EMAIL_PATTERN.replace('/', r'\/'),
+}
+
+# Runs on every keystroke in the browser. Fields still at their initial
+# None have not been touched, so they disable the button without an error.
+CLIENTSIDE_VALIDATE = """
+function(name, email, message) {%s
+    var values = {name: name, email: email, message: message};
+    var problems = errors(name, email, message);
+    var shown = problems.filter(function(problem) { return values[problem[0]] !== null && values[problem[0]] !== undefined; });
+    return [shown.map(function(problem) { return problem[1]; }).join(' '), problems.length > 0];
+}
+""" % _CLIENTSIDE_RULES
+
+# The only way a submission reaches the server: an invalid form never
+# updates the store, so the server callback never fires for it
+CLIENTSIDE_SUBMIT = """
+function(clicks, name, email, message) {%s
+    if (!clicks || errors(name, email, message).length) {
+        return dash_clientside.no_update;
+    }
+    return {name: name.trim(), email: email.trim(), message: message.trim(), clicks: clicks};
+}
+""" % _CLIENTSIDE_RULES
+
+
+def validate(name, email, message):
+    """Field name -> error message for a submission; empty when it is valid."""
+    problems = {}
+    if not all(isinstance(value, str) for value in (name, email, message)):
+        return {'form': 'Invalid submission.'}
+    name, email, message = name.strip(), email.strip(), message.strip()
+    if not name:
+        problems['name'] = 'Please enter your name.'
+    elif len(name) > MAX_NAME_LENGTH:
+        problems['name'] = f'Name must be at most {MAX_NAME_LENGTH} characters.'
+    if not email:
+        problems['email'] = 'Please enter your email address.'
+    elif len(email) > MAX_EMAIL_LENGTH or not re.match(EMAIL_PATTERN, email) or not _parses(email):
+        problems['email'] = 'Please enter a valid email address.'
+    if not message:
+        problems['message'] = 'Please enter a message.'
+    elif len(message) < MIN_MESSAGE_LENGTH:
+        problems['message'] = f'Message must be at least {MIN_MESSAGE_LENGTH} characters.'
+    elif len(message) > MAX_MESSAGE_LENGTH:
+        problems['message'] = f'Message must be at most {MAX_MESSAGE_LENGTH} characters.'
+    return problems
+
+
+class ContactForm:
+    """Validates the contact form in the browser and stores valid messages.
+
+    Validation runs in clientside callbacks, so typing never sends a request.
+    Send only writes the form to a dcc.Store when it is valid, and the one
+    server callback listens on that store; it revalidates with the same
+    length and pattern checks (no lookups) before the message is written to
+    SQLite. Variants whose pages have no form with these ids are left alone.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path
+        self.variant = None
+        self.enabled = False
+        self._filters = []
+        self._listeners = []
+
+    def init_app(self, portfolio_app, variant):
+        dash_app = portfolio_app.app
+        server = dash_app.server
+        self.variant = variant
+        if self.db_path is None:
+            os.makedirs(server.instance_path, exist_ok=True)
+            self.db_path = os.path.join(server.instance_path, 'contact.sqlite3')
+
+        with server.test_request_context():
+            self.enabled = any(
+                {SUBMIT_ID, SUBMISSION_ID} <= _component_ids(page())
+                for page in (getattr(portfolio_app, 'page_routes', None) or {}).values()
+            )
+        server.extensions['contact'] = self
+        if not self.enabled:
+            return
+
+        # The form only exists once its page is rendered into page-content
+        dash_app.config.suppress_callback_exceptions = True
+        dash_app.clientside_callback(
+            CLIENTSIDE_VALIDATE,
+            Output(FEEDBACK_ID, 'children'),
+            Output(SUBMIT_ID, 'disabled'),
+            Input(NAME_ID, 'value'),
+            Input(EMAIL_ID, 'value'),
+            Input(MESSAGE_ID, 'value')
+        )
+        dash_app.clientside_callback(
+            CLIENTSIDE_SUBMIT,
+            Output(SUBMISSION_ID, 'data'),
+            Input(SUBMIT_ID, 'n_clicks'),
+            State(NAME_ID, 'value'),
+            State(EMAIL_ID, 'value'),
+            State(MESSAGE_ID, 'value')
+        )
+        dash_app.callback(
+            Output(STATUS_ID, 'children'),
+            Output(NAME_ID, 'value'),
+            Output(EMAIL_ID, 'value'),
+            Output(MESSAGE_ID, 'value'),
+            Input(SUBMISSION_ID, 'data'),
+            prevent_initial_call=True
+        )(self.submit)
+
+    def add_filter(self, check):
+        """Run ``check(name, email, message)`` on valid messages before storing.
+
+        A check returns None to accept the message, or the text shown to the
+        visitor to reject it; rejected messages are never stored.
+        """
+        self._filters.append(check)
+
+    def on_message(self, listener):
+        """Call ``listener(message_id)`` after each message is stored."""
+        self._listeners.append(listener)
+
+    def submit(self, data):
+        if not isinstance(data, dict):
+            raise PreventUpdate
+        name, email, message = (data.get(key) for key in ('name', 'email', 'message'))
+        problems = validate(name, email, message)
+        if problems:
+            return ' '.join(problems.values()), dash.no_update, dash.no_update, dash.no_update
+        name, email, message = name.strip(), email.strip(), message.strip()
+        for check in self._filters:
+            rejection = check(name, email, message)
+            if rejection:
+                return rejection, dash.no_update, dash.no_update, dash.no_update
+        try:
+            self.store(name, email, message)
+        except sqlite3.Error:
+            return 'Your message could not be sent. Please try again later.', dash.no_update, dash.no_update, dash.no_update
+        return 'Thank you! Your message has been sent.', None, None, None
+
+    def store(self, name, email, message):
+        with contextlib.closing(self._connect()) as conn, conn:
+            message_id = conn.execute(
+                'INSERT INTO messages (ts, variant, name, email, message) VALUES (?, ?, ?, ?, ?)',
+                (time.time(), self.variant, name, email, message)
+            ).lastrowid
+        for listener in self._listeners:
+            listener(message_id)
+        return message_id
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        return conn
+
+
+def _parses(email):
+    """Whether ``email`` can go in a Reply-To header as it is."""
+    try:
+        return str(Address(addr_spec=email).addr_spec) == email
+    except (HeaderParseError, AttributeError, IndexError, TypeError, ValueError):
+        return False
+
+
+def _component_ids(node):
+    ids = set()
+    if isinstance(node, (list, tuple)):
+        for child in node:
+            ids |= _component_ids(child)
+    elif isinstance(node, Component):
+        node_id = getattr(node, 'id', None)
+        if isinstance(node_id, str):
+            ids.add(node_id)
+        ids |= _component_ids(getattr(node, 'children', None))
+    elif isinstance(node, dict):
+        # An already serialized tree, as the themed app's pages are
+        props = node.get('props') or {}
+        if isinstance(props.get('id'), str):
+            ids.add(props['id'])
+        ids |= _component_ids(props.get('children'))
+    return ids
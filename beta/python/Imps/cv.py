@@ -0,0 +1,263 @@
+import concurrent.futures
+import dataclasses
+import hashlib
+import html as html_escape
+import json
+import os
+import tempfile
+import textwrap
+import threading
+
+import flask
+
+# Bump when the generated documents change shape so cached files are rebuilt
+GENERATOR_VERSION = 1
+
+# Presentation-only fields on the config dataclasses that do not belong in a CV
+STYLE_FIELDS = {'icon', 'gradient', 'color', 'color_scheme', 'accent_color'}
+
+FORMATS = {
+    'pdf': 'application/pdf',
+    'html': 'text/html'
+}
+
+
+def content_sections(portfolio_app):
+    """The app's projects, services and experiences as dicts, plus its skills.
+
+    Variants with a PortfolioConfig keep the sections on ``config``; the
+    others keep their projects in ``project_details`` and their skills,
+    category -> names, in ``skills``.
+    """
+    config = getattr(portfolio_app, 'config', None)
+    sections = {}
+    for section in ('projects', 'services', 'experiences'):
+        items = getattr(config, section, None)
+        if items is None and section == 'projects':
+            items = (getattr(portfolio_app, 'project_details', None) or {}).values()
+        sections[section] = [dataclasses.asdict(item) for item in items or ()]
+    skills = getattr(portfolio_app, 'skills', None) or {}
+    sections['skills'] = {category: list(names) for category, names in skills.items()}
+    return sections
+
+
+def portfolio_content(portfolio_app):
+    """Plain, picklable CV content taken from the app's content sections."""
+    content = {'title': portfolio_app.app.title}
+    for section, items in content_sections(portfolio_app).items():
+        if section == 'skills':
+            content[section] = items
+            continue
+        content[section] = [
+            {key: value for key, value in item.items() if key not in STYLE_FIELDS}
+            for item in items
+        ]
+    return content
+
+
+def content_hash(content):
+    payload = json.dumps([GENERATOR_VERSION, content], sort_keys=True).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+class CVService:
+    """Serves /cv.pdf and /cv.html generated from the portfolio content.
+
+    Documents are rendered in a process pool and cached on disk under their
+    content hash, so a request either streams an existing file or gets a
+    503 with Retry-After while the pool catches up; it never renders.
+    """
+
+    def __init__(self, cache_dir=None, max_workers=1, max_age=3600):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.max_age = max_age
+        self.etag = None
+        self._content = None
+        self._paths = {}
+        self._pending = {}
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def init_app(self, portfolio_app):
+        server = portfolio_app.app.server
+        if self.cache_dir is None:
+            self.cache_dir = os.path.join(server.instance_path, 'cv')
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Called again for each reloaded app; documents of older content are dropped
+        self._content = portfolio_content(portfolio_app)
+        self.etag = content_hash(self._content)
+        self._paths = {}
+        server.extensions['cv'] = self
+        server.add_url_rule('/cv.<fmt>', 'cv', self.serve)
+
+        for fmt in FORMATS:
+            self._generate(fmt)
+
+    def path(self, fmt):
+        return os.path.join(self.cache_dir, f'cv-{self.etag}.{fmt}')
+
+    def ready(self, fmt):
+        if fmt in self._paths:
+            return True
+        if os.path.exists(self.path(fmt)):
+            self._paths[fmt] = self.path(fmt)
+            return True
+        return False
+
+    def serve(self, fmt):
+        if fmt not in FORMATS:
+            flask.abort(404)
+        if not self.ready(fmt):
+            self._generate(fmt)
+            response = flask.make_response('CV is being generated, retry shortly.\n', 503)
+            response.headers['Retry-After'] = '1'
+            return response
+
+        # conditional=True gives ETag/If-None-Match, Last-Modified and Range;
+        # the file body goes through wsgi.file_wrapper (sendfile under gunicorn)
+        return flask.send_file(
+            self._paths[fmt],
+            mimetype=FORMATS[fmt],
+            download_name=f'cv.{fmt}',
+            as_attachment=(fmt == 'pdf'),
+            conditional=True,
+            etag=f'{self.etag}-{fmt}',
+            max_age=self.max_age
+        )
+
+    def _generate(self, fmt):
+        if self.ready(fmt):
+            return
+        path = self.path(fmt)
+        with self._lock:
+            # Keyed by path, so a render of older content does not block this one
+            if path in self._pending and not self._pending[path].done():
+                return
+            if self._pool is None:
+                self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+            future = self._pool.submit(render_to_file, fmt, self._content, path)
+            future.add_done_callback(lambda done: self._finished(fmt, done))
+            self._pending = {key: value for key, value in self._pending.items() if not value.done()}
+            self._pending[path] = future
+
+    def _finished(self, fmt, future):
+        if future.exception() is None and future.result() == self.path(fmt):
+            self._paths[fmt] = future.result()
+
+
+def render_to_file(fmt, content, path):
+    """Render one document in a pool process and atomically move it into place."""
+    data = RENDERERS[fmt](content)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as handle:
+        handle.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _sections(content):
+    """Yield (heading, entries) with each entry as (title, detail lines)."""
+    yield 'Projects', [
+        (project['name'], [project['description'], 'Technologies: ' + ', '.join(project['technologies'])])
+        for project in content['projects']
+    ]
+    yield 'Services', [
+        (service['name'], [service['description']])
+        for service in content['services']
+    ]
+    yield 'Experience', [
+        (f"{exp['role']}, {exp['company']}",
+         [exp['duration']] + ([exp['description']] if 'description' in exp else []) + exp.get('highlights', []))
+        for exp in content['experiences']
+    ]
+    yield 'Skills', [
+        (category, [', '.join(names)])
+        for category, names in content['skills'].items()
+    ]
+
+
+def render_html(content):
+    escape = html_escape.escape
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8">',
+        f'<title>{escape(content["title"])} - CV</title>',
+        '<style>body{font-family:Helvetica,Arial,sans-serif;max-width:48rem;margin:2rem auto;color:#222}'
+        'h2{border-bottom:1px solid #ccc;margin-top:2rem}h3{margin-bottom:.25rem}p{margin:.25rem 0}</style>',
+        f'</head><body><h1>{escape(content["title"])}</h1>'
+    ]
+    for heading, entries in _sections(content):
+        if not entries:
+            continue
+        parts.append(f'<h2>{escape(heading)}</h2>')
+        for title, lines in entries:
+            parts.append(f'<h3>{escape(title)}</h3>')
+            parts.extend(f'<p>{escape(line)}</p>' for line in lines)
+    parts.append('</body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def render_pdf(content):
+    """A dependency-free PDF: Helvetica text on A4 pages."""
+    lines = [(20, True, content['title']), (0, False, '')]
+    for heading, entries in _sections(content):
+        if not entries:
+            continue
+        lines.append((15, True, heading))
+        for title, details in entries:
+            lines.append((11, True, title))
+            for detail in details:
+                lines.extend((10, False, chunk) for chunk in textwrap.wrap(detail, 95) or [''])
+            lines.append((0, False, ''))
+
+    pages, page, y = [], [], 790
+    for size, bold, text in lines:
+        step = max(size, 6) + 6
+        if y - step < 50:
+            pages.append(page)
+            page, y = [], 790
+        y -= step
+        if text:
+            font = 'F2' if bold else 'F1'
+            page.append(f'BT /{font} {size} Tf 56 {y} Td ({_pdf_text(text)}) Tj ET')
+    pages.append(page)
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, filled in once the page object numbers are known
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>'
+    ]
+    page_refs = []
+    for page in pages:
+        stream = '\n'.join(page).encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>' % len(objects)
+        )
+        page_refs.append(b'%d 0 R' % len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(page_refs), len(page_refs))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _pdf_text(text):
+    text = text.encode('cp1252', 'replace').decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+RENDERERS = {
+    'pdf': render_pdf,
+    'html': render_html
+}
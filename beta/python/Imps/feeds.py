@@ -0,0 +1,174 @@
+import datetime
+import gzip
+import html as html_escape
+import threading
+from datetime import timezone
+from email.utils import format_datetime
+
+import flask
+
+from access_log import note_cache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+class FeedService:
+    """Serves /feed.xml (RSS 2.0) and /atom.xml from blog posts and projects.
+
+    Feed readers poll on a timer, so almost every request is a revalidation.
+    Both feeds are built once per (content version, site URL) and stored as
+    identity, gzip and, when the brotli module is installed, brotli bytes.
+    The ETag and Last-Modified come from the content version, which covers
+    the posts and the projects, so a matching If-None-Match or
+    If-Modified-Since is answered with 304 before anything is looked up.
+    """
+
+    def __init__(self, site_url=None, max_age=900, max_entries=50, gzip_level=9, brotli_quality=11):
+        self.site_url = site_url
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.not_modified = 0
+        self._portfolio_app = None
+        self._version = None
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, portfolio_app, version):
+        server = portfolio_app.app.server
+        self._portfolio_app = portfolio_app
+        self._version = version
+        server.extensions['feeds'] = self
+        server.add_url_rule('/feed.xml', 'rss_feed', self.rss)
+        server.add_url_rule('/atom.xml', 'atom_feed', self.atom)
+
+    def rss(self):
+        return self._serve('rss', 'application/rss+xml', self._build_rss)
+
+    def atom(self):
+        return self._serve('atom', 'application/atom+xml', self._build_atom)
+
+    def entries(self, site_url):
+        """(title, url, summary, updated datetime) for each feed entry, newest first."""
+        updated = datetime.datetime.fromtimestamp(self._version.last_modified, timezone.utc)
+        entries = []
+        blog = self._portfolio_app.app.server.extensions.get('blog')
+        for post in blog.index if blog is not None else ():
+            published = updated
+            if post.date != datetime.date.min:
+                published = datetime.datetime.combine(post.date, datetime.time(), timezone.utc)
+            entries.append((post.title, site_url + post.path, post.summary, published))
+        # Projects carry no date of their own; they are as new as the content
+        pages = self._portfolio_app.app.server.extensions.get('project_pages')
+        projects = getattr(self._portfolio_app, 'project_details', None)
+        if projects:
+            projects = projects.values()
+        else:
+            projects = getattr(getattr(self._portfolio_app, 'config', None), 'projects', None) or ()
+        for project in projects:
+            url = site_url + (pages.path(project.slug) if pages is not None else '/projects')
+            entries.append((project.name, url, project.description, updated))
+        entries.sort(key=lambda entry: entry[3], reverse=True)
+        return entries[:self.max_entries]
+
+    def _serve(self, name, mimetype, build):
+        request = flask.request
+        site_url = (self.site_url or request.url_root).rstrip('/')
+        accepted = request.accept_encodings
+        encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        encoding = next((candidate for candidate in encodings if accepted[candidate]), 'identity')
+        etag = f'{name}-{self._version.hash}' + ('' if encoding == 'identity' else f'-{encoding}')
+        last_modified = self._version.last_modified
+
+        since = request.if_modified_since
+        if etag in request.if_none_match or (
+                not request.if_none_match and since is not None and since.timestamp() >= last_modified):
+            self.not_modified += 1
+            note_cache(name, True)
+            return self._headers(flask.Response(status=304, mimetype=mimetype), etag)
+
+        key = (name, self._version.hash, site_url)
+        variants = self._cache.get(key)
+        note_cache(name, variants is not None)
+        if variants is None:
+            with self._lock:
+                variants = self._cache.get(key)
+                if variants is None:
+                    variants = self._cache[key] = self._compress(build(site_url))
+
+        response = flask.Response(variants[encoding], mimetype=mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        return self._headers(response, etag)
+
+    def _headers(self, response, etag):
+        response.set_etag(etag)
+        response.last_modified = self._version.last_modified
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def _compress(self, document):
+        variants = {
+            'identity': document,
+            'gzip': gzip.compress(document, compresslevel=self.gzip_level, mtime=0)
+        }
+        if brotli is not None:
+            variants['br'] = brotli.compress(document, quality=self.brotli_quality)
+        return variants
+
+    def _build_rss(self, site_url):
+        escape = html_escape.escape
+        site = self._portfolio_app.app.title
+        updated = datetime.datetime.fromtimestamp(self._version.last_modified, timezone.utc)
+        items = ''.join(
+            '<item>'
+            f'<title>{escape(title)}</title>'
+            f'<link>{escape(url)}</link>'
+            f'<guid isPermaLink="true">{escape(url)}</guid>'
+            f'<description>{escape(summary or "")}</description>'
+            f'<pubDate>{format_datetime(published, usegmt=True)}</pubDate>'
+            '</item>'
+            for title, url, summary, published in self.entries(site_url)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+            f'<title>{escape(site)}</title>'
+            f'<link>{escape(site_url)}/</link>'
+            f'<description>{escape(f"Posts and projects by {site}")}</description>'
+            f'<atom:link href="{escape(site_url)}/feed.xml" rel="self" type="application/rss+xml"/>'
+            f'<lastBuildDate>{format_datetime(updated, usegmt=True)}</lastBuildDate>'
+            f'{items}</channel></rss>'
+        ).encode('utf-8')
+
+    def _build_atom(self, site_url):
+        escape = html_escape.escape
+        site = self._portfolio_app.app.title
+        updated = datetime.datetime.fromtimestamp(self._version.last_modified, timezone.utc)
+        entries = ''.join(
+            '<entry>'
+            f'<title>{escape(title)}</title>'
+            f'<link href="{escape(url)}"/>'
+            f'<id>{escape(url)}</id>'
+            f'<updated>{published.isoformat().replace("+00:00", "Z")}</updated>'
+            f'<summary>{escape(summary or "")}</summary>'
+            '</entry>'
+            for title, url, summary, published in self.entries(site_url)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom">'
+            f'<title>{escape(site)}</title>'
+            f'<link href="{escape(site_url)}/"/>'
+            f'<link href="{escape(site_url)}/atom.xml" rel="self"/>'
+            f'<id>{escape(site_url)}/</id>'
+            f'<updated>{updated.isoformat().replace("+00:00", "Z")}</updated>'
+            f'<author><name>{escape(site)}</name></author>'
+            f'{entries}</feed>'
+        ).encode('utf-8')
@@ -0,0 +1,96 @@
+import hashlib
+
+import dash
+import flask
+
+from access_log import note_cache
+from compression import encoded_etag, matching_etag
+from version import provided_page
+
+
+class ShellHTTPCache:
+    """Strong ETags and Cache-Control for the responses every visitor shares.
+
+    The index shell (``/``, every page route and route provider page), ``/_dash-layout`` and
+    ``/_dash-dependencies`` only change with the code, the Dash release or
+    the content version, so their ETags are derived from those rather than
+    from the body, with the content coding appended as feeds.py does. A matching If-None-Match is answered with 304 before the
+    view runs, and layout/dependencies bodies are kept per version so a full
+    response does not re-serialize either. ``max_age`` applies to browsers,
+    ``shared_max_age`` to CDNs and reverse proxies.
+    """
+
+    def __init__(self, max_age=0, shared_max_age=300):
+        self.max_age = max_age
+        self.shared_max_age = shared_max_age
+        self.etag_base = None
+        self.not_modified = 0
+        self._kinds = {}
+        self._bodies = {}
+        self._index_vary = ('Accept-Encoding',)
+
+    def init_app(self, portfolio_app, version):
+        dash_app = portfolio_app.app
+        server = dash_app.server
+        prefix = dash_app.config.routes_pathname_prefix
+        self._kinds = {prefix + '_dash-layout': 'layout', prefix + '_dash-dependencies': 'dependencies'}
+        for path in getattr(portfolio_app, 'page_routes', None) or ('/',):
+            self._kinds[path] = 'index'
+        if 'prerender' in server.extensions:
+            # Crawlers get a different document for the same URL
+            self._index_vary += ('User-Agent',)
+
+        self.etag_base = hashlib.sha256(f'{version.hash}:{dash.__version__}'.encode('utf-8')).hexdigest()[:20]
+        server.extensions['http_cache'] = self
+        server.before_request(self._short_circuit)
+        server.after_request(self._tag)
+
+    def etag(self, kind):
+        return f'{self.etag_base}-{kind}'
+
+    def _kind(self):
+        request = flask.request
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        kind = self._kinds.get(request.path)
+        if kind is None and provided_page(flask.current_app, request.path) is not None:
+            kind = 'index'
+        return kind
+
+    def _short_circuit(self):
+        kind = self._kind()
+        if kind is None:
+            return None
+        etag = matching_etag(self.etag(kind), flask.request)
+        if etag is not None:
+            self.not_modified += 1
+            note_cache('http_cache', True)
+            response = self._headers(flask.Response(status=304), kind)
+            # Echo the representation the client holds, compressed or not
+            response.set_etag(etag)
+            return response
+        body = self._bodies.get(kind)
+        if kind != 'index':
+            note_cache('http_cache', body is not None)
+        if body is not None:
+            return self._headers(flask.Response(body, mimetype='application/json'), kind)
+        return None
+
+    def _tag(self, response):
+        kind = self._kind()
+        if kind is None or response.status_code != 200 or 'ETag' in response.headers:
+            return response
+        if kind != 'index' and not response.direct_passthrough:
+            self._bodies[kind] = response.get_data()
+        return self._headers(response, kind)
+
+    def _headers(self, response, kind):
+        # The precompressed shell arrives encoded; JSON is encoded (and its ETag
+        # suffixed) later by the compressor
+        response.set_etag(encoded_etag(self.etag(kind), response.headers.get('Content-Encoding')))
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        response.cache_control.s_maxage = self.shared_max_age
+        response.cache_control.must_revalidate = True
+        response.vary.update(self._index_vary if kind == 'index' else ('Accept-Encoding',))
+        return response
@@ -0,0 +1,437 @@
+"""Emails stored contact messages to the site owner from a background thread.
+
+Configured through server.config, which main.py fills from PORTFOLIO_*
+environment variables:
+
+    PORTFOLIO_MAIL_HOST=smtp.example.com   # required; no host, no delivery
+    PORTFOLIO_MAIL_TO=owner@example.com    # required
+    PORTFOLIO_MAIL_PORT=587
+    PORTFOLIO_MAIL_FROM=portfolio@example.com
+    PORTFOLIO_MAIL_USERNAME=... PORTFOLIO_MAIL_PASSWORD=...
+    PORTFOLIO_MAIL_SECURITY=starttls       # or "ssl", or "none" (default)
+
+To try it locally, run a stand-in server that prints what it receives
+(needs ``pip install aiosmtpd``) and point PORTFOLIO_MAIL_HOST at it:
+
+    python mailer.py stand-in [port]       # default port 8025
+"""
+import contextlib
+import os
+import random
+import smtplib
+import sqlite3
+import sys
+import threading
+import time
+from email.errors import HeaderParseError
+from email.headerregistry import Address
+from email.message import EmailMessage
+from email.utils import formatdate
+
+import flask
+
+from contact import SCHEMA as MESSAGES_SCHEMA
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS deliveries (
+    message_id INTEGER PRIMARY KEY,
+    attempts INTEGER NOT NULL,
+    claimed_at REAL NOT NULL,
+    sent_at REAL,
+    retry_at REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS undeliverable (
+    message_id INTEGER PRIMARY KEY,
+    failed_at REAL NOT NULL,
+    error TEXT NOT NULL
+);
+'''
+
+# Raised while turning a stored row into an email, e.g. by an address that
+# passed the form's checks but not the header parser; retrying cannot help
+MESSAGE_ERRORS = (HeaderParseError, AttributeError, IndexError, TypeError, ValueError, UnicodeError)
+
+# Messages without a delivery, or claimed by a worker that never finished, or
+# released after a failed send and past their backoff
+PENDING = '''
+SELECT messages.id, messages.ts, messages.name, messages.email, messages.message
+FROM messages LEFT JOIN deliveries ON deliveries.message_id = messages.id
+WHERE (deliveries.message_id IS NULL
+       OR (deliveries.sent_at IS NULL AND deliveries.claimed_at < ? AND deliveries.retry_at <= ?))
+  AND messages.id NOT IN (SELECT message_id FROM undeliverable)
+ORDER BY messages.id
+LIMIT ?
+'''
+
+CLAIM = '''
+INSERT INTO deliveries (message_id, attempts, claimed_at) VALUES (?, 1, ?)
+ON CONFLICT (message_id) DO UPDATE SET attempts = attempts + 1, claimed_at = excluded.claimed_at
+'''
+
+
+class CircuitBreaker:
+    """Stops calling a failing service, then lets one trial call through.
+
+    ``failure_threshold`` consecutive failures open the circuit for
+    ``reset_timeout`` seconds. After that it is half-open: the next call is
+    allowed, and its outcome closes the circuit or opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=300.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self):
+        return self.state != self.OPEN
+
+    def retry_in(self):
+        """Seconds until a call is allowed again."""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class MailDelivery:
+    """Sends contact messages over one reused SMTP connection per process.
+
+    ContactForm stores each message in SQLite and notifies this worker;
+    requests never wait on SMTP. The worker claims pending messages in a
+    transaction, so gunicorn workers sharing the database do not send the
+    same message twice, and a claim that is never completed (a killed
+    worker) expires after ``lease`` seconds. Up to ``digest_threshold - 1``
+    messages go out one email each; more than that are sent as one digest.
+
+    Failed sends are retried with exponential backoff and jitter. The retry
+    time is stored with the released rows, so no worker claims them again
+    before it; repeated failures open a circuit breaker so a down SMTP server is probed only
+    every ``breaker.reset_timeout`` seconds. The connection is checked with
+    NOOP before reuse and closed after ``idle_timeout`` seconds unused.
+    A message that cannot be turned into an email at all is recorded in
+    the ``undeliverable`` table and never claimed again.
+    """
+
+    def __init__(self, linger=2.0, max_batch=50, digest_threshold=5, lease=300.0, poll_interval=60.0,
+                 base_backoff=2.0, max_backoff=300.0, idle_timeout=60.0, timeout=30.0, breaker=None):
+        self.linger = linger
+        self.max_batch = max_batch
+        self.digest_threshold = digest_threshold
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.settings = {}
+        self.db_path = None
+        self.enabled = False
+        self.sent = 0
+        self.digests = 0
+        self.failures = 0
+        self.undeliverable = 0
+        self.last_error = None
+        self._retry_at = 0.0
+        self._smtp = None
+        self._smtp_used = 0.0
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, portfolio_app, contact):
+        server = portfolio_app.app.server
+        config = server.config
+        self.settings = {
+            'host': config.get('MAIL_HOST'),
+            'port': int(config.get('MAIL_PORT', 0)) or None,
+            'to': config.get('MAIL_TO'),
+            'from': config.get('MAIL_FROM') or config.get('MAIL_USERNAME') or 'portfolio@localhost',
+            'username': config.get('MAIL_USERNAME'),
+            'password': config.get('MAIL_PASSWORD'),
+            'security': str(config.get('MAIL_SECURITY', 'none')).lower(),
+        }
+        self.db_path = contact.db_path
+        self.enabled = bool(contact.enabled and self.settings['host'] and self.settings['to'])
+
+        server.extensions['mail'] = self
+        server.add_url_rule('/_stats/mail', 'mail_stats', self.report)
+        if self.enabled:
+            contact.on_message(self.notify)
+            # Also picks up messages left pending by an earlier process
+            server.before_request(self._ensure_worker)
+
+    def notify(self, message_id=None):
+        self._ensure_worker()
+        self._wakeup.set()
+
+    def report(self):
+        pending = None
+        if self.enabled:
+            with contextlib.closing(self._connect()) as conn:
+                pending = conn.execute(
+                    'SELECT COUNT(*) FROM messages LEFT JOIN deliveries ON deliveries.message_id = messages.id '
+                    'WHERE deliveries.sent_at IS NULL AND messages.id NOT IN (SELECT message_id FROM undeliverable)'
+                ).fetchone()[0]
+        return flask.jsonify(
+            enabled=self.enabled, pending=pending, sent=self.sent, digests=self.digests,
+            failures=self.failures, undeliverable=self.undeliverable, breaker=self.breaker.state,
+            last_error=self.last_error
+        )
+
+    def deliver(self):
+        """Send one batch of pending messages; returns how many it claimed."""
+        if not self.breaker.allow():
+            return 0
+        claimed = self._claim()
+        if not claimed:
+            self._retry_at = 0.0
+            return 0
+        batch, mails = self._compose(claimed)
+        unsent = list(batch)
+        try:
+            if unsent:
+                smtp = self._connection()
+                digest = self._digest(batch) if len(batch) >= self.digest_threshold else None
+                if digest is not None:
+                    smtp.send_message(digest)
+                    self._mark_sent(batch)
+                    unsent = []
+                    self.digests += 1
+                else:
+                    # Mark each as it goes, so a failure part-way resends only the rest
+                    while unsent:
+                        smtp.send_message(mails[0])
+                        self._mark_sent(unsent[:1])
+                        unsent.pop(0)
+                        mails.pop(0)
+                self._smtp_used = time.monotonic()
+        except (smtplib.SMTPException, OSError) as exc:
+            self._close()
+            self.sent += len(batch) - len(unsent)
+            self.failures += 1
+            self.last_error = f'{type(exc).__name__}: {exc}'
+            self.breaker.record_failure()
+            delay = min(self.max_backoff, self.base_backoff * 2 ** (self.breaker.failures - 1))
+            delay = max(delay / 2 + random.uniform(0, delay / 2), self.breaker.retry_in())
+            self._retry_at = time.monotonic() + delay
+            self._release(unsent, time.time() + delay)
+            return 0
+        self.breaker.record_success()
+        self._retry_at = 0.0
+        self.sent += len(batch)
+        return len(claimed)
+
+    def close(self):
+        self._close()
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        if self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            # Threads do not survive a fork, so each gunicorn worker starts its own
+            if self._worker_pid != pid or not self._worker.is_alive():
+                self._smtp = None
+                self._worker = threading.Thread(target=self._run, name='mail-delivery', daemon=True)
+                self._worker_pid = pid
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            woken = self._wakeup.wait(self._next_wake())
+            self._wakeup.clear()
+            if woken and self.linger:
+                # Let a burst of submissions arrive so they can share a digest
+                time.sleep(self.linger)
+            delay = self._retry_at - time.monotonic()
+            if delay > 0:
+                # Messages arriving during a backoff are stored; they wait for it
+                time.sleep(delay)
+            try:
+                while self.deliver() == self.max_batch:
+                    pass
+            except Exception as exc:
+                # Keep the worker alive; the next wake-up retries
+                self.last_error = f'{type(exc).__name__}: {exc}'
+            if self._smtp is not None and time.monotonic() - self._smtp_used >= self.idle_timeout:
+                self._close()
+
+    def _next_wake(self):
+        timeout = self.idle_timeout if self._smtp is not None else self.poll_interval
+        if self._retry_at:
+            timeout = min(timeout, max(0.0, self._retry_at - time.monotonic()))
+        return timeout
+
+    def _connection(self):
+        smtp = self._smtp
+        if smtp is not None:
+            try:
+                if smtp.noop()[0] == 250:
+                    self._smtp_used = time.monotonic()
+                    return smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close()
+
+        settings = self.settings
+        if settings['security'] == 'ssl':
+            smtp = smtplib.SMTP_SSL(settings['host'], settings['port'] or 465, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(settings['host'], settings['port'] or 25, timeout=self.timeout)
+        try:
+            if settings['security'] == 'starttls':
+                smtp.starttls()
+            if settings['username']:
+                smtp.login(settings['username'], settings['password'] or '')
+        except BaseException:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self._smtp_used = time.monotonic()
+        return smtp
+
+    def _close(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+
+    def _compose(self, batch):
+        """The rows that make valid emails, with one email each; the rest are set aside."""
+        rows, mails, rejected = [], [], []
+        for row in batch:
+            try:
+                mails.append(self._single(row))
+            except MESSAGE_ERRORS as exc:
+                rejected.append((row[0], time.time(), f'{type(exc).__name__}: {exc}'))
+                continue
+            rows.append(row)
+        if rejected:
+            with contextlib.closing(self._connect()) as conn, conn:
+                conn.executemany('INSERT OR REPLACE INTO undeliverable (message_id, failed_at, error) VALUES (?, ?, ?)',
+                                 rejected)
+            self.undeliverable += len(rejected)
+            self.last_error = rejected[-1][2]
+        return rows, mails
+
+    def _single(self, row):
+        _, ts, name, email, message = row
+        mail = self._envelope(f'Portfolio contact from {_one_line(name)}')
+        mail['Reply-To'] = Address(display_name=_one_line(name), addr_spec=email)
+        mail.set_content(f'{_one_line(name)} <{email}> wrote on {formatdate(ts, localtime=True)}:\n\n{message}\n')
+        return mail
+
+    def _digest(self, batch):
+        """One email for the whole batch, or None if it cannot be built; then each goes singly."""
+        mail = self._envelope(f'{len(batch)} portfolio contact messages')
+        parts = [
+            f'{_one_line(name)} <{email}> wrote on {formatdate(ts, localtime=True)}:\n\n{message}\n'
+            for _, ts, name, email, message in batch
+        ]
+        try:
+            mail.set_content(('\n' + '-' * 40 + '\n\n').join(parts))
+        except MESSAGE_ERRORS:
+            return None
+        return mail
+
+    def _envelope(self, subject):
+        mail = EmailMessage()
+        mail['Subject'] = subject
+        mail['From'] = self.settings['from']
+        mail['To'] = self.settings['to']
+        mail['Date'] = formatdate(localtime=True)
+        return mail
+
+    def _claim(self):
+        now = time.time()
+        with contextlib.closing(self._connect()) as conn:
+            # IMMEDIATE takes the write lock up front, so two workers cannot claim the same rows
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                batch = conn.execute(PENDING, (now - self.lease, now, self.max_batch)).fetchall()
+                conn.executemany(CLAIM, [(row[0], now) for row in batch])
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        return batch
+
+    def _mark_sent(self, batch):
+        with contextlib.closing(self._connect()) as conn, conn:
+            conn.executemany('UPDATE deliveries SET sent_at = ? WHERE message_id = ?',
+                             [(time.time(), row[0]) for row in batch])
+
+    def _release(self, batch, retry_at):
+        """Give up the claim on ``batch``; no worker takes it again before ``retry_at`` (wall clock)."""
+        with contextlib.closing(self._connect()) as conn, conn:
+            conn.executemany('UPDATE deliveries SET claimed_at = 0, retry_at = ? WHERE message_id = ?',
+                             [(retry_at, row[0]) for row in batch])
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(MESSAGES_SCHEMA + SCHEMA)
+        _add_retry_at(conn)
+        return conn
+
+
+def _add_retry_at(conn):
+    """Databases created before deliveries had retry_at get the column added."""
+    if 'retry_at' in {row[1] for row in conn.execute('PRAGMA table_info(deliveries)')}:
+        return
+    try:
+        conn.execute('ALTER TABLE deliveries ADD COLUMN retry_at REAL NOT NULL DEFAULT 0')
+    except sqlite3.OperationalError as exc:
+        # Another worker added it between the check and the ALTER
+        if 'duplicate column' not in str(exc):
+            raise
+
+
+def _one_line(text):
+    return ' '.join(text.split())
+
+
+def run_stand_in(port=8025):
+    """A local SMTP server that prints each message it receives."""
+    try:
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.handlers import Debugging
+    except ImportError:
+        sys.exit('the SMTP stand-in needs aiosmtpd: pip install aiosmtpd')
+    controller = Controller(Debugging(sys.stdout), hostname='127.0.0.1', port=port)
+    controller.start()
+    print(f'SMTP stand-in on 127.0.0.1:{port}; set PORTFOLIO_MAIL_HOST=127.0.0.1 PORTFOLIO_MAIL_PORT={port}')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        controller.stop()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) in (2, 3) and sys.argv[1] == 'stand-in':
+        run_stand_in(int(sys.argv[2]) if len(sys.argv) == 3 else 8025)
+    else:
+        sys.exit('usage: python mailer.py stand-in [port]')
@@ -0,0 +1,62 @@
+import collections
+import threading
+
+import flask
+
+from version import provided_page
+
+NOT_FOUND_BODY = (
+    b'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Not Found</title></head>'
+    b'<body><h1>Not Found</h1><p><a href="/">Go to the home page</a></p></body></html>'
+)
+
+
+class NotFoundGate:
+    """Answers unknown page paths with a small prebuilt 404.
+
+    Dash serves its HTML shell for any path through a catch-all rule, and the
+    routing callback then falls back to the home page. The gate runs before
+    that view, so scanner hits such as /wp-login.php never reach Dash. Counts
+    are kept per path up to ``max_paths`` distinct paths, after which they
+    are lumped under "(other)" to bound memory.
+    """
+
+    def __init__(self, max_paths=1000, max_age=3600):
+        self.max_paths = max_paths
+        self.max_age = max_age
+        self.total = 0
+        self.counts = collections.Counter()
+        self._known = frozenset()
+        self._catch_all = None
+        self._lock = threading.Lock()
+
+    def init_app(self, portfolio_app):
+        server = portfolio_app.app.server
+        self._known = frozenset(getattr(portfolio_app, 'page_routes', None) or ('/',))
+        self._catch_all = portfolio_app.app.config.routes_pathname_prefix + '<path:path>'
+        server.extensions['not_found'] = self
+        server.before_request(self._reject_unknown)
+        server.add_url_rule('/_stats/not-found', 'not_found_stats', self.stats)
+
+    def stats(self):
+        with self._lock:
+            top = self.counts.most_common(50)
+        return flask.jsonify(total=self.total, top=top)
+
+    def _reject_unknown(self):
+        rule = flask.request.url_rule
+        if rule is None or rule.rule != self._catch_all or flask.request.path in self._known:
+            return None
+        path = flask.request.path
+        if provided_page(flask.current_app, path) is not None:
+            return None
+
+        with self._lock:
+            self.total += 1
+            key = path if path in self.counts or len(self.counts) < self.max_paths else '(other)'
+            self.counts[key] += 1
+
+        return flask.Response(NOT_FOUND_BODY, 404, {
+            'Content-Type': 'text/html; charset=utf-8',
+            'Cache-Control': f'public, max-age={self.max_age}'
+        })
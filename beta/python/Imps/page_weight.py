@@ -0,0 +1,408 @@
+"""Offline page-weight audit: every byte and request a route costs a visitor.
+
+    python page_weight.py ../No.6
+    python page_weight.py ../No.6 --budgets page_budgets.json --json
+    python page_weight.py ../No.6 --online   # also fetch CDN stylesheets and fonts
+
+The variant is booted in-process and each route is resolved the way a
+browser with a cold cache would: the HTML shell, the scripts and
+stylesheets it links, Dash's layout and dependencies, the route's page
+payload and the images that payload references. Local resources are
+requested through the Flask test client with ``Accept-Encoding: br, gzip``
+so transfer sizes match what the server actually sends. External
+references are listed by library name; their sizes are only known with
+``--online``. Budgets turn the report into a CI check (exit status 1), and
+so does any resource answering with a status other than 2xx, which would
+otherwise quietly shrink the totals. Only public routes are audited.
+"""
+import argparse
+import collections
+import gzip
+import importlib.util
+import json
+import os
+import re
+import sys
+import urllib.error
+import urllib.request
+from html import unescape
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+from ab_router import load_portfolio_app
+from readiness import WARMUP_HEADER, route_request_body, routing_callback
+
+ACCEPT_ENCODING = 'br, gzip' if brotli is not None else 'gzip'
+
+CATEGORIES = ('html', 'script', 'stylesheet', 'font', 'image', 'icon', 'dash-json', 'payload')
+
+# Dash fetches these right after the renderer boots
+DASH_STARTUP_PATHS = ('/_dash-layout', '/_dash-dependencies')
+
+CSS_URL_PATTERN = re.compile(r'url\(\s*[\'"]?([^\'")]+)[\'"]?\s*\)')
+FONT_PATTERN = re.compile(r'\.(woff2?|ttf|otf|eot)$')
+LIBRARY_PATTERN = re.compile(r'([A-Za-z0-9_.-]+)@([0-9][A-Za-z0-9_.-]*)|/([A-Za-z0-9_.-]+)/(\d[A-Za-z0-9_.-]*)/')
+
+
+class Resource:
+    __slots__ = ('url', 'category', 'transfer_bytes', 'raw_bytes', 'external', 'error', 'status')
+
+    def __init__(self, url, category, transfer_bytes=None, raw_bytes=None, external=False, error=None, status=None):
+        self.url = url
+        self.category = category
+        self.transfer_bytes = transfer_bytes
+        self.raw_bytes = raw_bytes
+        self.external = external
+        self.error = error
+        self.status = status
+
+    @property
+    def failed(self):
+        """Answered, but not with 2xx; an unreachable CDN has no status and does not count."""
+        return self.status is not None and not 200 <= self.status < 300
+
+    def as_dict(self):
+        return {
+            'url': self.url,
+            'category': self.category,
+            'transfer_bytes': self.transfer_bytes,
+            'raw_bytes': self.raw_bytes,
+            'external': self.external,
+            'library': library_name(self.url) if self.external else None,
+            'status': self.status,
+            'error': self.error
+        }
+
+
+def library_name(url):
+    """'tailwindcss@2.2.19' or 'font-awesome/6.0.0-beta3' from a CDN URL."""
+    parts = urlsplit(url)
+    match = LIBRARY_PATTERN.search(parts.path)
+    if match is None:
+        return f'{parts.netloc}{parts.path}'
+    if match.group(1):
+        return f'{match.group(1)}@{match.group(2)}'
+    return f'{match.group(3)}/{match.group(4)}'
+
+
+class _ShellParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.references = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'script' and attrs.get('src'):
+            self.references.append((attrs['src'], 'script'))
+        elif tag == 'link' and attrs.get('href'):
+            rel = (attrs.get('rel') or '').lower()
+            if 'stylesheet' in rel:
+                self.references.append((attrs['href'], 'stylesheet'))
+            elif 'icon' in rel:
+                self.references.append((attrs['href'], 'icon'))
+        elif tag == 'img' and attrs.get('src'):
+            self.references.append((attrs['src'], 'image'))
+
+
+def shell_references(document):
+    parser = _ShellParser()
+    parser.feed(document)
+    return parser.references
+
+
+def payload_images(node):
+    """``src`` of every Img component in a serialized component tree."""
+    found = []
+    if isinstance(node, list):
+        for child in node:
+            found += payload_images(child)
+    elif isinstance(node, dict):
+        props = node.get('props', {})
+        if node.get('type') == 'Img' and isinstance(props.get('src'), str):
+            found.append(props['src'])
+        found += payload_images(props.get('children'))
+    return found
+
+
+def decode(body, encoding):
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'br' and brotli is not None:
+        return brotli.decompress(body)
+    return body
+
+
+def boot(variant_dir):
+    """The PortfolioApp of a variant, wired with the same components as in production."""
+    variant_dir = os.path.abspath(variant_dir)
+    sys.path.insert(0, variant_dir)
+    spec = importlib.util.spec_from_file_location('page_weight_main', os.path.join(variant_dir, 'main.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['page_weight_main'] = module
+    spec.loader.exec_module(module)
+    portfolio_app = getattr(module, 'portfolio_app', None)
+    if portfolio_app is not None:
+        return portfolio_app
+    # Stable variants only build their app under __main__
+    return load_portfolio_app(os.path.join(variant_dir, 'App.py'), 'page_weight_App')
+
+
+def font_urls(css, base_url):
+    """One URL per font face, preferring the woff2 file every current browser picks.
+
+    Browsers only download the faces a page uses, so this is an upper bound.
+    """
+    chosen = {}
+    for url in CSS_URL_PATTERN.findall(css):
+        absolute = urljoin(base_url, url).split('#')[0]
+        file_path = absolute.split('?')[0]
+        if not FONT_PATTERN.search(file_path):
+            continue
+        stem = file_path.rsplit('.', 1)[0]
+        if stem not in chosen or file_path.endswith('.woff2'):
+            chosen[stem] = absolute
+    return sorted(chosen.values())
+
+
+def callback_output(body):
+    """The single output value of a /_dash-update-component response."""
+    (props,) = json.loads(body)['response'].values()
+    (value,) = props.values()
+    return value
+
+
+class PageWeightAuditor:
+    """Resolves the resources of each route of a booted variant."""
+
+    def __init__(self, portfolio_app, online=False, timeout=10.0):
+        self.portfolio_app = portfolio_app
+        self.online = online
+        self.timeout = timeout
+        self._client = portfolio_app.app.server.test_client()
+        self._resources = {}
+        self._bodies = {}
+
+    def routes(self):
+        # Private routes such as /analytics are not served to visitors at all
+        route_configs = getattr(self.portfolio_app, 'routes', None)
+        if route_configs:
+            return [route.path for route in route_configs if route.public]
+        page_routes = getattr(self.portfolio_app, 'page_routes', None)
+        if page_routes:
+            return list(page_routes)
+        links = set(re.findall(r'"href":\s*"(/[^"#?]*)"', self.get('/_dash-layout')[2].decode('utf-8')))
+        return ['/'] + sorted(links - {'/'})
+
+    def audit(self, path):
+        shell = self.fetch(path, 'html')
+        if shell.failed:
+            return [shell]
+        document = self._bodies[path].decode('utf-8')
+        resources = [shell]
+        for url, category in shell_references(document):
+            resources += self.resolve(url, category)
+        for startup_path in DASH_STARTUP_PATHS:
+            resources.append(self.fetch(startup_path, 'dash-json'))
+
+        payload, page = self.fetch_payload(path, document)
+        resources.append(payload)
+        for src in payload_images(page) if page is not None else ():
+            resources += self.resolve(src, 'image')
+        return resources
+
+    def resolve(self, url, category):
+        if urlsplit(url).netloc:
+            return self.fetch_external(url, category)
+        return [self.fetch(url, category)]
+
+    def fetch(self, url, category):
+        if url not in self._resources:
+            status, transfer, body = self.get(url)
+            self._bodies[url] = body
+            self._resources[url] = Resource(url, category, transfer, len(body), status=status,
+                                            error=None if 200 <= status < 300 else f'HTTP {status}')
+        return self._resources[url]
+
+    def fetch_payload(self, path, document):
+        """The route's page payload resource and its decoded component tree."""
+        match = re.search(r'<meta name="portfolio-routes" content="([^"]+)"', document)
+        if match is not None:
+            # Served by route_payloads as a GET the clientside router fetches
+            manifest = json.loads(unescape(match.group(1)))
+            url = manifest['prefix'] + manifest['routes'].get(path, manifest['routes']['/']) + '.json'
+            resource = self.fetch(url, 'payload')
+            return resource, None if resource.failed else json.loads(self._bodies[url])
+
+        callback = self._routing_callback()
+        if callback is None:
+            return Resource('(none)', 'payload', 0, 0), None
+        response = self._client.post('/_dash-update-component', json=route_request_body(callback, path),
+                                     headers=self._headers())
+        body = decode(response.data, response.headers.get('Content-Encoding'))
+        resource = Resource(f'POST /_dash-update-component {path}', 'payload', len(response.data), len(body),
+                            status=response.status_code)
+        if resource.failed:
+            resource.error = f'HTTP {response.status_code}'
+            return resource, None
+        return resource, callback_output(body)
+
+    def fetch_external(self, url, category):
+        if url not in self._resources:
+            if not self.online:
+                self._resources[url] = Resource(url, category, external=True)
+                self._bodies[url] = b''
+            else:
+                try:
+                    transfer, body = self._download(url)
+                except urllib.error.HTTPError as exc:
+                    self._resources[url] = Resource(url, category, external=True, error=str(exc), status=exc.code)
+                    self._bodies[url] = b''
+                except OSError as exc:
+                    # Offline or blocked: keep the reference, size unknown
+                    self._resources[url] = Resource(url, category, external=True, error=str(exc))
+                    self._bodies[url] = b''
+                else:
+                    self._resources[url] = Resource(url, category, transfer, len(body), external=True)
+                    self._bodies[url] = body
+        resources = [self._resources[url]]
+        if category == 'stylesheet' and self.online:
+            for font_url in font_urls(self._bodies[url].decode('utf-8', 'replace'), url):
+                resources += self.fetch_external(font_url, 'font')
+        return resources
+
+    def get(self, url):
+        response = self._client.get(url, headers=self._headers())
+        return response.status_code, len(response.data), decode(response.data, response.headers.get('Content-Encoding'))
+
+    def _download(self, url):
+        request = urllib.request.Request(url, headers={'Accept-Encoding': 'gzip', 'User-Agent': 'page-weight-audit'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = response.read()
+            return len(data), decode(data, response.headers.get('Content-Encoding'))
+
+    def _headers(self):
+        # Keeps the audit out of the page-view and access logs
+        return {'Accept-Encoding': ACCEPT_ENCODING, WARMUP_HEADER: '1'}
+
+    def _routing_callback(self):
+        return routing_callback(self._client.get('/_dash-dependencies').get_json() or [])
+
+
+def summarize(resources):
+    """Requests and bytes per category; unknown external sizes count as 0 bytes."""
+    categories = collections.OrderedDict((name, {'requests': 0, 'transfer_bytes': 0, 'raw_bytes': 0})
+                                         for name in CATEGORIES)
+    for resource in resources:
+        totals = categories[resource.category]
+        totals['requests'] += 1
+        totals['transfer_bytes'] += resource.transfer_bytes or 0
+        totals['raw_bytes'] += resource.raw_bytes or 0
+    unknown = sum(1 for resource in resources if resource.transfer_bytes is None)
+    return {
+        'requests': len(resources),
+        'transfer_bytes': sum(totals['transfer_bytes'] for totals in categories.values()),
+        'raw_bytes': sum(totals['raw_bytes'] for totals in categories.values()),
+        'external_requests': sum(1 for resource in resources if resource.external),
+        'unknown_size_requests': unknown,
+        'categories': {name: totals for name, totals in categories.items() if totals['requests']}
+    }
+
+
+def check_budgets(report, budgets):
+    """Violations of ``{"*": {...}, "/projects": {...}}`` budgets, as messages.
+
+    Keys are ``requests``, ``transfer_bytes``, ``external_requests`` and
+    ``<category>_bytes`` (transfer size); route entries override "*".
+    """
+    violations = []
+    for path, route in report['routes'].items():
+        limits = dict(budgets.get('*', {}), **budgets.get(path, {}))
+        for key, limit in limits.items():
+            if key.endswith('_bytes') and key[:-len('_bytes')] in CATEGORIES:
+                actual = route['categories'].get(key[:-len('_bytes')], {}).get('transfer_bytes', 0)
+            else:
+                actual = route[key]
+            if actual > limit:
+                violations.append(f'{path}: {key} {actual} > budget {limit}')
+    return violations
+
+
+def build_report(auditor):
+    routes = {}
+    externals = {}
+    failures = []
+    for path in auditor.routes():
+        resources = auditor.audit(path)
+        routes[path] = summarize(resources)
+        routes[path]['resources'] = [resource.as_dict() for resource in resources]
+        for resource in resources:
+            if resource.external:
+                externals[resource.url] = resource.as_dict()
+            if resource.failed:
+                failures.append(f'{path}: {resource.url} answered HTTP {resource.status}')
+    return {
+        'accept_encoding': ACCEPT_ENCODING,
+        'online': auditor.online,
+        'routes': routes,
+        'external': sorted(externals.values(), key=lambda item: item['url']),
+        'failures': failures
+    }
+
+
+def format_report(report):
+    lines = []
+    for path, route in report['routes'].items():
+        lines.append(f"{path}  {route['requests']} requests, {_kb(route['transfer_bytes'])} transferred, "
+                     f"{_kb(route['raw_bytes'])} uncompressed")
+        for name, totals in route['categories'].items():
+            lines.append(f"    {name:<11} {totals['requests']:>3}  {_kb(totals['transfer_bytes']):>10}  "
+                         f"{_kb(totals['raw_bytes']):>10}")
+        if route['unknown_size_requests']:
+            hint = '' if report['online'] else '; use --online'
+            lines.append(f"    ({route['unknown_size_requests']} external requests of unknown size{hint})")
+    for failure in report['failures']:
+        lines.append(f'FAILED {failure}')
+    lines.append('External references:')
+    for item in report['external']:
+        if item['transfer_bytes'] is not None:
+            size = _kb(item['transfer_bytes'])
+        else:
+            size = f"unreachable: {item['error']}" if item['error'] else 'size unknown'
+        lines.append(f"    {item['library']:<32} {item['category']:<11} {size}")
+    return '\n'.join(lines)
+
+
+def _kb(size):
+    return f'{size / 1024:.1f} KiB'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Per-route page weight of a portfolio variant.')
+    parser.add_argument('variant', help='variant directory, e.g. ../No.6')
+    parser.add_argument('--budgets', help='JSON budgets file; exit 1 when a route exceeds one')
+    parser.add_argument('--online', action='store_true', help='download external stylesheets and their fonts')
+    parser.add_argument('--json', action='store_true', help='print the full report as JSON')
+    args = parser.parse_args(argv)
+
+    report = build_report(PageWeightAuditor(boot(args.variant), online=args.online))
+    violations = []
+    if args.budgets:
+        with open(args.budgets, encoding='utf-8') as handle:
+            violations = check_budgets(report, json.load(handle))
+        report['violations'] = violations
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    for violation in violations:
+        print(f'BUDGET EXCEEDED {violation}', file=sys.stderr)
+    for failure in report['failures']:
+        print(f'FAILED {failure}', file=sys.stderr)
+    return 1 if violations or report['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import functools
+import hashlib
+import html as html_escape
+import re
+
+import flask
+from dash.development.base_component import Component
+
+from access_log import note_cache
+from tracing import traced
+from version import provided_page, public_paths, route_provider
+
+BOT_PATTERN = re.compile(
+    r'bot\b|crawl|spider|slurp|facebookexternalhit|facebot|embedly|quora link preview|'
+    r'outbrain|pinterest|vkshare|w3c_validator|whatsapp|telegram|skypeuripreview|'
+    r'bingpreview|google-inspectiontool|lighthouse',
+    re.IGNORECASE
+)
+
+VOID_TAGS = {'area', 'br', 'col', 'hr', 'img', 'input', 'link', 'meta', 'source', 'wbr'}
+
+# Dash props that are component state rather than HTML attributes
+STATE_PROPS = {
+    'children', 'setProps', 'loading_state', 'n_clicks', 'n_clicks_timestamp',
+    'disable_n_clicks', 'n_blur', 'n_blur_timestamp', 'n_submit', 'n_submit_timestamp',
+    'debounce', 'persistence', 'persisted_props', 'persistence_type', 'refresh', 'key'
+}
+ATTRIBUTE_NAMES = {'className': 'class', 'htmlFor': 'for'}
+
+# Route sections whose PortfolioConfig list has a different name
+SECTION_ATTRIBUTES = {'experience': 'experiences'}
+
+
+@functools.lru_cache(maxsize=4096)
+def is_bot(user_agent):
+    return bool(user_agent) and BOT_PATTERN.search(user_agent) is not None
+
+
+def render_html(node, slot_id=None, slot=None):
+    """Render a Dash component tree to minified HTML.
+
+    html.* components map to their tags and dcc form inputs to their native
+    elements; other components render only their children. When ``slot_id``
+    is given, that component's children are replaced by ``slot``.
+    """
+    out = []
+    _render(node, out, slot_id, slot)
+    return ''.join(out)
+
+
+def _render(node, out, slot_id, slot):
+    if node is None or isinstance(node, bool):
+        return
+    if isinstance(node, (list, tuple)):
+        for child in node:
+            _render(child, out, slot_id, slot)
+        return
+    if not isinstance(node, Component):
+        out.append(html_escape.escape(str(node), quote=False))
+        return
+
+    props = {name: getattr(node, name) for name in node._prop_names if getattr(node, name, None) is not None}
+    children = slot if slot_id is not None and props.get('id') == slot_id else props.get('children')
+
+    if node._namespace == 'dash_html_components':
+        tag = node._type.lower()
+    elif node._type in ('Input', 'Textarea'):
+        tag = node._type.lower()
+    else:
+        _render(children, out, slot_id, slot)
+        return
+
+    out.append('<' + tag)
+    for name, value in props.items():
+        if name in STATE_PROPS or (isinstance(value, (Component, list, dict)) and name != 'style'):
+            continue
+        attribute = ATTRIBUTE_NAMES.get(name, name).lower()
+        if name == 'style':
+            value = ';'.join(f'{_css_name(key)}:{val}' for key, val in value.items())
+        if value is True:
+            out.append(' ' + attribute)
+        elif value is not False:
+            out.append(f' {attribute}="{html_escape.escape(str(value))}"')
+    out.append('>')
+    if tag in VOID_TAGS:
+        return
+    _render(children, out, slot_id, slot)
+    out.append(f'</{tag}>')
+
+
+def _css_name(name):
+    if name.startswith('-'):
+        return name
+    return re.sub(r'[A-Z]', lambda match: '-' + match.group(0).lower(), name)
+
+
+def route_meta(portfolio_app, pathname):
+    """Title and description for a route, derived from PortfolioConfig."""
+    site = portfolio_app.app.title
+    config = getattr(portfolio_app, 'config', None)
+    section = pathname.strip('/').split('/')[0]
+    label = section.replace('-', ' ').title()
+
+    items = getattr(config, SECTION_ATTRIBUTES.get(section, section), None)
+    if items:
+        names = [getattr(item, 'name', None) or getattr(item, 'role', '') for item in items]
+        description = f"{label} by {site}: " + ', '.join(names) + '.'
+    elif section == 'contact':
+        description = f"Get in touch with {site}."
+    else:
+        projects = getattr(config, 'projects', None) or []
+        description = f"{site} portfolio" + (': ' + ', '.join(p.name for p in projects) + '.' if projects else '.')
+
+    title = site if not section or section == 'home' else f"{label} | {site}"
+    return title, description
+
+
+class CrawlerPrerenderer:
+    """Serves crawlers and link-preview bots fully rendered HTML.
+
+    Requests whose User-Agent looks like a bot and whose path is a public
+    page get a static document built from the app layout with the route's
+    page method rendered into ``page-content``; route provider pages such as
+    /blog/<slug> are served the same way. Documents are built once per route
+    and kept in memory, so bots never reach the Dash callback path.
+    """
+
+    def __init__(self, max_age=300):
+        self.max_age = max_age
+        self.hits = 0
+        self._portfolio_app = None
+        self._routes = {}
+        self._cache = {}
+
+    def init_app(self, portfolio_app):
+        server = portfolio_app.app.server
+        self._portfolio_app = portfolio_app
+        page_routes = getattr(portfolio_app, 'page_routes', None) or {}
+        self._routes = {path: page_routes[path] for path in public_paths(portfolio_app) if path in page_routes}
+        server.extensions['prerender'] = self
+        server.before_request(self._serve_bots)
+
+    def document(self, pathname):
+        """The prerendered document for a route and its ETag."""
+        cached = self._cache.get(pathname)
+        note_cache('prerender', cached is not None)
+        if cached is None:
+            body = self._build(pathname)
+            cached = self._cache[pathname] = (body, 'prerender-' + hashlib.sha256(body).hexdigest()[:20])
+        return cached
+
+    def warm(self):
+        with self._portfolio_app.app.server.test_request_context():
+            for pathname in self._routes:
+                self.document(pathname)
+        return True
+
+    def _serve_bots(self):
+        request = flask.request
+        if request.method != 'GET':
+            return None
+        if request.path not in self._routes and provided_page(flask.current_app, request.path) is None:
+            return None
+        if not is_bot(request.headers.get('User-Agent', '')):
+            return None
+
+        self.hits += 1
+        body, etag = self.document(request.path)
+        response = flask.Response(body, 200, {
+            'Content-Type': 'text/html; charset=utf-8',
+            'Cache-Control': f'public, max-age={self.max_age}',
+            'Vary': 'User-Agent'
+        })
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+    @traced('prerender.build')
+    def _build(self, pathname):
+        dash_app = self._portfolio_app.app
+        page = self._routes.get(pathname)
+        if page is None:
+            provider = route_provider(dash_app.server, pathname)
+            page = provider.page(pathname)
+            title, description = provider.meta(pathname)
+        else:
+            title, description = route_meta(self._portfolio_app, pathname)
+        escape = html_escape.escape
+        head = [
+            '<meta charset="utf-8">',
+            '<meta name="viewport" content="width=device-width, initial-scale=1">',
+            f'<title>{escape(title)}</title>',
+            f'<meta name="description" content="{escape(description)}">',
+            f'<meta property="og:title" content="{escape(title)}">',
+            f'<meta property="og:description" content="{escape(description)}">',
+            '<meta property="og:type" content="website">',
+            '<meta name="twitter:card" content="summary">'
+        ]
+        for stylesheet in dash_app.config.external_stylesheets:
+            href = stylesheet['href'] if isinstance(stylesheet, dict) else stylesheet
+            head.append(f'<link rel="stylesheet" href="{escape(href)}">')
+
+        layout = dash_app.layout() if callable(dash_app.layout) else dash_app.layout
+        body = render_html(layout, slot_id='page-content', slot=page())
+        document = f'<!DOCTYPE html><html lang="en"><head>{"".join(head)}</head><body>{body}</body></html>'
+        return document.encode('utf-8')
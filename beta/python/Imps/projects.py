@@ -0,0 +1,130 @@
+import functools
+import hashlib
+from dataclasses import dataclass
+
+from dash import html
+
+from blog import slugify
+from version import route_providers
+
+PREFIX = '/projects/'
+
+
+class ProjectSlug:
+    """Mixin for a variant's ProjectConfig dataclass: ``slug`` from ``name``."""
+
+    @property
+    def slug(self):
+        return slugify(self.name)
+
+
+@dataclass
+class DetailStyle:
+    """The class strings that theme a project page to match its variant."""
+    back: str
+    title: str
+    tag: str
+    link: str
+
+
+def project_detail(project, style):
+    """The /projects/<slug> page for one ProjectConfig."""
+    return html.Div([
+        html.Div([
+            html.A("← All projects", href="/projects", className=style.back),
+            html.H2(project.name, className=style.title),
+            html.P(project.description, className="text-xl text-gray-600 mb-6"),
+            html.Div([
+                html.Span(tech, className=style.tag) for tech in project.technologies
+            ], className="flex flex-wrap mb-8"),
+            html.Div([
+                html.P(paragraph, className="mb-4 leading-relaxed") for paragraph in project.write_up
+            ]) if project.write_up else None,
+            html.Div([
+                html.Img(src=src, alt=project.name, className="rounded-lg shadow") for src in project.gallery
+            ], className="grid md:grid-cols-2 gap-4 my-8") if project.gallery else None,
+            html.Div([
+                html.A(label, href=url, className=style.link) for label, url in project.links.items()
+            ], className="flex flex-wrap gap-4") if project.links else None
+        ], className="max-w-3xl mx-auto")
+    ], className="container mx-auto px-4 py-20")
+
+
+class ProjectDetails:
+    """A PortfolioApp's /projects/<slug> routing, shared by every variant.
+
+    ``route`` is what the app exposes as ``project_route``: it takes any
+    pathname, None included, and returns a page callable for a known slug.
+    A page is built on its first visit and kept; a content change builds a
+    new app and with it a new ProjectDetails.
+    """
+
+    def __init__(self, projects, style):
+        self.projects = projects
+        self.style = style
+        self._pages = {}
+
+    def route(self, pathname):
+        """The page for /projects/<slug>, or None for any other path."""
+        if not pathname or not pathname.startswith(PREFIX):
+            return None
+        project = self.projects.get(pathname[len(PREFIX):])
+        if project is None:
+            return None
+        return functools.partial(self.page, project.slug)
+
+    def page(self, slug):
+        page = self._pages.get(slug)
+        if page is None:
+            page = self._pages[slug] = project_detail(self.projects[slug], self.style)
+        return page
+
+
+class ProjectPages:
+    """Serves PortfolioApp's /projects/<slug> detail pages as a route provider.
+
+    The app lists its projects in ``project_details`` (slug -> project) and
+    renders one with ``project_route(pathname)``, a ProjectDetails.route
+    that display_page also uses. Registering them here lets the router, prerenderer and sitemap
+    serve them like page routes, except that nothing renders them at
+    start-up: a detail page is built on its first request and then kept
+    by the app and by each component's per-version cache. The projects
+    listing only links to them, so its size does not grow with how much a
+    project's page holds.
+    """
+
+    prefix = PREFIX
+
+    def __init__(self):
+        self._portfolio_app = None
+        self._projects = {}
+
+    def init_app(self, portfolio_app):
+        server = portfolio_app.app.server
+        self._portfolio_app = portfolio_app
+        self._projects = getattr(portfolio_app, 'project_details', None) or {}
+        if not self._projects or not hasattr(portfolio_app, 'project_route'):
+            return
+        server.extensions['project_pages'] = self
+        route_providers(server).append(self)
+
+    def path(self, slug):
+        return PREFIX + slug
+
+    def page(self, pathname):
+        return self._portfolio_app.project_route(pathname)
+
+    def public_paths(self):
+        return [self.path(slug) for slug in self._projects]
+
+    def meta(self, pathname):
+        site = self._portfolio_app.app.title
+        project = self._projects.get(pathname[len(PREFIX):])
+        if project is None:
+            return f'Projects | {site}', f'Projects by {site}.'
+        return f'{project.name} | {site}', project.description
+
+    def digest(self):
+        # The project data lives in App.py, whose source the content version
+        # already hashes; the slugs are all that is left to cover
+        return hashlib.sha256('\n'.join(self._projects).encode('utf-8')).hexdigest()
@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+
+import flask
+
+WARMUP_HEADER = 'X-Portfolio-Warmup'
+
+# Dash endpoints whose first response builds and serializes JSON
+SHELL_PATHS = ('/', '/_dash-layout', '/_dash-dependencies')
+
+
+def routing_callback(dependencies):
+    """The server-side callback entry that renders pages from dcc.Location's pathname."""
+    for callback in dependencies:
+        if callback.get('clientside_function'):
+            continue
+        if any(item['id'] == 'url' and item['property'] == 'pathname' for item in callback['inputs']):
+            return callback
+    return None
+
+
+def route_request_body(callback, pathname):
+    """The /_dash-update-component payload the browser sends when navigating."""
+    output_id, output_property = callback['output'].rsplit('.', 1)
+    return {
+        'output': callback['output'],
+        'outputs': {'id': output_id, 'property': output_property},
+        'inputs': [
+            dict(item, value=pathname if item['property'] == 'pathname' else '')
+            for item in callback['inputs']
+        ],
+        'state': [],
+        'changedPropIds': ['url.pathname']
+    }
+
+
+class Readiness:
+    """/healthz and /readyz, with a warm-up pass gating readiness.
+
+    Warm-up runs in a background thread in every worker process. It requests
+    the Dash shell, layout and dependencies, renders each route in
+    ``portfolio_app.page_routes`` through the real callback endpoint and
+    waits for registered cache primers; only then does /readyz return 200.
+    """
+
+    def __init__(self, timeout=60.0):
+        self.timeout = timeout
+        self.ready = False
+        self.failures = []
+        self.warmup_seconds = None
+        self._primers = []
+        self._server = None
+        self._routes = ()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, portfolio_app):
+        server = self._server = portfolio_app.app.server
+        self._routes = tuple(getattr(portfolio_app, 'page_routes', None) or ('/',))
+        server.extensions['readiness'] = self
+        server.add_url_rule('/healthz', 'healthz', self.healthz)
+        server.add_url_rule('/readyz', 'readyz', self.readyz)
+        server.before_request(self._ensure_warmup)
+
+    def add_primer(self, name, primer):
+        """Register a callable that returns True once its cache is warm."""
+        self._primers.append((name, primer))
+
+    def start(self, wait=False):
+        """Warm up in a background thread, or in this one when ``wait`` is set."""
+        pid = os.getpid()
+        with self._lock:
+            # Threads do not survive a fork, so each worker warms itself up
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self.ready = False
+        if wait:
+            self.warm_up()
+        else:
+            threading.Thread(target=self.warm_up, name='portfolio-warmup', daemon=True).start()
+
+    def warm_up(self):
+        started = time.perf_counter()
+        try:
+            failures = self._warm_up()
+        except Exception as exc:
+            failures = [f'warm-up crashed: {exc!r}']
+        self.failures = failures
+        self.warmup_seconds = time.perf_counter() - started
+        self.ready = not failures
+
+    def _warm_up(self):
+        failures = []
+        client = self._server.test_client()
+        headers = {WARMUP_HEADER: '1'}
+
+        for path in SHELL_PATHS:
+            response = client.get(path, headers=headers)
+            if response.status_code != 200:
+                failures.append(f'GET {path}: {response.status_code}')
+
+        callback = routing_callback(client.get('/_dash-dependencies', headers=headers).get_json() or [])
+        if callback is not None:
+            for pathname in self._routes:
+                response = client.post('/_dash-update-component', json=route_request_body(callback, pathname),
+                                       headers=headers)
+                if response.status_code != 200:
+                    failures.append(f'render {pathname}: {response.status_code}')
+
+        deadline = time.monotonic() + self.timeout
+        for name, primer in self._primers:
+            while not primer():
+                if time.monotonic() >= deadline:
+                    failures.append(f'primer {name}: timed out')
+                    break
+                time.sleep(0.05)
+        return failures
+
+    def healthz(self):
+        return flask.jsonify(status='ok')
+
+    def readyz(self):
+        body = {
+            'ready': self.ready,
+            'warmup_seconds': self.warmup_seconds,
+            'failures': self.failures
+        }
+        return flask.jsonify(body), 200 if self.ready else 503
+
+    def _ensure_warmup(self):
+        if self._pid != os.getpid():
+            self.start()
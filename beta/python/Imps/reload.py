@@ -0,0 +1,171 @@
+import hmac
+import itertools
+import os
+import signal
+import sys
+import threading
+import time
+
+import flask
+
+from ab_router import load_module
+
+ADMIN_PATH = '/_admin/reload'
+
+
+class ContentReloader:
+    """The WSGI entry point; rebuilds the app when its content changes.
+
+    ``factory(module)`` builds a complete, warmed-up PortfolioApp from an
+    App.py module. When App.py, a file under its assets folder or one of the
+    ``watch`` directories, or the trigger file changes, a background thread in each worker imports App.py
+    afresh, calls the factory and, only if that succeeds, swaps the new app
+    in. Each request picks up the app current when it arrives, so in-flight
+    requests finish on the old one and no request waits for a rebuild. A
+    failed rebuild keeps the running app and is reported at /_admin/reload.
+
+    Three triggers, all of which reach every gunicorn worker:
+
+    * editing App.py, an asset or a watched file (debounced by one poll);
+    * SIGHUP to any process that called ``listen_for_sighup``;
+    * ``POST /_admin/reload`` with ``Authorization: Bearer <RELOAD_TOKEN>``;
+      without a RELOAD_TOKEN in server.config the endpoint is disabled.
+
+    The last two touch the trigger file, which every worker watches.
+    """
+
+    def __init__(self, factory, app_path, watch=(), poll_interval=1.0):
+        self.factory = factory
+        self.app_path = app_path
+        self.watch = list(watch)
+        self.poll_interval = poll_interval
+        self.portfolio_app = None
+        self.generation = 0
+        self.reloads = 0
+        self.reloaded_at = None
+        self.last_error = None
+        self._app = None
+        self._trigger_path = None
+        self._module_names = itertools.count(1)
+        self._module_name = None
+        self._signature = None
+        self._requested = threading.Event()
+        self._watcher = None
+        self._watcher_pid = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    def start(self, portfolio_app):
+        """Serve ``portfolio_app``, built by the caller from the imported App module."""
+        server = portfolio_app.app.server
+        self._trigger_path = os.path.join(server.instance_path, 'reload')
+        self._swap(portfolio_app)
+        self._signature = self._files()
+
+    def init_app(self, portfolio_app):
+        """Register the admin endpoint; the factory calls this for every generation."""
+        server = portfolio_app.app.server
+        server.extensions['reloader'] = self
+        server.add_url_rule(ADMIN_PATH, 'admin_reload', self._admin, methods=['GET', 'POST'])
+
+    def __call__(self, environ, start_response):
+        self._ensure_watcher()
+        # One read of the attribute: this request stays on this app even if a swap follows
+        return self._app(environ, start_response)
+
+    def request_reload(self):
+        """Ask every worker to reload by touching the trigger file."""
+        os.makedirs(os.path.dirname(self._trigger_path), exist_ok=True)
+        with open(self._trigger_path, 'a'):
+            os.utime(self._trigger_path)
+        self._requested.set()
+
+    def listen_for_sighup(self):
+        """Reload on SIGHUP; only possible from the main thread."""
+        if hasattr(signal, 'SIGHUP') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.request_reload())
+
+    def reload(self):
+        """Build a new generation from App.py and swap it in; returns whether it did."""
+        with self._reload_lock:
+            module_name = f'App_reload_{next(self._module_names)}'
+            try:
+                portfolio_app = self.factory(load_module(self.app_path, module_name))
+            except Exception as exc:
+                sys.modules.pop(module_name, None)
+                self.last_error = f'{type(exc).__name__}: {exc}'
+                self._app.logger.exception('content reload failed; still serving generation %d', self.generation)
+                return False
+            previous, self._module_name = self._module_name, module_name
+            self._swap(portfolio_app)
+            if previous is not None:
+                sys.modules.pop(previous, None)
+            self.reloads += 1
+            self.reloaded_at = time.time()
+            self.last_error = None
+            return True
+
+    def _swap(self, portfolio_app):
+        self.portfolio_app = portfolio_app
+        self.generation += 1
+        self._app = portfolio_app.app.server
+
+    def _admin(self):
+        token = flask.current_app.config.get('RELOAD_TOKEN')
+        if not token:
+            flask.abort(404)
+        supplied = flask.request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied.encode('utf-8'), str(token).encode('utf-8')):
+            flask.abort(403)
+        status = 200
+        if flask.request.method == 'POST':
+            self.request_reload()
+            status = 202
+        return flask.jsonify(
+            generation=self.generation, reloads=self.reloads, reloaded_at=self.reloaded_at,
+            last_error=self.last_error, pid=os.getpid()
+        ), status
+
+    def _ensure_watcher(self):
+        pid = os.getpid()
+        if self._watcher_pid == pid and self._watcher.is_alive():
+            return
+        with self._lock:
+            # Threads do not survive a fork, so each gunicorn worker starts its own
+            if self._watcher_pid != pid or not self._watcher.is_alive():
+                self._watcher = threading.Thread(target=self._watch, name='content-reload', daemon=True)
+                self._watcher_pid = pid
+                self._watcher.start()
+
+    def _watch(self):
+        pending = None
+        while True:
+            requested = self._requested.wait(self.poll_interval)
+            self._requested.clear()
+            signature = self._files()
+            if signature == self._signature and not requested:
+                pending = None
+                continue
+            if not requested and signature != pending:
+                # Wait for the files to hold still, so a half-copied deploy is not loaded
+                pending = signature
+                continue
+            pending = None
+            self._signature = signature
+            self.reload()
+
+    def _files(self):
+        """(path, mtime, size) of every watched file."""
+        paths = [self.app_path, self._trigger_path]
+        for folder in [self.portfolio_app.app.config.assets_folder] + self.watch:
+            for root, dirs, files in os.walk(folder):
+                dirs.sort()
+                paths.extend(os.path.join(root, name) for name in sorted(files))
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
@@ -0,0 +1,187 @@
+import json
+import threading
+
+import flask
+from dash.dependencies import Input, Output
+from plotly.utils import PlotlyJSONEncoder
+
+from access_log import note_cache
+from compression import matching_etag
+from readiness import routing_callback
+from tracing import span
+from version import provided_page, route_providers
+
+MANIFEST_META = 'portfolio-routes'
+
+# The router POSTs the new pathname here on each navigation; payloads may come
+# from the browser cache, so their requests cannot be counted
+VIEWS_PATH = '/_routes/views'
+
+# Longer bodies are not pathnames of this site
+MAX_VIEW_BODY = 512
+
+# Replaces the server-side routing callback: the page for a pathname is
+# fetched from its versioned GET URL, which browsers and CDNs may cache
+CLIENTSIDE_ROUTER = r"""
+function(pathname) {
+    var manifest = JSON.parse(document.querySelector('meta[name="%s"]').content);
+    var name = manifest.routes[pathname];
+    if (!name && manifest.prefixes.some(function(prefix) { return pathname.indexOf(prefix) === 0; })) {
+        // Provider pages such as /blog/<slug>; same rule as payload_name()
+        name = pathname.replace(/^\/+|\/+$/g, '').split('/').join('--');
+    }
+    name = name || manifest.routes['/'];
+    if (dash_clientside.callback_context.triggered.length) {
+        // Only navigation, not the initial render, which the page request counted
+        navigator.sendBeacon(manifest.views, pathname);
+    }
+    return fetch(manifest.prefix + name + '.json').then(function(response) {
+        if (!response.ok) {
+            throw new Error('route payload ' + name + ': ' + response.status);
+        }
+        return response.json();
+    });
+}
+""" % MANIFEST_META
+
+
+def payload_name(pathname):
+    return pathname.strip('/').replace('/', '--') or 'index'
+
+
+def payload_path(name):
+    return '/' + name.replace('--', '/')
+
+
+class RoutePayloads:
+    """Serves each route's rendered page at /_routes/<version>/<name>.json.
+
+    Navigation otherwise POSTs to /_dash-update-component, which no HTTP
+    cache will store. Here the routing callback is swapped for a clientside
+    one that GETs the page JSON from a URL carrying the content version, so
+    public payloads are immutable and CDN-cacheable. Non-public routes (e.g.
+    /analytics) go through the same URL but are rendered per request and
+    never stored. The version and route names reach the browser in a meta
+    tag of the index shell; pages of route providers (e.g. /blog/<slug>)
+    are public and named by the same rule, so only their prefixes are sent.
+
+    A payload is fetched once per browser and version, so navigations are
+    counted by a beacon to VIEWS_PATH instead, which is never cached; the
+    page-view recorder counts it for routes this app has.
+    """
+
+    def __init__(self, max_age=31536000):
+        self.max_age = max_age
+        self.hits = 0
+        self._portfolio_app = None
+        self._server = None
+        self._version = None
+        self._routes = {}
+        self._names = {}
+        self._public = frozenset()
+        self._meta = {'name': MANIFEST_META, 'content': ''}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, portfolio_app, version):
+        dash_app = portfolio_app.app
+        server = dash_app.server
+        self._portfolio_app = portfolio_app
+        self._server = server
+        self._version = version
+        page_routes = getattr(portfolio_app, 'page_routes', None) or {}
+        self._names = {path: payload_name(path) for path in page_routes}
+        self._routes = {self._names[path]: page for path, page in page_routes.items()}
+        self._public = frozenset(
+            payload_name(route.path) for route in getattr(portfolio_app, 'routes', ()) if route.public
+        )
+
+        self._use_clientside_router(dash_app)
+        dash_app.config.meta_tags.append(self._meta)
+        self._publish_manifest(version)
+
+        server.extensions['route_payloads'] = self
+        server.add_url_rule('/_routes/<version_hash>/<name>.json', 'route_payload', self.serve)
+        server.add_url_rule(VIEWS_PATH, 'route_view', self.view, methods=['POST'])
+
+    def payload(self, name):
+        """The serialized page for a public route at the current version."""
+        key = (self._version.hash, name)
+        body = self._cache.get(key)
+        note_cache('route_payload', body is not None)
+        if body is None:
+            with self._lock:
+                body = self._cache.get(key)
+                if body is None:
+                    body = self._cache[key] = self._render(name)
+        return body
+
+    def warm(self):
+        with self._portfolio_app.app.server.test_request_context():
+            for name in self._public:
+                self.payload(name)
+        return True
+
+    def serve(self, version_hash, name):
+        if self._page(name) is None:
+            flask.abort(404)
+        if version_hash != self._version.hash:
+            # A shell from before a content change; send it to the current payload
+            response = flask.redirect(flask.url_for('route_payload', version_hash=self._version.hash, name=name))
+            response.cache_control.no_cache = True
+            return response
+
+        self.hits += 1
+        if name in self._routes and name not in self._public:
+            response = flask.Response(self._render(name), mimetype='application/json')
+            response.cache_control.no_store = True
+            return response
+
+        response = flask.Response(self.payload(name), mimetype='application/json')
+        # A client holding the gzip or br form revalidates with that ETag
+        etag = f'{version_hash}-{name}'
+        response.set_etag(matching_etag(etag, flask.request) or etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        response.cache_control.immutable = True
+        return response.make_conditional(flask.request)
+
+    def view(self):
+        """The router's navigation beacon; its body is the new pathname."""
+        request = flask.request
+        pathname = request.get_data(as_text=True) if (request.content_length or 0) <= MAX_VIEW_BODY else ''
+        if pathname in self._names or provided_page(self._server, pathname) is not None:
+            # Lets the page-view recorder count this as a navigation
+            flask.g.page_view_route = pathname
+        response = flask.Response(status=204)
+        response.cache_control.no_store = True
+        return response
+
+    def _page(self, name):
+        page = self._routes.get(name)
+        if page is None and '--' in name:
+            page = provided_page(self._server, payload_path(name))
+        return page
+
+    def _render(self, name):
+        page = self._page(name)()
+        with span('json.encode', route=name):
+            return json.dumps(page, cls=PlotlyJSONEncoder, separators=(',', ':')).encode('utf-8')
+
+    def _publish_manifest(self, version):
+        manifest = {
+            'prefix': f'/_routes/{version.hash}/',
+            'views': VIEWS_PATH,
+            'routes': self._names,
+            'prefixes': [provider.prefix for provider in route_providers(self._server)]
+        }
+        self._meta['content'] = json.dumps(manifest, separators=(',', ':'))
+
+    def _use_clientside_router(self, dash_app):
+        callback = routing_callback(dash_app._callback_list)
+        if callback is None:
+            return
+        dash_app._callback_list.remove(callback)
+        dash_app.callback_map.pop(callback['output'], None)
+        output_id, output_property = callback['output'].rsplit('.', 1)
+        dash_app.clientside_callback(CLIENTSIDE_ROUTER, Output(output_id, output_property), Input('url', 'pathname'))
@@ -0,0 +1,90 @@
+import gzip
+import re
+import threading
+
+import flask
+
+from access_log import note_cache
+from tracing import traced
+from version import provided_page
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Script bodies are left alone: collapsing their newlines could change JS semantics
+SCRIPT_PATTERN = re.compile(r'(<script\b.*?</script>)', re.IGNORECASE | re.DOTALL)
+
+
+def minify_html(document):
+    parts = SCRIPT_PATTERN.split(document.strip())
+    for index in range(0, len(parts), 2):
+        text = re.sub(r'\s*\n\s*', ' ', parts[index])
+        text = re.sub(r'>\s+<', '><', text)
+        # Script parts start with "<" and end with ">", so whitespace at the
+        # edges of the markup around them is between two tags as well
+        parts[index] = re.sub(r'^\s+<', '<', re.sub(r'>\s+$', '>', text))
+    return ''.join(parts)
+
+
+class PrecompiledShell:
+    """Serves Dash's index page from prebuilt, precompressed bytes.
+
+    Dash interpolates ``index_string`` with metas, CSS, config and script
+    tags on every request to a page URL. The shell is built once per app
+    (the reloader builds a new app when the config or assets change), minified and
+    stored as identity, gzip and, when the brotli module is installed,
+    brotli bytes; a request only picks the encoding.
+    """
+
+    def __init__(self, gzip_level=9, brotli_quality=11):
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.variants = None
+        self._dash_app = None
+        self._paths = frozenset()
+        self._lock = threading.Lock()
+
+    def init_app(self, portfolio_app):
+        dash_app = self._dash_app = portfolio_app.app
+        self._paths = frozenset(getattr(portfolio_app, 'page_routes', None) or ('/',))
+        dash_app.server.extensions['shell'] = self
+        dash_app.server.before_request(self._serve)
+
+    @traced('shell.build')
+    def build(self):
+        # Dash finishes registering scripts in its own first-request hook,
+        # which runs before this one, so the shell is built lazily
+        with self._dash_app.server.test_request_context('/'):
+            document = minify_html(self._dash_app.index()).encode('utf-8')
+        variants = {
+            'identity': document,
+            'gzip': gzip.compress(document, compresslevel=self.gzip_level, mtime=0)
+        }
+        if brotli is not None:
+            variants['br'] = brotli.compress(document, quality=self.brotli_quality)
+        return variants
+
+    def _serve(self):
+        request = flask.request
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        if request.path not in self._paths and provided_page(flask.current_app, request.path) is None:
+            return None
+
+        variants = self.variants
+        note_cache('shell', variants is not None)
+        if variants is None:
+            with self._lock:
+                if self.variants is None:
+                    self.variants = self.build()
+                variants = self.variants
+
+        accepted = request.accept_encodings
+        encoding = next((name for name in ('br', 'gzip') if name in variants and accepted[name]), 'identity')
+        response = flask.Response(variants[encoding], mimetype='text/html')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
@@ -0,0 +1,83 @@
+import html as html_escape
+import threading
+from datetime import datetime, timezone
+
+import flask
+
+from access_log import note_cache
+from version import public_paths
+
+
+class SitemapService:
+    """Serves /sitemap.xml and /robots.txt generated from the route table.
+
+    Both documents are built once per (content version, site URL) and kept
+    as bytes; a content change drops them. Responses carry Last-Modified and
+    an ETag tied to the content version, so crawlers revalidate with a 304.
+    ``site_url`` defaults to the URL root of the request.
+    """
+
+    def __init__(self, site_url=None, max_age=3600):
+        self.site_url = site_url
+        self.max_age = max_age
+        self._portfolio_app = None
+        self._version = None
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, portfolio_app, version):
+        server = portfolio_app.app.server
+        self._portfolio_app = portfolio_app
+        self._version = version
+        server.extensions['sitemap'] = self
+        server.add_url_rule('/sitemap.xml', 'sitemap', self.sitemap)
+        server.add_url_rule('/robots.txt', 'robots', self.robots)
+
+    def sitemap(self):
+        return self._serve('sitemap', 'application/xml', self._build_sitemap)
+
+    def robots(self):
+        return self._serve('robots', 'text/plain', self._build_robots)
+
+    def _serve(self, name, mimetype, build):
+        site_url = (self.site_url or flask.request.url_root).rstrip('/')
+        key = (name, self._version.hash, site_url)
+        body = self._cache.get(key)
+        note_cache(name, body is not None)
+        if body is None:
+            with self._lock:
+                body = self._cache.get(key)
+                if body is None:
+                    body = self._cache[key] = build(site_url)
+
+        response = flask.Response(body, mimetype=mimetype)
+        response.last_modified = self._version.last_modified
+        response.set_etag(f'{name}-{self._version.hash}')
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        return response.make_conditional(flask.request)
+
+    def _build_sitemap(self, site_url):
+        lastmod = datetime.fromtimestamp(self._version.last_modified, timezone.utc).strftime('%Y-%m-%d')
+        entries = ''.join(
+            '<url>'
+            f'<loc>{html_escape.escape(site_url + path)}</loc>'
+            f'<lastmod>{lastmod}</lastmod>'
+            f'<priority>{"1.0" if path == "/" else "0.8"}</priority>'
+            '</url>'
+            for path in public_paths(self._portfolio_app)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+        ).encode('utf-8')
+
+    def _build_robots(self, site_url):
+        private = [
+            route.path for route in getattr(self._portfolio_app, 'routes', ())
+            if not route.public
+        ]
+        lines = ['User-agent: *']
+        lines += [f'Disallow: {path}' for path in private]
+        lines += ['Disallow: /_stats/', '', f'Sitemap: {site_url}/sitemap.xml', '']
+        return '\n'.join(lines).encode('utf-8')
@@ -0,0 +1,209 @@
+import hashlib
+import math
+import re
+import threading
+import time
+from array import array
+
+import flask
+
+# Words per shingle, and MinHash rows per LSH band: a near-duplicate shares
+# at least one band with the original with high probability. One 64-byte
+# blake2b digest covers all BANDS * BAND_ROWS 32-bit MinHash values.
+SHINGLE_WORDS = 3
+BAND_ROWS = 2
+BANDS = 8
+
+_WORD = re.compile(r'\w+')
+
+# Visitor-facing reasons; deliberately vague about which check fired
+DUPLICATE = 'We have already received this message. Thank you!'
+FLOOD = 'Too many messages have been sent recently. Please try again later.'
+
+
+def _hashes(data, count):
+    """``count`` independent 64-bit indexes for ``data`` by double hashing."""
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    first = int.from_bytes(digest[:8], 'little')
+    second = int.from_bytes(digest[8:], 'little') | 1
+    return [(first + i * second) & 0xFFFFFFFFFFFFFFFF for i in range(count)]
+
+
+class BloomFilter:
+    """Set membership in a fixed bit array; false positives, no false negatives."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, data):
+        """Add ``data``; returns whether it was (probably) present already."""
+        present = True
+        for value in _hashes(data, self.hash_count):
+            index = value % self.size
+            byte, mask = index >> 3, 1 << (index & 7)
+            if not self.bits[byte] & mask:
+                present = False
+                self.bits[byte] |= mask
+        return present
+
+    def __contains__(self, data):
+        for value in _hashes(data, self.hash_count):
+            index = value % self.size
+            if not self.bits[index >> 3] & (1 << (index & 7)):
+                return False
+        return True
+
+    def clear(self):
+        self.bits[:] = bytes(len(self.bits))
+
+
+class CountMinSketch:
+    """Approximate counts in ``depth`` rows of ``width`` counters; never undercounts.
+
+    Counters are single bytes that stop at 255, which is far above any
+    threshold they are compared with.
+    """
+
+    def __init__(self, width=65536, depth=4):
+        self.width = width
+        self.depth = depth
+        self.counters = bytearray(width * depth)
+
+    def add(self, data):
+        """Count ``data`` once; returns its estimated count including this one."""
+        cells = self._cells(data)
+        # Conservative update: only raise the counters at the current minimum
+        estimate = min(min(self.counters[cell] for cell in cells) + 1, 255)
+        for cell in cells:
+            if self.counters[cell] < estimate:
+                self.counters[cell] = estimate
+        return estimate
+
+    def estimate(self, data):
+        return min(self.counters[cell] for cell in self._cells(data))
+
+    def clear(self):
+        self.counters[:] = bytes(len(self.counters))
+
+    def _cells(self, data):
+        return [row * self.width + value % self.width for row, value in enumerate(_hashes(data, self.depth))]
+
+
+def normalize(text):
+    """Lower-cased words only, so spacing, case and punctuation tricks collapse."""
+    return _WORD.findall(text.lower())
+
+
+def band_keys(words):
+    """LSH band keys from a MinHash signature over word shingles."""
+    rows = BANDS * BAND_ROWS
+    if len(words) < SHINGLE_WORDS:
+        shingles = [' '.join(words)]
+    else:
+        shingles = [' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)]
+    signature = [0xFFFFFFFF] * rows
+    for shingle in set(shingles):
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=4 * rows).digest()
+        values = array('I', digest)
+        signature = [min(pair) for pair in zip(signature, values)]
+    return [
+        b'band%d:' % band + array('I', signature[band * BAND_ROWS:(band + 1) * BAND_ROWS]).tobytes()
+        for band in range(BANDS)
+    ]
+
+
+class SpamFilter:
+    """Rejects duplicate and flood contact messages before they are stored.
+
+    Runs as a ContactForm filter, so a rejected message never reaches
+    SQLite or the mail worker. Three checks, each a fixed amount of work for
+    a message the form already capped in length:
+
+    * an exact repeat of a message seen in the window (Bloom filter over the
+      normalized text);
+    * more than ``max_near_duplicates`` messages sharing an LSH band of a
+      word-shingle MinHash signature, i.e. the same text with small edits
+      (count-min sketch over band keys);
+    * more than ``max_per_sender`` messages from one email address
+      (count-min sketch).
+
+    Memory is fixed at start-up, sized so that up to ``capacity`` messages a
+    window keep false rejections negligible; a bigger flood than that raises
+    them. The structures are kept in two generations that rotate every
+    ``window`` seconds, so a message is remembered for between one and two
+    windows. State is per process.
+    """
+
+    def __init__(self, window=3600.0, capacity=20000, error_rate=0.001, depth=4,
+                 max_near_duplicates=3, max_per_sender=5):
+        self.window = window
+        self.max_near_duplicates = max_near_duplicates
+        self.max_per_sender = max_per_sender
+        self.accepted = 0
+        self.rejected = {'duplicate': 0, 'near_duplicate': 0, 'sender': 0}
+        # About two counters per key in each row keeps a new key's estimate at zero
+        band_width = 1 << (2 * capacity * BANDS - 1).bit_length()
+        sender_width = 1 << (2 * capacity - 1).bit_length()
+        self._seen = [BloomFilter(capacity, error_rate) for _ in range(2)]
+        self._bands = [CountMinSketch(band_width, depth) for _ in range(2)]
+        self._senders = [CountMinSketch(sender_width, depth) for _ in range(2)]
+        self._rotated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def init_app(self, portfolio_app, contact):
+        server = portfolio_app.app.server
+        server.extensions['spam_filter'] = self
+        server.add_url_rule('/_stats/spam', 'spam_stats', self.report)
+        contact.add_filter(self.check)
+
+    def report(self):
+        return flask.jsonify(accepted=self.accepted, rejected=self.rejected, memory_bytes=self.memory_bytes())
+
+    def memory_bytes(self):
+        sketches = self._bands + self._senders
+        return sum(len(bloom.bits) for bloom in self._seen) + sum(len(sketch.counters) for sketch in sketches)
+
+    def check(self, name, email, message):
+        words = normalize(message)
+        text = ' '.join(words).encode('utf-8')
+        bands = band_keys(words)
+        sender = email.lower().encode('utf-8')
+        with self._lock:
+            self._rotate()
+            if any(text in generation for generation in self._seen):
+                return self._reject('duplicate', DUPLICATE)
+            # Counts include this message; nothing is remembered until it is
+            # accepted, so a rejected message can be sent again once allowed
+            if max(self._count(self._bands, band) for band in bands) + 1 > self.max_near_duplicates:
+                return self._reject('near_duplicate', FLOOD)
+            if self._count(self._senders, sender) + 1 > self.max_per_sender:
+                return self._reject('sender', FLOOD)
+            self._seen[0].add(text)
+            for band in bands:
+                self._bands[0].add(band)
+            self._senders[0].add(sender)
+            self.accepted += 1
+        return None
+
+    @staticmethod
+    def _count(generations, key):
+        return sum(sketch.estimate(key) for sketch in generations)
+
+    def _reject(self, reason, text):
+        self.rejected[reason] += 1
+        return text
+
+    def _rotate(self):
+        now = time.monotonic()
+        if now - self._rotated < self.window:
+            return
+        # Two windows idle: forget both generations, not just the older one
+        expired = 2 if now - self._rotated >= 2 * self.window else 1
+        for generations in (self._seen, self._bands, self._senders):
+            generations.reverse()
+            generations[0].clear()
+            if expired == 2:
+                generations[1].clear()
+        self._rotated = now
@@ -0,0 +1,487 @@
+import functools
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import dash
+import flask
+from dash import html, dcc
+from dash.dependencies import Input, Output
+from plotly.utils import PlotlyJSONEncoder
+
+from contact import (EMAIL_ID, FEEDBACK_ID, MESSAGE_ID, NAME_ID, STATUS_ID, SUBMISSION_ID,
+                     SUBMIT_ID)
+from cv import content_sections
+
+THEME_COOKIE = 'portfolio_theme'
+
+# A slot marker either fills a whole JSON value ("__slot__name__" with quotes)
+# or is spliced into a string such as a className (__slot__name__ without)
+SLOT_PATTERN = re.compile(r'"__slot__(\w+)__"|__slot__(\w+)__')
+
+
+def slot(name):
+    return f'__slot__{name}__'
+
+
+@dataclass
+class Theme:
+    """Class strings that distinguish one portfolio look from another.
+
+    The defaults are the monochrome No.1 look; themes only override what
+    differs. ``layout`` picks the top navigation bar or the fixed sidebar.
+    """
+    layout: str = 'topbar'
+    page: str = ''
+    page_style: Dict[str, str] = field(default_factory=dict)
+    nav: str = 'border-b border-gray-200'
+    nav_inner: str = 'container mx-auto py-6 flex items-center justify-between'
+    brand: str = 'text-2xl font-bold text-white bg-black px-3 py-1 rounded-full mr-4'
+    nav_link: str = 'mx-3 text-gray-700 hover:text-black'
+    nav_icon: str = 'mr-2'
+    content: str = 'min-h-screen'
+    hero: str = 'flex items-center justify-center min-h-screen'
+    hero_inner: str = 'text-center max-w-2xl mx-auto'
+    h1: str = 'text-6xl font-bold mb-4'
+    lead: str = 'text-2xl text-gray-600 mb-8'
+    button_primary: str = 'px-8 py-3 bg-black text-white rounded-full mr-4 hover:bg-gray-800'
+    button_secondary: str = 'px-8 py-3 border-2 border-black text-black rounded-full hover:bg-black hover:text-white'
+    section: str = 'container mx-auto py-20'
+    h2: str = 'text-4xl font-bold text-center mb-16'
+    grid: str = 'grid md:grid-cols-2 gap-8'
+    card: str = 'p-8 border border-gray-200 rounded-lg hover:shadow-lg transition-all'
+    card_icon: str = 'text-5xl mb-6 text-black'
+    card_title: str = 'text-2xl font-bold mb-4'
+    card_text: str = 'text-gray-600 mb-6'
+    tags: str = 'flex flex-wrap'
+    tag: str = 'bg-gray-100 px-3 py-1 rounded-full text-sm mr-2 mb-2'
+    form: str = 'bg-white p-8 border border-gray-200 rounded-lg shadow-lg'
+    input: str = 'input input-bordered w-full mb-4'
+    footer: str = 'bg-gray-100 py-8 text-center text-gray-500'
+
+
+THEMES = {
+    'minimal': Theme(),
+    'quantum': Theme(
+        nav='border-b border-gray-200 shadow-sm',
+        brand='text-2xl font-bold text-white bg-red-500 px-3 py-1 rounded-full mr-4',
+        nav_link='mx-3 text-blue-600 hover:text-yellow-500 transition duration-300',
+        h1='text-6xl font-bold mb-4 text-blue-600',
+        lead='text-2xl text-red-500 mb-8',
+        button_primary='px-8 py-3 bg-blue-600 text-white rounded-full hover:bg-red-500 transition duration-300 mr-4',
+        button_secondary='px-8 py-3 border-2 border-yellow-500 text-yellow-500 rounded-full '
+                         'hover:bg-yellow-500 hover:text-white transition duration-300',
+        h2='text-4xl font-bold text-center mb-16 text-blue-600',
+        card_icon='text-5xl mb-6 text-red-500',
+        card_title='text-2xl font-bold mb-4 text-red-500',
+        card_text='text-yellow-500 mb-6',
+        tag='bg-blue-100 text-blue-600 px-3 py-1 rounded-full text-sm mr-2 mb-2'
+    ),
+    'creative': Theme(
+        layout='sidebar',
+        page='flex',
+        nav='fixed left-0 top-0 h-full w-64 bg-white border-r border-yellow-200 shadow-lg',
+        nav_inner='p-6 space-y-2',
+        brand='block text-2xl font-bold text-red-600 text-center mb-6',
+        nav_link='block py-2 px-4 hover:bg-yellow-100',
+        nav_icon='mr-3 text-blue-500',
+        content='ml-64 bg-gray-50 min-h-screen p-8 w-full',
+        hero='container mx-auto px-4 py-20',
+        hero_inner='text-center',
+        h1='text-5xl font-bold mb-6 text-red-600',
+        lead='text-xl text-blue-500 mb-8',
+        button_primary='px-6 py-3 bg-blue-600 text-white rounded-full hover:bg-red-600 transition duration-300 mr-4',
+        button_secondary='px-6 py-3 border-2 border-yellow-500 text-yellow-500 rounded-full '
+                         'hover:bg-yellow-500 hover:text-white transition duration-300',
+        section='container mx-auto py-20',
+        h2='text-4xl font-bold text-center mb-12 text-blue-600',
+        grid='grid md:grid-cols-2 gap-6',
+        card='p-6 bg-white rounded-lg shadow-md hover:shadow-xl transition duration-300',
+        card_icon='text-4xl mb-4 text-red-600',
+        card_title='text-2xl font-semibold mb-4 text-blue-600',
+        card_text='text-gray-700 mb-4',
+        tags='',
+        tag='bg-yellow-100 text-red-600 px-3 py-1 rounded-full mr-2 text-sm',
+        form='bg-white p-6 rounded-lg shadow-md',
+        input='w-full px-4 py-2 border rounded-lg focus:outline-none focus:border-red-600 mb-4',
+        footer='mt-12 text-center text-blue-500'
+    ),
+    'cyber': Theme(
+        layout='sidebar',
+        page='min-h-screen text-white',
+        page_style={'background': 'linear-gradient(135deg, #0f0c29, #302b63, #24243e)'},
+        nav='fixed left-0 top-0 h-full w-64 bg-black/50 backdrop-blur-lg',
+        nav_inner='p-6 space-y-2',
+        brand='block text-4xl font-bold text-white text-center mb-12',
+        nav_link='block py-3 px-4 text-white hover:bg-purple-800 rounded-lg',
+        nav_icon='mr-3',
+        content='ml-64 p-12',
+        hero='py-20',
+        hero_inner='text-center',
+        h1='text-5xl font-bold text-center mb-8',
+        lead='text-lg text-center mb-8',
+        button_primary='px-8 py-3 bg-purple-800 text-white rounded-lg mr-4',
+        button_secondary='px-8 py-3 border-2 border-white text-white rounded-lg',
+        section='',
+        h2='text-4xl font-bold mb-6',
+        grid='',
+        card='border p-4 rounded-lg mb-4',
+        card_icon='text-3xl',
+        card_title='text-2xl',
+        card_text='',
+        tags='text-sm text-gray-400',
+        tag='mr-2',
+        form='p-4 border rounded-lg',
+        input='w-full p-2 mb-4 text-black rounded',
+        footer='mt-12 text-center text-gray-400'
+    ),
+    'geometric': Theme(
+        layout='sidebar',
+        page='min-h-screen',
+        page_style={'backgroundColor': '#f4f4f6'},
+        nav='fixed left-0 top-0 h-full w-64 bg-white border-r',
+        nav_inner='p-6 space-y-2',
+        brand='text-white text-2xl font-bold bg-black rounded-lg w-20 h-20 flex items-center justify-center mx-auto mb-12',
+        nav_link='block py-3 px-4 hover:bg-gray-100 rounded-lg',
+        nav_icon='mr-3',
+        content='ml-64 p-12',
+        hero='max-w-2xl mx-auto text-center mt-24',
+        hero_inner='',
+        h1='text-5xl font-bold mb-6 text-center',
+        lead='text-xl text-gray-600 text-center mb-12',
+        button_primary='px-8 py-3 bg-blue-500 text-white rounded-lg hover:bg-blue-600 transition duration-300 mr-4',
+        button_secondary='px-8 py-3 border-2 border-red-500 text-red-500 rounded-lg '
+                         'hover:bg-red-500 hover:text-white transition duration-300',
+        section='',
+        h2='text-4xl font-bold text-center mb-12 text-gray-800',
+        grid='grid grid-cols-1 md:grid-cols-2 gap-8',
+        card='p-6 rounded-lg shadow-lg border border-blue-300 mb-8',
+        card_icon='text-4xl mb-4 text-blue-500',
+        card_title='text-2xl font-bold mb-2 text-blue-700',
+        card_text='text-gray-600 mb-2',
+        tags='text-center',
+        tag='text-sm text-gray-500 mr-2',
+        form='p-6 rounded-lg shadow-lg border border-gray-300',
+        input='w-full p-2 border rounded-lg mb-4',
+        footer='mt-12 text-center text-gray-500'
+    )
+}
+
+
+@dataclass
+class Content:
+    """The theme-independent content model every variant shares."""
+    name: str
+    tagline: str = ''
+    projects: List[dict] = field(default_factory=list)
+    services: List[dict] = field(default_factory=list)
+    experiences: List[dict] = field(default_factory=list)
+    skills: Dict[str, List[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_portfolio_app(cls, portfolio_app, tagline=''):
+        # The same sections the CV is built from, whether the variant keeps
+        # them on a PortfolioConfig or inline (No.2-4)
+        return cls(name=portfolio_app.app.title, tagline=tagline, **content_sections(portfolio_app))
+
+
+class Fragment(str):
+    """JSON text that is spliced into a template as-is."""
+
+
+def fragment_list(fragments):
+    return Fragment('[' + ','.join(fragments) + ']')
+
+
+class CompiledTemplate:
+    """A component tree serialized once, with slots left open for content.
+
+    Binding is string concatenation over the precompiled JSON chunks, so no
+    Dash components are constructed or serialized at request time.
+    """
+
+    def __init__(self, component):
+        source = json.dumps(component, cls=PlotlyJSONEncoder)
+        self._chunks = []
+        self._slots = []
+        position = 0
+        for match in SLOT_PATTERN.finditer(source):
+            self._chunks.append(source[position:match.start()])
+            whole, inline = match.groups()
+            self._slots.append((whole or inline, whole is not None))
+            position = match.end()
+        self._chunks.append(source[position:])
+
+    def bind(self, **values):
+        out = [self._chunks[0]]
+        for (name, whole), chunk in zip(self._slots, self._chunks[1:]):
+            value = values[name]
+            if isinstance(value, Fragment):
+                out.append(value)
+            elif whole:
+                out.append(json.dumps(value))
+            else:
+                out.append(json.dumps(str(value))[1:-1])
+            out.append(chunk)
+        return Fragment(''.join(out))
+
+
+# Every themed route: path, navigation label, icon and the content section it needs
+ROUTES = [
+    ('/', 'Home', 'fas fa-home', None),
+    ('/projects', 'Projects', 'fas fa-project-diagram', 'projects'),
+    ('/services', 'Services', 'fas fa-cloud', 'services'),
+    ('/experience', 'Experience', 'fas fa-briefcase', 'experiences'),
+    ('/skills', 'Skills', 'fas fa-code', 'skills'),
+    ('/contact', 'Contact', 'fas fa-envelope', None)
+]
+
+
+def _templates(theme, routes):
+    """Component trees for one theme, with slot markers in place of content."""
+    nav_links = [
+        html.A([html.I(className=f"{icon} {theme.nav_icon}"), label], href=path, className=theme.nav_link)
+        for path, label, icon, _ in routes
+    ]
+    if theme.layout == 'sidebar':
+        chrome = [
+            html.Div(html.Div([html.A(slot('name'), href='/', className=theme.brand)] + nav_links,
+                              className=theme.nav_inner), className=theme.nav),
+            html.Div([
+                html.Div(slot('page')),
+                html.Footer(slot('name'), className=theme.footer)
+            ], className=theme.content)
+        ]
+    else:
+        chrome = [
+            html.Nav(html.Div([
+                html.A(slot('name'), href='/', className=theme.brand),
+                html.Div(nav_links, className='inline-block')
+            ], className=theme.nav_inner), className=theme.nav),
+            html.Div(slot('page'), className=theme.content),
+            html.Footer(slot('name'), className=theme.footer)
+        ]
+
+    def section(title, children):
+        return html.Div(html.Div([
+            html.H2(title, className=theme.h2),
+            html.Div(children, className=theme.grid)
+        ], className=theme.section))
+
+    return {
+        'shell': html.Div(chrome, className=theme.page, style=theme.page_style or None),
+        'home': html.Div(html.Div([
+            html.H1(slot('name'), className=theme.h1),
+            html.P(slot('tagline'), className=theme.lead),
+            html.Div([
+                html.A("View Projects", href='/projects', className=theme.button_primary),
+                html.A("Download CV", href='/cv.pdf', className=theme.button_secondary)
+            ])
+        ], className=theme.hero_inner), className=theme.hero),
+        'projects': section("Projects", slot('cards')),
+        'project_card': html.Div([
+            html.I(className=f"{slot('icon')} {theme.card_icon}"),
+            html.H3(slot('name'), className=theme.card_title),
+            html.P(slot('description'), className=theme.card_text),
+            html.Div(slot('tags'), className=theme.tags)
+        ], className=theme.card),
+        'tag': html.Span(slot('text'), className=theme.tag),
+        'services': section("Services", slot('cards')),
+        'service_card': html.Div([
+            html.I(className=f"{slot('icon')} {theme.card_icon}"),
+            html.H3(slot('name'), className=theme.card_title),
+            html.P(slot('description'), className=theme.card_text)
+        ], className=theme.card),
+        'experience': section("Experience", slot('cards')),
+        'experience_card': html.Div([
+            html.H3(slot('role'), className=theme.card_title),
+            html.P(slot('company'), className=theme.card_text),
+            html.P(slot('duration'), className=theme.card_text),
+            html.Ul(slot('highlights'))
+        ], className=theme.card),
+        'highlight': html.Li(slot('text')),
+        'skills': section("Skills", slot('cards')),
+        'skill_card': html.Div([
+            html.H3(slot('category'), className=theme.card_title),
+            html.Div(slot('tags'), className=theme.tags)
+        ], className=theme.card),
+        # The ids ContactForm wires its validation and submission to
+        'contact': section("Get In Touch", html.Div([
+            dcc.Input(id=NAME_ID, placeholder="Your Name", className=theme.input),
+            dcc.Input(id=EMAIL_ID, placeholder="Your Email", type="email", className=theme.input),
+            dcc.Textarea(id=MESSAGE_ID, placeholder="Your Message", className=theme.input),
+            html.P(id=FEEDBACK_ID, className=theme.card_text),
+            html.Button("Send Message", id=SUBMIT_ID, type="button", disabled=True, className=theme.button_primary),
+            html.P(id=STATUS_ID, className=theme.card_text),
+            dcc.Store(id=SUBMISSION_ID)
+        ], className=theme.form))
+    }
+
+
+class ThemeEngine:
+    """Compiles every theme once and binds the shared content into them.
+
+    ``render`` memoizes the bound page per (theme, route), so switching theme
+    for a request costs a dictionary lookup. Unknown paths render the home
+    page and share its entry, which keeps the memo at themes x routes.
+    """
+
+    def __init__(self, content, themes=None):
+        self.content = content
+        self.themes = themes or THEMES
+        self.routes = [route for route in ROUTES if route[3] is None or getattr(content, route[3])]
+        self._pages = {path: self._binder(path, section) for path, _, _, section in self.routes}
+        self._compiled = {
+            name: {key: CompiledTemplate(tree) for key, tree in _templates(theme, self.routes).items()}
+            for name, theme in self.themes.items()
+        }
+        self._rendered = {}
+
+    def render(self, theme_name, pathname):
+        key = (theme_name, self.route(pathname))
+        page = self._rendered.get(key)
+        if page is None:
+            page = self._rendered[key] = json.loads(self.bind(theme_name, pathname))
+        return page
+
+    def route(self, pathname):
+        return pathname if pathname in self._pages else '/'
+
+    def bind(self, theme_name, pathname):
+        templates = self._compiled[theme_name]
+        page = self._pages[self.route(pathname)](templates)
+        return templates['shell'].bind(name=self.content.name, page=page)
+
+    def _binder(self, path, section):
+        content = self.content
+        if path == '/contact':
+            return lambda templates: templates['contact'].bind()
+        if section is None:
+            return lambda templates: templates['home'].bind(name=content.name, tagline=content.tagline)
+        if section == 'projects':
+            return lambda templates: templates['projects'].bind(cards=fragment_list(
+                templates['project_card'].bind(
+                    icon=project.get('icon', ''),
+                    name=project['name'],
+                    description=project['description'],
+                    tags=fragment_list(templates['tag'].bind(text=tech) for tech in project['technologies'])
+                ) for project in content.projects
+            ))
+        if section == 'skills':
+            return lambda templates: templates['skills'].bind(cards=fragment_list(
+                templates['skill_card'].bind(
+                    category=category,
+                    tags=fragment_list(templates['tag'].bind(text=name) for name in names)
+                ) for category, names in content.skills.items()
+            ))
+        if section == 'services':
+            return lambda templates: templates['services'].bind(cards=fragment_list(
+                templates['service_card'].bind(
+                    icon=service.get('icon', ''),
+                    name=service['name'],
+                    description=service['description']
+                ) for service in content.services
+            ))
+        return lambda templates: templates['experience'].bind(cards=fragment_list(
+            templates['experience_card'].bind(
+                role=exp['role'],
+                company=exp['company'],
+                duration=exp['duration'],
+                highlights=fragment_list(
+                    templates['highlight'].bind(text=text)
+                    for text in exp.get('highlights') or [exp.get('description', '')]
+                )
+            ) for exp in content.experiences
+        ))
+
+
+class ThemedPortfolioApp:
+    """One Dash app serving the shared content in every registered theme.
+
+    The theme comes from ``?theme=`` (remembered in a cookie) and otherwise
+    from the cookie, falling back to ``default_theme``.
+
+    This is a standalone preview, not part of a variant's main.py: the
+    components there cache one rendering per URL and content version, while
+    here the same URL renders differently per visitor. Run
+    ``python ../Imps/themes.py`` from a variant directory to serve that
+    variant's content in every theme, with the contact form going through
+    ContactForm, SpamFilter and MailDelivery as it does in main.py.
+    ``page_routes`` renders each route in the requesting visitor's theme.
+    """
+
+    def __init__(self, content, server=None, default_theme='minimal', themes=None):
+        if server is None:
+            server = flask.Flask(__name__)
+
+        self.content = content
+        self.engine = ThemeEngine(content, themes)
+        self.default_theme = default_theme
+
+        self.app = dash.Dash(
+            __name__,
+            server=server,
+            external_stylesheets=[
+                "https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css",
+                "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0-beta3/css/all.min.css"
+            ],
+            meta_tags=[{"name": "viewport", "content": "width=device-width, initial-scale=1"}]
+        )
+        self.app.title = content.name
+        self.app.layout = html.Div([
+            html.Div(id='page-content'),
+            dcc.Location(id='url', refresh=False)
+        ])
+        self.page_routes = {path: functools.partial(self.page, path) for path, _, _, _ in self.engine.routes}
+        self._register_callbacks()
+
+    def page(self, pathname, search=''):
+        return self.engine.render(self.theme_for_request(search)[0], pathname)
+
+    def theme_for_request(self, search=''):
+        requested = flask.request.args.get('theme') or _query_theme(search)
+        if requested in self.engine.themes:
+            return requested, True
+        cookie = flask.request.cookies.get(THEME_COOKIE)
+        return (cookie if cookie in self.engine.themes else self.default_theme), False
+
+    def _register_callbacks(self):
+        @self.app.callback(
+            Output('page-content', 'children'),
+            [Input('url', 'pathname'), Input('url', 'search')]
+        )
+        def display_page(pathname, search):
+            theme, explicit = self.theme_for_request(search)
+            if explicit:
+                dash.callback_context.response.set_cookie(THEME_COOKIE, theme, max_age=365 * 24 * 3600)
+            return self.engine.render(theme, pathname)
+
+
+def _query_theme(search):
+    for pair in (search or '').lstrip('?').split('&'):
+        key, _, value = pair.partition('=')
+        if key == 'theme':
+            return value
+    return None
+
+
+if __name__ == '__main__':
+    # Run from a variant directory to serve its content in every theme
+    import os
+    import sys
+
+    from contact import ContactForm
+    from mailer import MailDelivery
+    from spam_filter import SpamFilter
+
+    sys.path.insert(0, os.getcwd())
+    from App import PortfolioApp
+
+    themed = ThemedPortfolioApp(Content.from_portfolio_app(PortfolioApp()))
+    themed.app.server.config.from_prefixed_env('PORTFOLIO')
+    contact = ContactForm()
+    contact.init_app(themed, variant='themes')
+    SpamFilter().init_app(themed, contact)
+    MailDelivery().init_app(themed, contact)
+    themed.app.run(debug=True)
@@ -0,0 +1,458 @@
+import atexit
+import collections
+import contextlib
+import contextvars
+import functools
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import flask
+
+from readiness import WARMUP_HEADER
+from wsgi_body import ClosingBody
+
+# Forces sampling of a request when it carries the configured TRACE_TOKEN,
+# e.g. curl -H "X-Portfolio-Trace: $PORTFOLIO_TRACE_TOKEN"
+TRACE_HEADER = 'X-Portfolio-Trace'
+
+DASH_UPDATE_PATH = '_dash-update-component'
+
+# Kept in the WSGI environ rather than flask.g: a test_request_context
+# pushed during the request (e.g. to build the shell) shares g and runs
+# the teardown hooks when it is popped
+HANDLER_ENVIRON_KEY = 'portfolio.trace_handler'
+
+_current = contextvars.ContextVar('portfolio_span', default=None)
+
+
+class Span:
+    __slots__ = ('tracer', 'trace_id', 'span_id', 'parent_id', 'name', 'attributes', 'events',
+                 'start_ns', 'end_ns', '_started')
+
+    def __init__(self, tracer, trace_id, parent_id, name, attributes):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.events = []
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._started = time.perf_counter_ns()
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = self.start_ns + time.perf_counter_ns() - self._started
+            self.tracer.record(self)
+
+    def as_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration_ms': round((self.end_ns - self.start_ns) / 1e6, 3),
+            'attributes': self.attributes,
+            'events': [{'ts_ns': ts, 'name': name, 'attributes': attrs} for ts, name, attrs in self.events]
+        }
+
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """A child of the current span; does nothing when the request is not sampled."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.tracer, parent.trace_id, parent.span_id, name, attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.attributes['error'] = repr(exc)
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+def traced(name, **attributes):
+    """Decorator form of ``span``."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return function(*args, **kwargs)
+            with span(name, **attributes):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_event(name, **attributes):
+    """Attach a point-in-time event, such as a cache lookup, to the current span."""
+    current = _current.get()
+    if current is not None:
+        current.events.append((time.time_ns(), name, attributes))
+
+
+class FileSpanExporter:
+    """Appends finished spans to a JSON-lines file.
+
+    Like the access log, the file is rotated once it reaches ``max_bytes``,
+    keeping ``backups`` old files.
+    """
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def export(self, spans):
+        lines = ''.join(json.dumps(item.as_dict(), separators=(',', ':')) + '\n' for item in spans)
+        with open(self.path, 'a', encoding='utf-8') as handle:
+            handle.write(lines)
+            size = handle.tell()
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            source = f'{self.path}.{index}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.path}.{index + 1}')
+        try:
+            if self.backups:
+                os.replace(self.path, f'{self.path}.1')
+            else:
+                os.remove(self.path)
+        except FileNotFoundError:
+            # Another worker sharing the file rotated it first
+            pass
+
+
+class OTLPJSONExporter:
+    """Posts spans as OTLP/HTTP JSON, e.g. to ``python tracing.py collect``."""
+
+    def __init__(self, endpoint='http://127.0.0.1:4318/v1/traces', service_name='portfolio', timeout=2.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans):
+        body = {
+            'resourceSpans': [{
+                'resource': {'attributes': _otlp_attributes({'service.name': self.service_name})},
+                'scopeSpans': [{
+                    'scope': {'name': 'portfolio.tracing'},
+                    'spans': [_otlp_span(item) for item in spans]
+                }]
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint, json.dumps(body).encode('utf-8'), {'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def _otlp_span(item):
+    return {
+        'traceId': item.trace_id,
+        'spanId': item.span_id,
+        'parentSpanId': item.parent_id or '',
+        'name': item.name,
+        'kind': 2 if item.parent_id is None else 1,  # SERVER for the request, INTERNAL below it
+        'startTimeUnixNano': str(item.start_ns),
+        'endTimeUnixNano': str(item.end_ns),
+        'attributes': _otlp_attributes(item.attributes),
+        'events': [
+            {'timeUnixNano': str(ts), 'name': name, 'attributes': _otlp_attributes(attrs)}
+            for ts, name, attrs in item.events
+        ]
+    }
+
+
+def _otlp_attributes(attributes):
+    out = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            wrapped = {'boolValue': value}
+        elif isinstance(value, int):
+            wrapped = {'intValue': str(value)}
+        elif isinstance(value, float):
+            wrapped = {'doubleValue': value}
+        else:
+            wrapped = {'stringValue': str(value)}
+        out.append({'key': key, 'value': wrapped})
+    return out
+
+
+class Tracer:
+    """Sampled request tracing from the WSGI entry down to the page methods.
+
+    A sampled request gets a ``wsgi.request`` root span (until its body is
+    closed), ``flask.handler`` from the first before_request hook to the
+    after_request hooks, ``dash.dispatch`` around Dash's callback endpoint
+    and ``page.<method>`` around every page in ``portfolio_app.page_routes``.
+    Components add their own spans with ``span``/``traced`` and report cache
+    lookups as events; all of these are no-ops outside a sampled request.
+
+    ``sample_rate`` picks requests at random. Clients cannot raise it on
+    their own: an ``X-Portfolio-Trace`` header forces sampling only when it
+    carries server.config's TRACE_TOKEN, and a W3C ``traceparent`` with the
+    sampled flag only when TRACE_TRUST_PARENT is set (e.g. behind a proxy
+    that samples). Otherwise the parent's trace id is kept but its flag is
+    ignored. Forced samples are capped at ``max_forced_per_minute``. Finished
+    spans are buffered and exported in batches by a background thread, to
+    instance/traces.jsonl unless another exporter is given.
+    """
+
+    def __init__(self, exporter=None, sample_rate=0.01, capacity=10000, batch_size=512, flush_interval=1.0,
+                 max_forced_per_minute=60):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.max_forced_per_minute = max_forced_per_minute
+        self.token = None
+        self.trust_parent = False
+        self.forced = 0
+        self.forced_refused = 0
+        self._forced_window = (0, 0)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sampled = 0
+        self.dropped = 0
+        self.export_errors = 0
+        self._buffer = collections.deque(maxlen=capacity)
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+        self._lock = threading.Lock()
+        self._flush_at_exit = False
+
+    def init_app(self, portfolio_app):
+        dash_app = portfolio_app.app
+        server = dash_app.server
+        if self.exporter is None:
+            os.makedirs(server.instance_path, exist_ok=True)
+            self.exporter = FileSpanExporter(os.path.join(server.instance_path, 'traces.jsonl'))
+
+        # Components keep references to the page methods, so wrap them first
+        page_routes = getattr(portfolio_app, 'page_routes', None) or {}
+        for path, page in page_routes.items():
+            page_routes[path] = traced('page.' + getattr(page, '__name__', 'page'), route=path)(page)
+
+        dispatch_rule = dash_app.config.routes_pathname_prefix + DASH_UPDATE_PATH
+        for rule in server.url_map.iter_rules():
+            if rule.rule == dispatch_rule:
+                server.view_functions[rule.endpoint] = self._traced_dispatch(server.view_functions[rule.endpoint])
+
+        # PORTFOLIO_TRACE_TOKEN and PORTFOLIO_TRACE_TRUST_PARENT; read again for each generation
+        self.token = server.config.get('TRACE_TOKEN')
+        self.trust_parent = bool(server.config.get('TRACE_TRUST_PARENT', False))
+
+        server.extensions['tracer'] = self
+        server.wsgi_app = self.wrap(server.wsgi_app)
+        server.before_request(self._enter_handler)
+        server.after_request(self._leave_handler)
+        server.teardown_request(self._teardown_handler)
+        if not self._flush_at_exit:
+            # init_app runs again for every reloaded generation; flush once at exit
+            atexit.register(self.flush)
+            self._flush_at_exit = True
+
+    def wrap(self, wsgi_app):
+        def traced_app(environ, start_response):
+            root = self._start_trace(environ)
+            if root is None:
+                return wsgi_app(environ, start_response)
+
+            def traced_start_response(status, headers, exc_info=None):
+                root.attributes['http.status_code'] = int(status.split(' ', 1)[0])
+                return start_response(status, headers, exc_info)
+
+            token = _current.set(root)
+            try:
+                body = wsgi_app(environ, traced_start_response)
+            except BaseException:
+                root.end()
+                raise
+            finally:
+                _current.reset(token)
+
+            def finish(size):
+                root.attributes['http.response_size'] = size
+                root.end()
+            return ClosingBody(body, finish)
+        return traced_app
+
+    def record(self, item):
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(item)
+        self._ensure_worker()
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        batch = self._drain()
+        while batch:
+            self.exporter.export(batch)
+            batch = self._drain()
+
+    def _start_trace(self, environ):
+        if environ.get('HTTP_' + WARMUP_HEADER.upper().replace('-', '_')):
+            return None
+        trace_id = parent_id = None
+        forced = False
+        # W3C trace context: version-traceid-parentid-flags
+        parts = environ.get('HTTP_TRACEPARENT', '').split('-')
+        if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16 and _is_hex(parts[3]):
+            trace_id, parent_id = parts[1], parts[2]
+            forced = self.trust_parent and bool(int(parts[3], 16) & 1)
+        supplied = environ.get('HTTP_' + TRACE_HEADER.upper().replace('-', '_'))
+        if supplied and self.token:
+            forced = forced or hmac.compare_digest(supplied.encode('utf-8'), str(self.token).encode('utf-8'))
+        if not (forced and self._allow_forced()) and random.random() >= self.sample_rate:
+            return None
+        self.sampled += 1
+        root = Span(self, trace_id or os.urandom(16).hex(), None, 'wsgi.request', {
+            'http.method': environ.get('REQUEST_METHOD', ''),
+            'http.target': environ.get('PATH_INFO', '')
+        })
+        if parent_id is not None:
+            root.attributes['remote_parent_id'] = parent_id
+        return root
+
+    def _allow_forced(self):
+        # A fixed one-minute window per process; past the cap, forced requests
+        # fall back to the random sample
+        minute = int(time.monotonic() // 60)
+        with self._lock:
+            window, count = self._forced_window
+            if window != minute:
+                window, count = minute, 0
+            if count >= self.max_forced_per_minute:
+                self.forced_refused += 1
+                return False
+            self._forced_window = (window, count + 1)
+            self.forced += 1
+        return True
+
+    def _traced_dispatch(self, view):
+        @functools.wraps(view)
+        def dispatch(*args, **kwargs):
+            if _current.get() is None:
+                return view(*args, **kwargs)
+            body = flask.request.get_json(silent=True) or {}
+            with span('dash.dispatch', output=str(body.get('output', ''))):
+                return view(*args, **kwargs)
+        return dispatch
+
+    def _enter_handler(self):
+        parent = _current.get()
+        if parent is None:
+            return
+        handler = Span(self, parent.trace_id, parent.span_id, 'flask.handler', {})
+        flask.request.environ[HANDLER_ENVIRON_KEY] = (handler, _current.set(handler))
+
+    def _leave_handler(self, response):
+        handler = flask.request.environ.pop(HANDLER_ENVIRON_KEY, None)
+        if handler is not None:
+            item, token = handler
+            rule = flask.request.url_rule
+            item.attributes['http.route'] = rule.rule if rule is not None else ''
+            _current.reset(token)
+            item.end()
+        return response
+
+    def _teardown_handler(self, exc):
+        # after_request hooks do not run when the view raised
+        handler = flask.request.environ.pop(HANDLER_ENVIRON_KEY, None)
+        if handler is not None:
+            item, token = handler
+            if exc is not None:
+                item.attributes['error'] = repr(exc)
+            _current.reset(token)
+            item.end()
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        if self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            # Threads do not survive a fork, so each gunicorn worker starts its own
+            if self._worker_pid != pid or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='span-exporter', daemon=True)
+                self._worker_pid = pid
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # A missing collector must not kill the exporter; the batch is lost
+                self.export_errors += 1
+
+    def _drain(self):
+        batch = []
+        buffer = self._buffer
+        while buffer and len(batch) < self.batch_size:
+            try:
+                batch.append(buffer.popleft())
+            except IndexError:
+                break
+        return batch
+
+
+def _is_hex(value):
+    try:
+        int(value, 16)
+    except ValueError:
+        return False
+    return True
+
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        with open(self.server.output_path, 'a', encoding='utf-8') as handle:
+            for resource in body.get('resourceSpans', ()):
+                for scope in resource.get('scopeSpans', ()):
+                    for item in scope.get('spans', ()):
+                        handle.write(json.dumps(item, separators=(',', ':')) + '\n')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_collector(output_path, port=4318):
+    """A local stand-in for an OTLP/HTTP collector that appends spans to a file."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), _CollectorHandler)
+    server.output_path = output_path
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    # python tracing.py collect spans.jsonl [port]
+    if len(sys.argv) in (3, 4) and sys.argv[1] == 'collect':
+        run_collector(sys.argv[2], int(sys.argv[3]) if len(sys.argv) == 4 else 4318)
+    else:
+        sys.exit('usage: python tracing.py collect <output_path> [port]')
@@ -0,0 +1,126 @@
+import hashlib
+import inspect
+import json
+import os
+from dataclasses import dataclass
+from typing import Callable
+
+from plotly.utils import PlotlyJSONEncoder
+
+
+@dataclass
+class RouteConfig:
+    """One entry of a PortfolioApp's ``routes``: a path and the page method it renders."""
+    path: str
+    page: Callable
+    public: bool = True  # listed in sitemap.xml and prerendered for crawlers
+
+
+def route_providers(server):
+    """Components serving pages under a path prefix, such as /blog/<slug>.
+
+    Each has a ``prefix`` ending in a slash, ``page(pathname)`` returning a
+    page callable or None, ``public_paths()``, ``meta(pathname)`` returning
+    a title and description, and ``digest()``, which changes whenever any
+    of its pages does.
+    """
+    return server.extensions.setdefault('route_providers', [])
+
+
+def route_provider(server, pathname):
+    """The route provider whose prefix ``pathname`` falls under, or None."""
+    for provider in server.extensions.get('route_providers', ()):
+        if pathname.startswith(provider.prefix):
+            return provider
+    return None
+
+
+def provided_page(server, pathname):
+    """The page callable a route provider has for ``pathname``, or None."""
+    provider = route_provider(server, pathname)
+    return provider.page(pathname) if provider is not None else None
+
+
+def public_paths(portfolio_app):
+    """Paths of the routes meant for visitors and crawlers."""
+    routes = getattr(portfolio_app, 'routes', None)
+    if routes is not None:
+        paths = [route.path for route in routes if route.public]
+    else:
+        paths = list(getattr(portfolio_app, 'page_routes', None) or ('/',))
+    for provider in portfolio_app.app.server.extensions.get('route_providers', ()):
+        paths.extend(provider.public_paths())
+    return paths
+
+
+class ContentVersion:
+    """A hash of everything a visitor can see, and when it first appeared.
+
+    The hash covers the App.py source, the assets folder, the external
+    stylesheet and script URLs, the serialized layout, every public page
+    and the digest of every route provider. ``last_modified`` is the time this hash was
+    first seen by any worker, recorded as a marker file under the instance
+    folder, so it is stable across restarts and identical in every gunicorn
+    worker.
+
+    The hash is computed once, when the app is built, and never changes:
+    edited content reaches a running site through the ContentReloader,
+    which builds a new app and with it a new ContentVersion and new caches.
+    """
+
+    def __init__(self, state_dir=None):
+        self.state_dir = state_dir
+        self.hash = None
+        self.last_modified = None
+        self._portfolio_app = None
+
+    def init_app(self, portfolio_app):
+        server = portfolio_app.app.server
+        if self.state_dir is None:
+            self.state_dir = os.path.join(server.instance_path, 'versions')
+        os.makedirs(self.state_dir, exist_ok=True)
+        self._portfolio_app = portfolio_app
+        server.extensions['content_version'] = self
+        self.hash = self.compute(portfolio_app)
+        self.last_modified = self._first_seen(self.hash)
+
+    @staticmethod
+    def compute(portfolio_app):
+        dash_app = portfolio_app.app
+        sha = hashlib.sha256()
+        source = inspect.getsourcefile(type(portfolio_app))
+        if source:
+            with open(source, 'rb') as handle:
+                sha.update(handle.read())
+        assets_folder = dash_app.config.assets_folder
+        for root, dirs, files in os.walk(assets_folder):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                sha.update(os.path.relpath(path, assets_folder).encode('utf-8'))
+                with open(path, 'rb') as handle:
+                    sha.update(handle.read())
+        # Stylesheet and script URLs change when assets are re-vendored
+        sha.update(json.dumps([dash_app.config.external_stylesheets, dash_app.config.external_scripts]).encode('utf-8'))
+        with dash_app.server.test_request_context():
+            layout = dash_app.layout() if callable(dash_app.layout) else dash_app.layout
+            sha.update(json.dumps(layout, cls=PlotlyJSONEncoder).encode('utf-8'))
+            page_routes = getattr(portfolio_app, 'page_routes', None) or {}
+            for path in public_paths(portfolio_app):
+                if path in page_routes:
+                    sha.update(path.encode('utf-8'))
+                    sha.update(json.dumps(page_routes[path](), cls=PlotlyJSONEncoder).encode('utf-8'))
+        # Provider pages are not rendered here; their digest stands for them
+        for provider in dash_app.server.extensions.get('route_providers', ()):
+            sha.update(provider.prefix.encode('utf-8'))
+            sha.update(provider.digest().encode('utf-8'))
+        return sha.hexdigest()[:20]
+
+    def _first_seen(self, digest):
+        marker = os.path.join(self.state_dir, digest)
+        try:
+            os.close(os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            pass
+        # Whole seconds, as HTTP dates cannot carry more
+        return int(os.stat(marker).st_mtime)
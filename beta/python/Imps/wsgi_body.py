@@ -0,0 +1,27 @@
+"""A WSGI response body that reports its size once the server closes it."""
+
+
+class ClosingBody:
+    """Counts the bytes of a WSGI body and calls ``on_close(size)`` once it is closed.
+
+    WSGI servers call ``close()`` after the last chunk is sent, or when the
+    client goes away, so middleware measuring a whole response (access log,
+    A/B metrics, tracing) reports from here rather than when the app returns.
+    """
+
+    def __init__(self, body, on_close):
+        self._body = body
+        self._on_close = on_close
+        self._size = 0
+
+    def __iter__(self):
+        for chunk in self._body:
+            self._size += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self._body, 'close'):
+                self._body.close()
+        finally:
+            self._on_close(self._size)
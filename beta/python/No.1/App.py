@@ -1,3 +1,6 @@
+import os
+import sys
+
 import dash
 from dash import html, dcc
 from dash.dependencies import Input, Output, State
@@ -5,13 +8,27 @@ from dataclasses import dataclass, field
 from typing import List, Dict
 import flask
 
+# Shared page helpers live in Imps/, next to the variants
+IMPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Imps')
+if IMPS not in sys.path:
+    sys.path.append(IMPS)
+
+from analytics import analytics_page  # noqa: E402
+from blog import blog_page  # noqa: E402
+from projects import DetailStyle, ProjectDetails, ProjectSlug  # noqa: E402
+from version import RouteConfig  # noqa: E402
+
 @dataclass
-class ProjectConfig:
+class ProjectConfig(ProjectSlug):
     name: str
     description: str
     technologies: List[str]
     icon: str
     gradient: str
+    # Shown only on the project's own page, /projects/<slug>
+    write_up: List[str] = field(default_factory=list)
+    links: Dict[str, str] = field(default_factory=dict)
+    gallery: List[str] = field(default_factory=list)
 
 @dataclass
 class ServiceConfig:
@@ -84,6 +101,27 @@ class PortfolioApp:
         )
 
         self.app.title = "Rico Rodriguez"
+
+        # Every page route in one place: display_page, warm-up, the crawler
+        # cache and sitemap.xml all read it
+        self.routes = [
+            RouteConfig('/', self.home_page),
+            RouteConfig('/projects', self.projects),
+            RouteConfig('/blog', blog_page),
+            RouteConfig('/services', self.services_page),
+            RouteConfig('/contact', self.contact_page),
+            RouteConfig('/analytics', analytics_page, public=False)
+        ]
+        self.page_routes = {route.path: route.page for route in self.routes}
+        # /projects/<slug> detail pages; each is rendered on its first visit
+        # rather than at start-up, and display_page routes to them
+        self.project_details = {project.slug: project for project in self.config.projects}
+        self.project_route = ProjectDetails(self.project_details, DetailStyle(
+            back="text-sm text-gray-700 hover:text-black",
+            title="text-4xl font-bold mt-4 mb-4",
+            tag="bg-gray-100 px-3 py-1 rounded-full text-sm mr-2 mb-2",
+            link="px-6 py-2 bg-black text-white rounded-full hover:bg-gray-800"
+        )).route
         self.app.layout = self._create_layout()
         self._register_callbacks()
 
@@ -97,6 +135,7 @@ class PortfolioApp:
                         html.Div([
                             html.A("Home", href="/", className="mx-3 text-gray-700 hover:text-black fas fa-code"),
                             html.A("Projects", href="/projects", className="mx-3 text-gray-700 hover:text-black fas fa-atom"),
+                            html.A("Blog", href="/blog", className="mx-3 text-gray-700 hover:text-black fas fa-blog"),
                             html.A("Services", href="/services", className="mx-3 text-gray-700 hover:text-black fas fa-cloud"),
                             html.A("Contact", href="/contact", className="mx-3 text-gray-700 hover:text-black fas fa-phone")
                         ], className="inline-block")
@@ -130,13 +169,9 @@ class PortfolioApp:
             [Input('url', 'pathname')]
         )
         def display_page(pathname):
-            page_routes = {
-                '/': self.home_page,
-                '/projects': self.projects,
-                '/services': self.services_page,
-                '/contact': self.contact_page
-            }
-            return page_routes.get(pathname, self.home_page)()
+            # project_route takes any pathname, including None before the URL is known
+            page = self.page_routes.get(pathname) or self.project_route(pathname)
+            return (page or self.home_page)()
 
     def home_page(self):
         return html.Div([
@@ -149,7 +184,7 @@ class PortfolioApp:
                     html.Div([
                         html.A("View Projects", href="/projects",
                                className="px-8 py-3 bg-black text-white rounded-full mr-4 hover:bg-gray-800 fas fa-code"),
-                        html.A("Download CV", href="#",
+                        html.A("Download CV", href="/cv.pdf",
                                className="px-8 py-3 border-2 border-black text-black rounded-full hover:bg-black hover:text-white fas fa-download")
                     ])
                 ], className="text-center max-w-2xl mx-auto")
@@ -166,6 +201,7 @@ class PortfolioApp:
                             html.I(className=f"{project.icon} text-5xl mb-6 bg-clip-text text-transparent bg-gradient-to-r {project.gradient}"),
                             html.H3(project.name, className="text-2xl font-bold mb-4"),
                             html.P(project.description, className="text-gray-600 mb-6"),
+                            html.A("Details →", href=f"/projects/{project.slug}", className="inline-block mb-4 text-gray-700 hover:text-black"),
                             html.Div([
                                 html.Span(tech, className="bg-gray-100 px-3 py-1 rounded-full text-sm mr-2 mb-2")
                                 for tech in project.technologies
@@ -200,11 +236,15 @@ class PortfolioApp:
                     dcc.Input(id='contact-name', placeholder="Your Name", className="input input-bordered w-full mb-4"),
                     dcc.Input(id='contact-email', placeholder="Your Email", type="email", className="input input-bordered w-full mb-4"),
                     dcc.Textarea(id='contact-message', placeholder="Your Message", className="textarea textarea-bordered w-full mb-4"),
-                    html.Button("Send Message", id='send-button', className="px-8 py-3 border-2 border-black text-black rounded-full hover:bg-black hover:text-white fas fa-message")
+                    html.P(id='contact-feedback', className="text-sm text-red-600 mb-4"),
+                    html.Button("Send Message", id='send-button', disabled=True, className="px-8 py-3 border-2 border-black text-black rounded-full hover:bg-black hover:text-white fas fa-message"),
+                    html.P(id='contact-status', className="text-gray-600 mt-4"),
+                    dcc.Store(id='contact-submission')
                 ], className="bg-white p-8 border border-gray-200 rounded-lg shadow-lg")
             ], className="container mx-auto py-20")
         ])
 
+
 if __name__ == "__main__":
     app = PortfolioApp()
     app.app.run_server(debug=False)
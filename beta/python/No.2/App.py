@@ -1,8 +1,55 @@
+import os
+import sys
+
 import dash
 from dash import html, dcc
 from dash.dependencies import Input, Output
+from dataclasses import dataclass, field
+from typing import Dict, List
 import flask
 
+# Shared page helpers live in Imps/, next to the variants
+IMPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Imps')
+if IMPS not in sys.path:
+    sys.path.append(IMPS)
+
+from analytics import analytics_page  # noqa: E402
+from blog import blog_page  # noqa: E402
+from projects import DetailStyle, ProjectDetails, ProjectSlug  # noqa: E402
+from version import RouteConfig  # noqa: E402
+
+@dataclass
+class ProjectConfig(ProjectSlug):
+    name: str
+    description: str
+    technologies: List[str]
+    link: str
+    # Shown only on the project's own page, /projects/<slug>
+    write_up: List[str] = field(default_factory=list)
+    links: Dict[str, str] = field(default_factory=dict)
+    gallery: List[str] = field(default_factory=list)
+
+PROJECTS = [
+    ProjectConfig(
+        name="Project 1",
+        description="A web application for task management",
+        technologies=["Python", "Dash", "Bootstrap"],
+        link="#"
+    ),
+    ProjectConfig(
+        name="Project 2",
+        description="Machine learning recommendation system",
+        technologies=["Python", "scikit-learn", "Pandas"],
+        link="#"
+    )
+]
+
+SKILLS = {
+    "Programming Languages": ["Python", "JavaScript", "Java"],
+    "Web Technologies": ["Dash", "Flask", "React"],
+    "Data Science": ["Pandas", "NumPy", "scikit-learn"]
+}
+
 class PortfolioApp:
     def __init__(self, server=None):
         # If no server is provided, create a new Flask server
@@ -25,6 +72,29 @@ class PortfolioApp:
 
         self.app.title = "Colorful Developer Portfolio"
 
+        # Every page route in one place: display_page, warm-up, the crawler
+        # cache and sitemap.xml all read it
+        self.routes = [
+            RouteConfig('/', self.home_page),
+            RouteConfig('/home', self.home_page, public=False),
+            RouteConfig('/projects', self.projects_page),
+            RouteConfig('/blog', blog_page),
+            RouteConfig('/skills', self.skills_page),
+            RouteConfig('/contact', self.contact_page),
+            RouteConfig('/analytics', analytics_page, public=False)
+        ]
+        self.page_routes = {route.path: route.page for route in self.routes}
+        # /projects/<slug> detail pages; each is rendered on its first visit
+        # rather than at start-up, and display_page routes to them
+        self.project_details = {project.slug: project for project in PROJECTS}
+        # Skills by category; the CV and the themed preview read them too
+        self.skills = SKILLS
+        self.project_route = ProjectDetails(self.project_details, DetailStyle(
+            back="text-sm text-blue-600 hover:text-red-600",
+            title="text-4xl font-bold mt-4 mb-4 text-red-600",
+            tag="bg-yellow-100 text-blue-600 px-3 py-1 rounded-full text-sm mr-2 mb-2",
+            link="btn btn-primary bg-blue-500 hover:bg-blue-600 text-white"
+        )).route
         self.app.layout = self.create_layout()
         self.register_callbacks()
 
@@ -50,6 +120,10 @@ class PortfolioApp:
                             html.I(className="fas fa-project-diagram mr-2 text-yellow-300"),
                             "Projects"
                         ], href="/projects")),
+                        html.Li(html.A([
+                            html.I(className="fas fa-blog mr-2 text-yellow-300"),
+                            "Blog"
+                        ], href="/blog")),
                         html.Li(html.A([
                             html.I(className="fas fa-code mr-2 text-blue-300"),
                             "Skills"
@@ -75,15 +149,9 @@ class PortfolioApp:
             [Input('url', 'pathname')]
         )
         def display_page(pathname):
-            if pathname == "/" or pathname == "/home":
-                return self.home_page()
-            elif pathname == "/projects":
-                return self.projects_page()
-            elif pathname == "/skills":
-                return self.skills_page()
-            elif pathname == "/contact":
-                return self.contact_page()
-            return self.home_page()
+            # project_route takes any pathname, including None before the URL is known
+            page = self.page_routes.get(pathname) or self.project_route(pathname)
+            return (page or self.home_page)()
 
     def home_page(self):
         return html.Div(className="hero min-h-screen", children=[
@@ -103,44 +171,26 @@ class PortfolioApp:
         ])
 
     def projects_page(self):
-        projects = [
-            {
-                "name": "Project 1",
-                "description": "A web application for task management",
-                "technologies": ["Python", "Dash", "Bootstrap"],
-                "link": "#"
-            },
-            {
-                "name": "Project 2",
-                "description": "Machine learning recommendation system",
-                "technologies": ["Python", "scikit-learn", "Pandas"],
-                "link": "#"
-            }
-        ]
-
         return html.Div(className="p-4", children=[
             html.H2("My Projects", className="text-3xl font-bold mb-4 text-red-600"),
             html.Div(className="grid grid-cols-1 md:grid-cols-2 gap-4", children=[
                 html.Div(className="card bg-white shadow-lg rounded-lg border-2 border-yellow-500", children=[
                     html.Div(className="card-body", children=[
-                        html.H5(project["name"], className="card-title text-xl font-semibold text-blue-600"),
-                        html.P(project["description"], className="card-text text-red-600"),
-                        html.P(f"Technologies: {', '.join(project['technologies'])}", className="card-text text-yellow-600"),
+                        html.H5(project.name, className="card-title text-xl font-semibold text-blue-600"),
+                        html.P(project.description, className="card-text text-red-600"),
+                        html.A("Details →", href=f"/projects/{project.slug}", className="inline-block mb-4 text-blue-600 hover:text-red-600"),
+                        html.P(f"Technologies: {', '.join(project.technologies)}", className="card-text text-yellow-600"),
                         html.A([
                             html.I(className="fas fa-link mr-2"),
                             "View Project"
-                        ], href=project["link"], className="btn btn-primary bg-blue-500 hover:bg-blue-600 text-white")
+                        ], href=project.link, className="btn btn-primary bg-blue-500 hover:bg-blue-600 text-white")
                     ])
-                ]) for project in projects
+                ]) for project in PROJECTS
             ])
         ])
 
     def skills_page(self):
-        skills = {
-            "Programming Languages": ["Python", "JavaScript", "Java"],
-            "Web Technologies": ["Dash", "Flask", "React"],
-            "Data Science": ["Pandas", "NumPy", "scikit-learn"]
-        }
+        skills = SKILLS
 
         return html.Div(className="p-4", children=[
             html.H2("My Skills", className="text-3xl font-bold mb-4 text-yellow-600"),
@@ -165,22 +215,27 @@ class PortfolioApp:
             html.Form(children=[
                 html.Div(className="form-control mb-4", children=[
                     html.Label("Name", className="label text-red-600"),
-                    dcc.Input(type="text", placeholder="Your Name", className="input input-bordered border-yellow-500") ]),
+                    dcc.Input(id='contact-name', type="text", placeholder="Your Name", className="input input-bordered border-yellow-500") ]),
                 html.Div(className="form-control mb-4", children=[
                     html.Label("Email", className="label text-red-600"),
-                    dcc.Input(type="email", placeholder="Your Email", className="input input-bordered border-yellow-500")
+                    dcc.Input(id='contact-email', type="email", placeholder="Your Email", className="input input-bordered border-yellow-500")
                 ]),
                 html.Div(className="form-control mb-4", children=[
                     html.Label("Message", className="label text-red-600"),
-                    dcc.Textarea(placeholder="Your Message", className="textarea textarea-bordered border-yellow-500")
+                    dcc.Textarea(id='contact-message', placeholder="Your Message", className="textarea textarea-bordered border-yellow-500")
                 ]),
+                html.P(id='contact-feedback', className="text-sm text-red-600 mb-4"),
+                # type="button" keeps the browser from submitting the form itself
                 html.Button([
                     html.I(className="fas fa-paper-plane mr-2"),
                     "Send Message"
-                ], className="btn btn-primary bg-blue-600 hover:bg-blue-700 text-white")
+                ], id='send-button', type="button", disabled=True, className="btn btn-primary bg-blue-600 hover:bg-blue-700 text-white"),
+                html.P(id='contact-status', className="mt-4 text-blue-600"),
+                dcc.Store(id='contact-submission')
             ])
         ])
 
+
 if __name__ == "__main__":
     app = PortfolioApp()
     app.app.run_server(debug=True)
@@ -1,8 +1,55 @@
+import os
+import sys
+
 import dash
 from dash import html, dcc
 from dash.dependencies import Input, Output
+from dataclasses import dataclass, field
+from typing import Dict, List
 import flask
 
+# Shared page helpers live in Imps/, next to the variants
+IMPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Imps')
+if IMPS not in sys.path:
+    sys.path.append(IMPS)
+
+from analytics import analytics_page  # noqa: E402
+from blog import blog_page  # noqa: E402
+from projects import DetailStyle, ProjectDetails, ProjectSlug  # noqa: E402
+from version import RouteConfig  # noqa: E402
+
+@dataclass
+class ProjectConfig(ProjectSlug):
+    name: str
+    description: str
+    technologies: List[str]
+    icon: str
+    # Shown only on the project's own page, /projects/<slug>
+    write_up: List[str] = field(default_factory=list)
+    links: Dict[str, str] = field(default_factory=dict)
+    gallery: List[str] = field(default_factory=list)
+
+PROJECTS = [
+    ProjectConfig(
+        name="AI Recommendation System",
+        description="Advanced machine learning platform",
+        technologies=["Python", "TensorFlow", "scikit-learn"],
+        icon="fas fa-robot"
+    ),
+    ProjectConfig(
+        name="Interactive Dashboard",
+        description="Real-time data visualization tool",
+        technologies=["Dash", "Plotly", "React"],
+        icon="fas fa-chart-line"
+    )
+]
+
+SKILLS = {
+    "Programming": ["Python", "JavaScript", "Java"],
+    "Frameworks": ["Dash", "React", "Django"],
+    "Tools": ["Git", "Docker", "Kubernetes"]
+}
+
 class PortfolioApp:
     def __init__(self, server=None):
         # If no server is provided, create a new Flask server
@@ -23,6 +70,30 @@ class PortfolioApp:
         )
 
         self.app.title = "Creative Portfolio"
+
+        # Every page route in one place: display_page, warm-up, the crawler
+        # cache and sitemap.xml all read it
+        self.routes = [
+            RouteConfig('/', self.home_page),
+            RouteConfig('/home', self.home_page, public=False),
+            RouteConfig('/projects', self.projects_page),
+            RouteConfig('/blog', blog_page),
+            RouteConfig('/skills', self.skills_page),
+            RouteConfig('/contact', self.contact_page),
+            RouteConfig('/analytics', analytics_page, public=False)
+        ]
+        self.page_routes = {route.path: route.page for route in self.routes}
+        # /projects/<slug> detail pages; each is rendered on its first visit
+        # rather than at start-up, and display_page routes to them
+        self.project_details = {project.slug: project for project in PROJECTS}
+        # Skills by category; the CV and the themed preview read them too
+        self.skills = SKILLS
+        self.project_route = ProjectDetails(self.project_details, DetailStyle(
+            back="text-sm text-blue-600 hover:text-red-600",
+            title="text-4xl font-bold mt-4 mb-4 text-blue-600",
+            tag="bg-yellow-100 text-red-600 px-3 py-1 rounded-full text-sm mr-2 mb-2",
+            link="px-6 py-3 bg-blue-600 text-white rounded-full hover:bg-red-600 transition duration-300"
+        )).route
         self.app.layout = self.create_layout()
         self.register_callbacks()
 
@@ -54,6 +125,10 @@ class PortfolioApp:
                             html.I(className="fas fa-project-diagram mr-3 text-blue-500"),
                             "Projects"
                         ], href="/projects", className="block py-2 px-4 hover:bg-yellow-100")),
+                        html.Li(html.A([
+                            html.I(className="fas fa-blog mr-3 text-blue-500"),
+                            "Blog"
+                        ], href="/blog", className="block py-2 px-4 hover:bg-yellow-100")),
                         html.Li(html.A([
                             html.I(className="fas fa-code mr-3 text-red-500"),
                             "Skills"
@@ -91,15 +166,9 @@ class PortfolioApp:
             [Input('url', 'pathname')]
         )
         def display_page(pathname):
-            if pathname == "/" or pathname == "/home":
-                return self.home_page()
-            elif pathname == "/projects":
-                return self.projects_page()
-            elif pathname == "/skills":
-                return self.skills_page()
-            elif pathname == "/contact":
-                return self.contact_page()
-            return self.home_page()
+            # project_route takes any pathname, including None before the URL is known
+            page = self.page_routes.get(pathname) or self.project_route(pathname)
+            return (page or self.home_page)()
 
     def home_page(self):
         return html.Div([
@@ -111,55 +180,37 @@ class PortfolioApp:
                 html.Div([
                     html.A("View Projects", href="/projects",
                            className="px-6 py-3 bg-blue-600 text-white rounded-full hover:bg-red-600 transition duration-300 mr-4"),
-                    html.A("Download CV", href="#",
+                    html.A("Download CV", href="/cv.pdf",
                            className="px-6 py-3 border-2 border-yellow-500 text-yellow-500 rounded-full hover:bg-yellow-500 hover:text-white transition duration-300")
                 ], className="flex items-center")
             ], className="container mx-auto px-4 py-20 text-center")
         ], className="bg-gray-50")
 
     def projects_page(self):
-        projects = [
-            {
-                "name": "AI Recommendation System",
-                "description": "Advanced machine learning platform",
-                "technologies": ["Python", "TensorFlow", "scikit-learn"],
-                "icon": "fas fa-robot"
-            },
-            {
-                "name": "Interactive Dashboard",
-                "description": "Real-time data visualization tool",
-                "technologies": ["Dash", "Plotly", "React"],
-                "icon": "fas fa-chart-line"
-            }
-        ]
-
         return html.Div([
             html.H2("Featured Projects",
                     className="text-4xl font-bold text-center mb-12 text-blue-600"),
             html.Div([
                 html.Div([
                     html.Div([
-                        html.I(className=f"{project['icon']} text-4xl mb-4 text-red-600"),
-                        html.H3(project["name"],
+                        html.I(className=f"{project.icon} text-4xl mb-4 text-red-600"),
+                        html.H3(project.name,
                                 className="text-2xl font-semibold mb-4 text-blue-600"),
-                        html.P(project["description"],
+                        html.P(project.description,
                                className="text-gray-700 mb-4"),
+                        html.A("Details →", href=f"/projects/{project.slug}", className="inline-block mb-4 text-blue-600 hover:text-red-600"),
                         html.Div([
                             html.Span(tech,
                                       className="bg-yellow-100 text-red-600 px-3 py-1 rounded-full mr-2 text-sm")
-                            for tech in project["technologies"]
+                            for tech in project.technologies
                         ])
                     ], className="p-6 bg-white rounded-lg shadow-md hover:shadow-xl transition duration-300")
-                ], className="mb-6") for project in projects
+                ], className="mb-6") for project in PROJECTS
             ], className="grid md:grid-cols-2 gap-6 container mx-auto")
         ], className="bg-gray-50 py-20")
 
     def skills_page(self):
-        skills = {
-            "Programming": ["Python", "JavaScript", "Java"],
-            "Frameworks": ["Dash", "React", "Django"],
-            "Tools": ["Git", "Docker", "Kubernetes"]
-        }
+        skills = SKILLS
 
         return html.Div([
             html.H2("Technical Skills",
@@ -182,6 +233,7 @@ class PortfolioApp:
                 html.Form([
                     html.Div([
                         dcc.Input(
+                            id='contact-name',
                             type="text",
                             placeholder="Your Name",
                             className="w-full px-4 py-2 border rounded-lg focus:outline-none focus:border-red-600"
@@ -189,6 +241,7 @@ class PortfolioApp:
                     ], className="mb-4"),
                     html.Div([
                         dcc.Input(
+                            id='contact-email',
                             type="email",
                             placeholder="Your Email",
                             className="w-full px-4 py-2 border rounded-lg focus:outline-none focus:border-red-600"
@@ -196,16 +249,22 @@ class PortfolioApp:
                     ], className="mb-4"),
                     html.Div([
                         dcc.Textarea(
+                            id='contact-message',
                             placeholder="Your Message",
                             className="w-full px-4 py-2 border rounded-lg focus:outline-none focus:border-red-600"
                         )
                     ], className="mb-4"),
-                    html.Button("Send Message",
-                                className="px-6 py-2 bg-blue-600 text-white rounded-lg hover:bg-red-600 transition duration-300")
+                    html.P(id='contact-feedback', className="text-sm text-red-600 mb-4"),
+                    # type="button" keeps the browser from submitting the form itself
+                    html.Button("Send Message", id='send-button', type="button", disabled=True,
+                                className="px-6 py-2 bg-blue-600 text-white rounded-lg hover:bg-red-600 transition duration-300"),
+                    html.P(id='contact-status', className="mt-4 text-blue-600"),
+                    dcc.Store(id='contact-submission')
                 ])
             ], className="bg-white p-6 rounded-lg shadow-md")
         ], className="bg-gray-50 py-20")
 
+
 if __name__ == "__main__":
     app = PortfolioApp()
     app.app.run_server(debug=True)
@@ -1,8 +1,58 @@
+import os
+import sys
+
 import dash
 from dash import html, dcc
 from dash.dependencies import Input, Output
+from dataclasses import dataclass, field
+from typing import Dict, List
 import flask
 
+# Shared page helpers live in Imps/, next to the variants
+IMPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Imps')
+if IMPS not in sys.path:
+    sys.path.append(IMPS)
+
+from analytics import analytics_page  # noqa: E402
+from blog import blog_page  # noqa: E402
+from projects import DetailStyle, ProjectDetails, ProjectSlug  # noqa: E402
+from version import RouteConfig  # noqa: E402
+
+@dataclass
+class ProjectConfig(ProjectSlug):
+    name: str
+    description: str
+    technologies: List[str]
+    icon: str
+    color: str
+    # Shown only on the project's own page, /projects/<slug>
+    write_up: List[str] = field(default_factory=list)
+    links: Dict[str, str] = field(default_factory=dict)
+    gallery: List[str] = field(default_factory=list)
+
+PROJECTS = [
+    ProjectConfig(
+        name="AI Visualization Engine",
+        description="Advanced data visualization with machine learning",
+        technologies=["Python", "TensorFlow", "D3.js"],
+        icon="fas fa-chart-pie",
+        color="from-red-500 to-yellow-400"
+    ),
+    ProjectConfig(
+        name="Interactive Dashboard",
+        description="Real-time data storytelling platform",
+        technologies=["Dash", "Plotly", "React"],
+        icon="fas fa-chart-line",
+        color="from-blue-500 to-red-400"
+    )
+]
+
+SKILLS = {
+    "Programming": ["Python", "JavaScript", "Rust"],
+    "Design": ["UI/UX", "Data Visualization", "Creative Coding"],
+    "Tools": ["Dash", "React", "Machine Learning"]
+}
+
 class PortfolioApp:
     def __init__(self, server=None):
         # If no server is provided, create a new Flask server
@@ -23,6 +73,30 @@ class PortfolioApp:
         )
 
         self.app.title = "Colorful Creative Portfolio"
+
+        # Every page route in one place: display_page, warm-up, the crawler
+        # cache and sitemap.xml all read it
+        self.routes = [
+            RouteConfig('/', self.home_page),
+            RouteConfig('/home', self.home_page, public=False),
+            RouteConfig('/projects', self.projects_page),
+            RouteConfig('/blog', blog_page),
+            RouteConfig('/skills', self.skills_page),
+            RouteConfig('/contact', self.contact_page),
+            RouteConfig('/analytics', analytics_page, public=False)
+        ]
+        self.page_routes = {route.path: route.page for route in self.routes}
+        # /projects/<slug> detail pages; each is rendered on its first visit
+        # rather than at start-up, and display_page routes to them
+        self.project_details = {project.slug: project for project in PROJECTS}
+        # Skills by category; the CV and the themed preview read them too
+        self.skills = SKILLS
+        self.project_route = ProjectDetails(self.project_details, DetailStyle(
+            back="text-sm text-red-600 hover:text-blue-500",
+            title="text-4xl font-bold mt-4 mb-4 text-red-600",
+            tag="bg-red-100 text-red-600 px-3 py-1 rounded-full text-sm mr-2 mb-2",
+            link="px-8 py-3 bg-red-500 text-white rounded-full hover:bg-blue-500 transition duration-300"
+        )).route
         self.app.layout = self.create_layout()
         self.register_callbacks()
 
@@ -40,6 +114,7 @@ class PortfolioApp:
                     html.Div([
                         html.A([html.I(className="fas fa-home mr-2"), "Home"], href="/", className="nav-link text-red-600 hover:text-blue-500"),
                         html.A([html.I(className="fas fa-project-diagram mr-2"), "Projects"], href="/projects", className="nav-link text-yellow-600 hover:text-red-500"),
+                        html.A([html.I(className="fas fa-blog mr-2"), "Blog"], href="/blog", className="nav-link text-yellow-600 hover:text-red-500"),
                         html.A([html.I(className="fas fa-code mr-2"), "Skills"], href="/skills", className="nav-link text-blue-600 hover:text-yellow-500"),
                         html.A([html.I(className="fas fa-envelope mr-2"), "Contact"], href="/contact", className="nav-link text-red-500 hover:text-blue-600")
                     ], className="flex space-x-6")
@@ -68,15 +143,9 @@ class PortfolioApp:
             [Input('url', 'pathname')]
         )
         def display_page(pathname):
-            if pathname == "/" or pathname == "/home":
-                return self.home_page()
-            elif pathname == "/projects":
-                return self.projects_page()
-            elif pathname == "/skills":
-                return self.skills_page()
-            elif pathname == "/contact":
-                return self.contact_page()
-            return self.home_page()
+            # project_route takes any pathname, including None before the URL is known
+            page = self.page_routes.get(pathname) or self.project_route(pathname)
+            return (page or self.home_page)()
 
     def home_page(self):
         return html.Div([
@@ -112,23 +181,6 @@ class PortfolioApp:
         ], className="bg-gradient-to-br from-red-50 via-yellow-50 to-blue-50")
 
     def projects_page(self):
-        projects = [
-            {
-                "name": "AI Visualization Engine",
-                "description": "Advanced data visualization with machine learning",
-                "technologies": ["Python", "TensorFlow", "D3.js"],
-                "icon": "fas fa-chart-pie",
-                "color": "from-red-500 to-yellow-400"
-            },
-            {
-                "name": "Interactive Dashboard",
-                "description": "Real-time data storytelling platform",
-                "technologies": ["Dash", "Plotly", "React"],
-                "icon": "fas fa-chart-line",
-                "color": "from-blue-500 to-red-400"
-            }
-        ]
-
         return html.Div([
             html.Div([
                 html.H2([
@@ -138,31 +190,28 @@ class PortfolioApp:
                 html.Div([
                     html.Div([
                         html.Div([
-                            html.I(className=f"{project['icon']} text-4xl mb-4",
-                                   style={"background": f"linear-gradient(to right, {project['color']})",
+                            html.I(className=f"{project.icon} text-4xl mb-4",
+                                   style={"background": f"linear-gradient(to right, {project.color})",
                                           "-webkit-background-clip": "text",
                                           "-webkit-text-fill-color": "transparent"}),
-                            html.H3(project["name"],
+                            html.H3(project.name,
                                     className="text-2xl font-semibold mb-4 text-gray-800"),
-                            html.P(project["description"],
+                            html.P(project.description,
                                    className="text-gray-600 mb-4"),
+                            html.A("Details →", href=f"/projects/{project.slug}", className="inline-block mb-4 text-red-600 hover:text-blue-500"),
                             html.Div([
                                 html.Span(tech,
                                           className="bg-red-100 text-red-600 px-3 py-1 rounded-full mr-2 text-sm")
-                                for tech in project["technologies"]
+                                for tech in project.technologies
                             ])
                         ], className="p-8 bg-white rounded-lg shadow-lg transform hover:scale-105 transition duration-300")
-                    ], className="mb-8") for project in projects
+                    ], className="mb-8") for project in PROJECTS
                 ])
             ], className="container mx-auto px-4 py-20")
         ], className="bg-gradient-to-br from-red-50 via-yellow-50 to-blue-50")
 
     def skills_page(self):
-        skills = {
-            "Programming": ["Python", "JavaScript", "Rust"],
-            "Design": ["UI/UX", "Data Visualization", "Creative Coding"],
-            "Tools": ["Dash", "React", "Machine Learning"]
-        }
+        skills = SKILLS
 
         return html.Div([
             html.Div([
@@ -195,22 +244,27 @@ class PortfolioApp:
                 html.Div([
                     html.Form([
                         html.Div([
-                            dcc.Input(id='name', type='text', placeholder='Your Name',
+                            dcc.Input(id='contact-name', type='text', placeholder='Your Name',
                             className='border border-gray-300 p-2 rounded w-full mb-4')
                         ]),
                         dcc.Input(
-                            id='email', type='email', placeholder='Your Email',
+                            id='contact-email', type='email', placeholder='Your Email',
                             className='border border-gray-300 p-2 rounded w-full mb-4'
                         ),
                         dcc.Textarea(
-                            id='message', placeholder='Your Message',
+                            id='contact-message', placeholder='Your Message',
                             className='border border-gray-300 p-2 rounded w-full mb-4',
                             rows=5
                         ),
+                        html.P(id='contact-feedback', className='text-sm text-red-600 mb-4'),
+                        # type='button' keeps the browser from submitting the form itself
                         html.Button([
                             html.I(className="fas fa-paper-plane mr-2"),
                             'Send Message'
-                        ], className='bg-gradient-to-r from-red-500 to-yellow-500 text-white px-4 py-2 rounded hover:bg-blue-500 transition duration-300')
+                        ], id='send-button', type='button', disabled=True,
+                           className='bg-gradient-to-r from-red-500 to-yellow-500 text-white px-4 py-2 rounded hover:bg-blue-500 transition duration-300'),
+                        html.P(id='contact-status', className='mt-4 text-blue-600'),
+                        dcc.Store(id='contact-submission')
                     ], className='flex flex-col max-w-md mx-auto')
                 ])
             ], className='container mx-auto px-4 py-20')
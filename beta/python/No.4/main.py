@@ -1,16 +1,170 @@
+import os
+import sys
+
 from flask import Flask
-from App import PortfolioApp  # Import your Dash app
+from werkzeug.serving import run_simple
+import App  # Import your Dash app
+
+# Shared server components live next to the template main.py in Imps/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Imps'))
+
+from access_log import AccessLog  # noqa: E402
+from analytics import PageViewRecorder, StatsAccess  # noqa: E402
+from assets import AssetManifest  # noqa: E402
+from blog import Blog, PostCache  # noqa: E402
+from compression import JSONCompressor  # noqa: E402
+from contact import ContactForm  # noqa: E402
+from cv import CVService, FORMATS as CV_FORMATS  # noqa: E402
+from feeds import FeedService  # noqa: E402
+from http_cache import ShellHTTPCache  # noqa: E402
+from mailer import MailDelivery  # noqa: E402
+from not_found import NotFoundGate  # noqa: E402
+from prerender import CrawlerPrerenderer  # noqa: E402
+from projects import ProjectPages  # noqa: E402
+from readiness import Readiness  # noqa: E402
+from reload import ContentReloader  # noqa: E402
+from route_payloads import RoutePayloads  # noqa: E402
+from shell import PrecompiledShell  # noqa: E402
+from sitemap import SitemapService  # noqa: E402
+from spam_filter import SpamFilter  # noqa: E402
+from tracing import Tracer  # noqa: E402
+from version import ContentVersion  # noqa: E402
+
+# Name of the variant directory, e.g. "No.1"
+VARIANT = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
+
+# Markdown blog posts, e.g. posts/2024-05-01-my-post.md
+POSTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'posts')
+
+# Components below outlive a content reload: their threads, pools, files and
+# counters are shared by every generation of the app built in create_app
+tracer = Tracer()
+access_log = AccessLog()
+compression = JSONCompressor()
+page_views = PageViewRecorder()
+spam_filter = SpamFilter()
+mail = MailDelivery()
+cv = CVService()
+post_cache = PostCache()
+
+# Rebuilds the app from App.py on SIGHUP, file changes or /_admin/reload
+reloader = ContentReloader(lambda module: create_app(module, wait=True), App.__file__, watch=[POSTS_DIR])
+
+
+def create_app(app_module, wait=False):
+    """Build the Dash app and wire every component to it.
+
+    Runs once at import, then again in the background for each content
+    reload; with ``wait`` the app is only returned once fully warmed up.
+    """
+    # Create a Flask server
+    server = Flask(__name__)
+
+    # PORTFOLIO_* environment variables become server.config entries, e.g.
+    # PORTFOLIO_MAIL_HOST -> MAIL_HOST
+    server.config.from_prefixed_env('PORTFOLIO')
+
+    # Create an instance of your Dash app
+    # Modify your PortfolioApp __init__ to accept server
+    portfolio_app = app_module.PortfolioApp(server)
+
+    # Sampled tracing spans; wraps the page methods before other components take them
+    tracer.init_app(portfolio_app)
+
+    # /analytics and /_stats/* need PORTFOLIO_STATS_TOKEN; checked before anything answers
+    stats_access = StatsAccess()
+    stats_access.init_app(portfolio_app)
+
+    # Vendored, content-hashed stylesheets and scripts with immutable caching
+    assets = AssetManifest()
+    assets.init_app(portfolio_app)
+
+    # /blog and /blog/<slug> from POSTS_DIR; only new or edited posts are parsed
+    blog = Blog(POSTS_DIR, post_cache)
+    blog.init_app(portfolio_app)
+
+    # /projects/<slug> detail pages, rendered on first request
+    project_pages = ProjectPages()
+    project_pages.init_app(portfolio_app)
+
+    # Hash of the visible content; caches below are keyed on it
+    content_version = ContentVersion()
+    content_version.init_app(portfolio_app)
+
+    # JSON-lines access log with a latency breakdown, written by a background thread
+    access_log.init_app(portfolio_app, variant=VARIANT)
+
+    # gzip/brotli for Dash's JSON responses; set up first so it runs last
+    compression.init_app(portfolio_app)
+
+    # Record page views off the request path
+    page_views.init_app(portfolio_app, variant=VARIANT)
+
+    # Contact form validated in the browser; valid messages are stored in SQLite
+    contact = ContactForm()
+    contact.init_app(portfolio_app, variant=VARIANT)
+
+    # Reject duplicate and flood messages before they are stored or mailed
+    spam_filter.init_app(portfolio_app, contact)
+
+    # Email stored messages to the owner from a background thread (PORTFOLIO_MAIL_*)
+    mail.init_app(portfolio_app, contact)
+
+    # Serve /cv.pdf and /cv.html, generated in a background process pool
+    cv.init_app(portfolio_app)
+
+    # Reject unknown page paths before Dash renders its shell for them
+    not_found = NotFoundGate()
+    not_found.init_app(portfolio_app)
+
+    # Serve crawlers prerendered HTML instead of the Dash shell
+    prerender = CrawlerPrerenderer()
+    prerender.init_app(portfolio_app)
+
+    # Version-derived ETags and Cache-Control for the shell, layout and dependencies
+    http_cache = ShellHTTPCache()
+    http_cache.init_app(portfolio_app, content_version)
+
+    # Serve the index shell from prebuilt, precompressed bytes
+    shell = PrecompiledShell()
+    shell.init_app(portfolio_app)
+
+    # Pages as versioned, immutable GET payloads fetched by a clientside router
+    route_payloads = RoutePayloads()
+    route_payloads.init_app(portfolio_app, content_version)
+
+    # /sitemap.xml and /robots.txt generated from portfolio_app.routes
+    sitemap = SitemapService()
+    sitemap.init_app(portfolio_app, content_version)
+
+    # /feed.xml and /atom.xml from the blog and projects, precompressed
+    feeds = FeedService()
+    feeds.init_app(portfolio_app, content_version)
+
+    # POST /_admin/reload (PORTFOLIO_RELOAD_TOKEN)
+    reloader.init_app(portfolio_app)
+
+    # /healthz and /readyz; readiness flips once every route and cache is warm
+    readiness = Readiness()
+    readiness.init_app(portfolio_app)
+    readiness.add_primer('cv', lambda: all(cv.ready(fmt) for fmt in CV_FORMATS))
+    readiness.add_primer('prerender', prerender.warm)
+    readiness.add_primer('route_payloads', route_payloads.warm)
+    readiness.start(wait=wait)
+    if wait and not readiness.ready:
+        raise RuntimeError('warm-up failed: ' + '; '.join(readiness.failures))
+    return portfolio_app
 
-# Create a Flask server
-server = Flask(__name__)
 
-# Create an instance of your Dash app
-# Modify your PortfolioApp __init__ to accept server
-portfolio_app = PortfolioApp(server)
+portfolio_app = create_app(App)
+reloader.start(portfolio_app)
+reloader.listen_for_sighup()
 
-# Expose the Dash app's server
-application = portfolio_app.app.server  # Use .server for WSGI compatibility
+# Expose the WSGI entry point (gunicorn main:server); it always serves the
+# newest generation, where portfolio_app.app.server is only the first one
+server = application = reloader
 
 if __name__ == '__main__':
-    # Run the Flask server in debug mode for local development
-    server.run(debug=True, host='0.0.0.0', port=8050)
+    # Serve the reloader for local development; its watcher already picks up
+    # App.py and post edits, so werkzeug's restarting reloader stays off
+    run_simple('0.0.0.0', 8050, application, use_debugger=True, use_reloader=False, threaded=True)
@@ -1,3 +1,6 @@
+import os
+import sys
+
 import dash
 from dash import html, dcc
 from dash.dependencies import Input, Output, State
@@ -5,13 +8,27 @@ from dataclasses import dataclass, field
 from typing import List, Dict
 import flask
 
+# Shared page helpers live in Imps/, next to the variants
+IMPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'Imps')
+if IMPS not in sys.path:
+    sys.path.append(IMPS)
+
+from analytics import analytics_page  # noqa: E402
+from blog import blog_page  # noqa: E402
+from projects import DetailStyle, ProjectDetails, ProjectSlug  # noqa: E402
+from version import RouteConfig  # noqa: E402
+
 @dataclass
-class ProjectConfig:
+class ProjectConfig(ProjectSlug):
     name: str
     description: str
     technologies: List[str]
     icon: str
     color_scheme: Dict[str, str]
+    # Shown only on the project's own page, /projects/<slug>
+    write_up: List[str] = field(default_factory=list)
+    links: Dict[str, str] = field(default_factory=dict)
+    gallery: List[str] = field(default_factory=list)
 
 @dataclass
 class ExperienceConfig:
@@ -133,6 +150,27 @@ class PortfolioApp:
         '''
 
         self.app.title = "Geometric Digital Portfolio"
+
+        # Every page route in one place: display_page, warm-up, the crawler
+        # cache and sitemap.xml all read it
+        self.routes = [
+            RouteConfig('/', self.home_page),
+            RouteConfig('/projects', self.projects_page),
+            RouteConfig('/blog', blog_page),
+            RouteConfig('/experience', self.experience_page),
+            RouteConfig('/contact', self.contact_page),
+            RouteConfig('/analytics', analytics_page, public=False)
+        ]
+        self.page_routes = {route.path: route.page for route in self.routes}
+        # /projects/<slug> detail pages; each is rendered on its first visit
+        # rather than at start-up, and display_page routes to them
+        self.project_details = {project.slug: project for project in self.config.projects}
+        self.project_route = ProjectDetails(self.project_details, DetailStyle(
+            back="text-sm text-blue-500 hover:text-blue-600",
+            title="text-4xl font-bold mt-4 mb-4 text-gray-800",
+            tag="text-sm text-gray-500 mr-3",
+            link="px-8 py-3 bg-blue-500 text-white rounded-lg hover:bg-blue-600 transition duration-300"
+        )).route
         self.app.layout = self._create_layout()
         self._register_callbacks()
 
@@ -159,6 +197,10 @@ class PortfolioApp:
                             html.I(className="fas fa-project-diagram mr-3"),
                             "Projects"
                         ], href="/projects", className="block py-3 px-4 hover:bg-gray-100 rounded-lg"),
+                        html.A([
+                            html.I(className="fas fa-blog mr-3"),
+                            "Blog"
+                        ], href="/blog", className="block py-3 px-4 hover:bg-gray-100 rounded-lg"),
                         html.A([
                             html.I(className="fas fa-briefcase mr-3"),
                             "Experience"
@@ -187,13 +229,9 @@ class PortfolioApp:
             [Input('url', 'pathname')]
         )
         def display_page(pathname):
-            page_routes = {
-                '/': self.home_page,
-                '/projects': self.projects_page,
-                '/experience': self.experience_page,
-                '/contact': self.contact_page
-            }
-            return page_routes.get(pathname, self.home_page)()
+            # project_route takes any pathname, including None before the URL is known
+            page = self.page_routes.get(pathname) or self.project_route(pathname)
+            return (page or self.home_page)()
 
     def home_page(self):
         return html.Div([
@@ -207,7 +245,7 @@ class PortfolioApp:
                 html.Div([
                     html.A("View Projects", href="/projects",
                            className="px-8 py-3 bg-blue-500 text-white rounded-lg hover:bg-blue-600 transition duration-300 mr-4"),
-                    html.A("Download CV", href="#",
+                    html.A("Download CV", href="/cv.pdf",
                            className="px-8 py-3 border-2 border-red-500 text-red-500 rounded-lg hover:bg-red-500 hover:text-white transition duration-300")
                 ], className="flex justify-center")
             ], className="max-w-2xl mx-auto text-center mt-24")
@@ -223,6 +261,7 @@ class PortfolioApp:
                         html.Div(className=f"shape-icon {project.color_scheme['primary']} mb-4"),
                         html.H3(project.name, className=f"text-2xl font-bold mb-2 {project.color_scheme['secondary']}"),
                         html.P(project.description, className="text-gray-600 mb-2"),
+                        html.A("Details →", href=f"/projects/{project.slug}", className="inline-block mb-4 text-blue-500 hover:text-blue-600"),
                         # Technologies
                         html.Div([
                             html.Span(", ".join(project.technologies), className="text-sm text-gray-500")
@@ -0,0 +1,100 @@
+import json
+import os
+import sys
+import timeit
+
+import pytest
+from dash import html
+from plotly.io.json import to_json_plotly
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+# ab_router.load_portfolio_app and the readiness helpers are reused from here
+sys.path.append(os.path.join(REPO_ROOT, 'beta', 'python', 'Imps'))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('portfolio baselines')
+    group.addoption('--update-baselines', action='store_true',
+                    help='rewrite tests/benchmarks/baselines.json from this run instead of comparing')
+    group.addoption('--time-tolerance', type=float, default=1.0,
+                    help='allowed latency regression over the baseline, as a fraction (default 1.0)')
+    group.addoption('--size-tolerance', type=float, default=0.05,
+                    help='allowed payload size growth over the baseline, as a fraction (default 0.05)')
+    group.addoption('--bench-rounds', type=int, default=100,
+                    help='timed rounds per benchmark (default 100)')
+
+
+def calibrate(rounds=1000):
+    """Best time of a fixed Dash build-and-serialize workload on this machine."""
+    def workload():
+        to_json_plotly(html.Div([html.Span(str(i), className='px-2 py-1 text-sm text-gray-600') for i in range(50)]))
+    return min(timeit.repeat(workload, number=1, repeat=rounds))
+
+
+class Baselines:
+    """Committed latencies and payload sizes per variant.
+
+    Latencies are stored in units of ``calibrate()`` measured in the same
+    session, so baselines recorded on one machine hold on a faster or slower
+    one. Sizes are bytes of the serialized JSON.
+    """
+
+    def __init__(self, values, update, time_tolerance, size_tolerance, unit_seconds):
+        self.values = values
+        self.update = update
+        self.time_tolerance = time_tolerance
+        self.size_tolerance = size_tolerance
+        self.unit_seconds = unit_seconds
+
+    def check_time(self, key, seconds):
+        if seconds is not None:
+            self._check(key, round(seconds / self.unit_seconds, 3), self.time_tolerance, 'units')
+
+    def check_size(self, key, size):
+        self._check(key, size, self.size_tolerance, 'bytes')
+
+    def _check(self, key, value, tolerance, unit):
+        if self.update:
+            self.values[key] = value
+            return
+        baseline = self.values.get(key)
+        if baseline is None:
+            pytest.fail(f'no baseline for {key}; run pytest tests/benchmarks --update-baselines')
+        limit = baseline * (1 + tolerance)
+        assert value <= limit, f'{key} regressed: {value} {unit} > {baseline} {unit} + {tolerance:.0%}'
+
+
+@pytest.fixture(scope='session')
+def baselines(request):
+    config = request.config
+    values = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding='utf-8') as handle:
+            values = json.load(handle)
+    result = Baselines(
+        values,
+        config.getoption('--update-baselines'),
+        config.getoption('--time-tolerance'),
+        config.getoption('--size-tolerance'),
+        calibrate()
+    )
+    yield result
+    if result.update:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as handle:
+            json.dump(result.values, handle, indent=2, sort_keys=True)
+            handle.write('\n')
+
+
+@pytest.fixture
+def bench(benchmark, request):
+    """Runs ``function`` for a fixed number of rounds and returns its best time."""
+    rounds = request.config.getoption('--bench-rounds')
+
+    def run(function, *args, **kwargs):
+        if benchmark.disabled:
+            return function(*args, **kwargs), None
+        result = benchmark.pedantic(function, args=args, kwargs=kwargs, rounds=rounds, warmup_rounds=2)
+        return result, benchmark.stats.stats.min
+    return run
@@ -0,0 +1,102 @@
+"""Latency and payload baselines for every PortfolioApp variant.
+
+    python -m pytest tests/benchmarks
+    python -m pytest tests/benchmarks --update-baselines
+"""
+import functools
+import os
+
+import pytest
+from dash.development.base_component import Component
+from plotly.io.json import to_json_plotly
+
+pytest.importorskip('pytest_benchmark')
+
+from ab_router import REPO_ROOT, load_portfolio_app  # noqa: E402
+from readiness import route_request_body, routing_callback  # noqa: E402
+
+VARIANTS = [(arm, f'No.{number}') for arm in ('beta', 'stable') for number in range(1, 8)]
+
+DASH_UPDATE_PATH = '/_dash-update-component'
+
+
+class Variant:
+    def __init__(self, arm, name):
+        self.key = f'{arm}/{name}'
+        path = os.path.join(REPO_ROOT, arm, 'python', name, 'App.py')
+        self.portfolio_app = load_portfolio_app(path, f'bench_{arm}_{name.replace(".", "_")}_App')
+        self.server = self.portfolio_app.app.server
+
+        create_layout = getattr(self.portfolio_app, '_create_layout', None)
+        self.create_layout = create_layout or self.portfolio_app.create_layout
+
+        page_routes = getattr(self.portfolio_app, 'page_routes', None)
+        if page_routes:
+            self.paths = list(page_routes)
+            pages = page_routes.values()
+        else:
+            # Stable variants route inline; find their pages and nav links instead
+            self.paths = ['/'] + sorted(_internal_links(self.create_layout()) - {'/'})
+            pages = [getattr(self.portfolio_app, attr) for attr in dir(self.portfolio_app) if attr.endswith('_page')]
+        self.pages = {page.__name__: page for page in pages}
+
+        self.client = self.server.test_client()
+        self.callback = routing_callback(self.client.get('/_dash-dependencies').get_json())
+
+
+@functools.lru_cache(maxsize=None)
+def load_variant(arm, name):
+    return Variant(arm, name)
+
+
+def _internal_links(node):
+    links = set()
+    if isinstance(node, (list, tuple)):
+        for child in node:
+            links |= _internal_links(child)
+    elif isinstance(node, Component):
+        href = getattr(node, 'href', None)
+        if isinstance(href, str) and href.startswith('/'):
+            links.add(href)
+        links |= _internal_links(getattr(node, 'children', None))
+    return links
+
+
+def _serialized_size(value):
+    return len(to_json_plotly(value).encode('utf-8'))
+
+
+def _cases(attribute):
+    cases = []
+    for arm, name in VARIANTS:
+        for item in getattr(load_variant(arm, name), attribute):
+            cases.append(pytest.param(arm, name, item, id=f'{arm}-{name}-{item}'))
+    return cases
+
+
+@pytest.mark.parametrize('arm,name', [pytest.param(*case, id='-'.join(case)) for case in VARIANTS])
+def test_create_layout(bench, baselines, arm, name):
+    variant = load_variant(arm, name)
+    layout, best = bench(variant.create_layout)
+    baselines.check_time(f'{variant.key}/layout', best)
+    baselines.check_size(f'{variant.key}/layout.bytes', _serialized_size(layout))
+
+
+@pytest.mark.parametrize('arm,name,page', _cases('pages'))
+def test_page_method(bench, baselines, arm, name, page):
+    variant = load_variant(arm, name)
+    with variant.server.test_request_context():
+        content, best = bench(variant.pages[page])
+    baselines.check_time(f'{variant.key}/page.{page}', best)
+    baselines.check_size(f'{variant.key}/page.{page}.bytes', _serialized_size(content))
+
+
+@pytest.mark.parametrize('arm,name,path', _cases('paths'))
+def test_display_page(bench, baselines, arm, name, path):
+    variant = load_variant(arm, name)
+    assert variant.callback is not None, 'no routing callback on url.pathname'
+    body = route_request_body(variant.callback, path)
+    response, best = bench(variant.client.post, DASH_UPDATE_PATH, json=body)
+    assert response.status_code == 200
+    baselines.check_time(f'{variant.key}/display_page{path}', best)
+    baselines.check_size(f'{variant.key}/display_page{path}.bytes', len(response.data))
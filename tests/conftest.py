@@ -0,0 +1,7 @@
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+# The shared server components are flat modules in beta/python/Imps
+sys.path.append(os.path.join(REPO_ROOT, 'beta', 'python', 'Imps'))
@@ -0,0 +1,77 @@
+import flask
+import pytest
+from werkzeug.test import Client
+
+from ab_router import ARM_COOKIE, VISITOR_COOKIE, ABRouter
+
+
+def _arm_app(name):
+    app = flask.Flask(name)
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def page(path):
+        return name
+
+    return app.wsgi_app
+
+
+@pytest.fixture
+def router():
+    return ABRouter(flask.Flask('fallback').wsgi_app, {'stable': _arm_app('stable'), 'beta': _arm_app('beta')},
+                    weights={'stable': 100, 'beta': 0})
+
+
+def test_visitor_keeps_the_assigned_arm(router):
+    client = Client(router)
+    first = client.get('/')
+    assert first.get_data(as_text=True) == 'stable'
+    assert client.get_cookie(VISITOR_COOKIE) is not None
+    for path in ('/_dash-layout', '/_dash-dependencies', '/projects'):
+        assert client.get(path).headers['X-Portfolio-Arm'] == 'stable'
+
+
+def test_assignment_is_deterministic_per_visitor():
+    router = ABRouter(None, {'stable': None, 'beta': None}, weights={'stable': 50, 'beta': 50})
+    visitors = [f'visitor-{number}' for number in range(2000)]
+    arms = [router.assign(visitor) for visitor in visitors]
+    assert arms == [router.assign(visitor) for visitor in visitors]
+    assert 0.45 < arms.count('beta') / len(arms) < 0.55
+
+
+def test_forced_arm_sticks_for_the_following_requests(router):
+    client = Client(router)
+    assert client.get('/?arm=beta').get_data(as_text=True) == 'beta'
+    assert client.get_cookie(ARM_COOKIE).value == 'beta'
+    # The shell's own layout and callback requests carry no ?arm=
+    for path in ('/_dash-layout', '/_dash-dependencies', '/_dash-update-component'):
+        assert client.get(path).headers['X-Portfolio-Arm'] == 'beta'
+
+
+def test_auto_clears_a_forced_arm(router):
+    client = Client(router)
+    client.get('/?arm=beta')
+    assert client.get('/?arm=auto').get_data(as_text=True) == 'stable'
+    assert client.get_cookie(ARM_COOKIE) is None
+    assert client.get('/_dash-layout').headers['X-Portfolio-Arm'] == 'stable'
+
+
+def test_unknown_arms_are_ignored(router):
+    client = Client(router)
+    assert client.get('/?arm=nightly').get_data(as_text=True) == 'stable'
+    assert client.get_cookie(ARM_COOKIE) is None
+    client.set_cookie(ARM_COOKIE, 'removed-arm')
+    assert client.get('/').get_data(as_text=True) == 'stable'
+    assert client.get_cookie(ARM_COOKIE) is None
+
+
+@pytest.mark.parametrize('weights, message', [
+    ({'stable': 0, 'beta': 0}, 'positive weight'),
+    ({'stable': 110, 'beta': -10}, 'negative: beta'),
+    ({'stable': 1, 'gamma': 1}, 'unknown arms: gamma'),
+])
+def test_rejects_weights_that_cannot_split_traffic(router, weights, message):
+    before = dict(router.weights)
+    with pytest.raises(ValueError, match=message):
+        router.set_weights(weights)
+    assert router.weights == before
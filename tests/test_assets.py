@@ -0,0 +1,35 @@
+import json
+import os
+
+from assets import MANIFEST_NAME, vendor
+
+
+def _source(tmp_path, name, content):
+    path = tmp_path / 'cdn' / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(content)
+    return path.as_uri()
+
+
+def test_stylesheet_references_are_vendored_and_rewritten(tmp_path):
+    font = _source(tmp_path, 'icons.woff2', b'font bytes')
+    css = _source(tmp_path, 'icons.css', b'@font-face { src: url("icons.woff2") }')
+
+    manifest = vendor([css], vendor_dir=str(tmp_path / 'vendor'))
+
+    assert set(manifest) == {css, font}
+    stylesheet = (tmp_path / 'vendor' / manifest[css]).read_text()
+    assert f'url("{manifest[font]}")' in stylesheet
+
+
+def test_each_run_rebuilds_the_manifest_from_the_requested_urls(tmp_path):
+    vendor_dir = tmp_path / 'vendor'
+    kept = _source(tmp_path, 'kept.js', b'kept()')
+    dropped = _source(tmp_path, 'dropped.js', b'dropped()')
+    first = vendor([kept, dropped], vendor_dir=str(vendor_dir))
+
+    second = vendor([kept], vendor_dir=str(vendor_dir))
+
+    assert second == {kept: first[kept]}
+    assert json.loads((vendor_dir / MANIFEST_NAME).read_text()) == second
+    assert sorted(os.listdir(vendor_dir)) == sorted([first[kept], MANIFEST_NAME])
@@ -0,0 +1,139 @@
+import contextlib
+import socket
+import sqlite3
+import time
+
+import pytest
+
+from contact import ContactForm, validate
+from mailer import CircuitBreaker, MailDelivery
+
+controller_module = pytest.importorskip('aiosmtpd.controller')
+
+
+class Inbox:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content.decode('utf-8', 'replace'))
+        return '250 OK'
+
+
+@pytest.fixture
+def smtp():
+    inbox = Inbox()
+    controller = controller_module.Controller(inbox, hostname='127.0.0.1', port=_free_port())
+    controller.start()
+    yield inbox, controller.port
+    controller.stop()
+
+
+@pytest.fixture
+def contact(tmp_path):
+    form = ContactForm(str(tmp_path / 'contact.sqlite3'))
+    form.variant = 'test'
+    return form
+
+
+def _free_port():
+    with contextlib.closing(socket.socket()) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _mail(contact, port, **options):
+    mail = MailDelivery(linger=0, base_backoff=0.01, **options)
+    mail.settings = {'host': '127.0.0.1', 'port': port, 'to': 'owner@example.com', 'from': 'site@example.com',
+                     'username': None, 'password': None, 'security': 'none'}
+    mail.db_path = contact.db_path
+    return mail
+
+
+def _pending(mail):
+    with contextlib.closing(mail._connect()) as conn:
+        return len(conn.execute('SELECT * FROM messages WHERE id NOT IN '
+                                '(SELECT message_id FROM deliveries WHERE sent_at IS NOT NULL) '
+                                'AND id NOT IN (SELECT message_id FROM undeliverable)').fetchall())
+
+
+def test_sends_each_message_once(smtp, contact):
+    inbox, port = smtp
+    mail = _mail(contact, port)
+    contact.store('Ada', 'ada@example.com', 'Hello there, first message')
+    contact.store('Bob', 'bob@example.com', 'Hello there, second message')
+
+    assert mail.deliver() == 2
+    assert mail.deliver() == 0
+    assert len(inbox.messages) == 2
+    assert 'Reply-To: Ada <ada@example.com>' in inbox.messages[0]
+    mail.close()
+
+
+def test_batches_at_threshold_become_one_digest(smtp, contact):
+    inbox, port = smtp
+    mail = _mail(contact, port, digest_threshold=3)
+    for number in range(4):
+        contact.store(f'Sender {number}', f's{number}@example.com', f'Message number {number} here')
+
+    assert mail.deliver() == 4
+    assert len(inbox.messages) == 1
+    assert mail.digests == 1
+    assert all(f'Message number {number}' in inbox.messages[0] for number in range(4))
+    mail.close()
+
+
+def test_unparseable_address_is_set_aside_not_retried(smtp, contact):
+    inbox, port = smtp
+    mail = _mail(contact, port, lease=0.0)
+    # Stored directly: the form itself now rejects this address
+    assert validate('Eve', 'a@[b.c', 'A message that cannot be mailed')
+    contact.store('Eve', 'a@[b.c', 'A message that cannot be mailed')
+    contact.store('Ada', 'ada@example.com', 'A message queued behind it')
+
+    assert mail.deliver() == 2
+    assert mail.undeliverable == 1
+    assert len(inbox.messages) == 1 and 'ada@example.com' in inbox.messages[0]
+    # An expired lease does not bring the bad row back
+    assert mail.deliver() == 0
+    assert _pending(mail) == 0
+    mail.close()
+
+
+def test_failed_send_is_released_and_backs_off(contact):
+    mail = _mail(contact, _free_port(), breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    contact.store('Ada', 'ada@example.com', 'Nobody is listening yet')
+
+    assert mail.deliver() == 0
+    assert mail.failures == 1 and mail._retry_at > time.monotonic() - 1
+    assert _pending(mail) == 1
+    time.sleep(0.02)
+    mail.deliver()
+    assert mail.breaker.state == CircuitBreaker.OPEN
+    # An open circuit does not even claim
+    assert mail.deliver() == 0 and mail.failures == 2
+
+
+def test_released_message_waits_out_the_backoff_in_every_worker(contact):
+    failing = _mail(contact, _free_port())
+    failing.base_backoff = 60
+    other = _mail(contact, _free_port())
+    contact.store('Ada', 'ada@example.com', 'Nobody is listening yet')
+
+    assert failing.deliver() == 0 and failing.failures == 1
+    # Another process sharing the database does not retry straight away
+    assert other._claim() == []
+    with contextlib.closing(other._connect()) as conn:
+        conn.execute('UPDATE deliveries SET retry_at = ?', (time.time() - 1,))
+    assert len(other._claim()) == 1
+
+
+def test_adds_retry_at_to_an_older_database(contact):
+    with contextlib.closing(sqlite3.connect(contact.db_path)) as conn, conn:
+        conn.execute('DROP TABLE IF EXISTS deliveries')
+        conn.execute('CREATE TABLE deliveries (message_id INTEGER PRIMARY KEY, attempts INTEGER NOT NULL, '
+                     'claimed_at REAL NOT NULL, sent_at REAL)')
+    contact.store('Ada', 'ada@example.com', 'Stored before the upgrade')
+
+    mail = _mail(contact, _free_port())
+    assert len(mail._claim()) == 1
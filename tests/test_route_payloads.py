@@ -0,0 +1,56 @@
+import dash
+import flask
+import pytest
+from dash import dcc, html
+from dash.dependencies import Input, Output
+from werkzeug.test import Client
+
+from analytics import PageViewRecorder
+from route_payloads import VIEWS_PATH, RoutePayloads
+from version import ContentVersion, RouteConfig
+
+
+class Site:
+    def __init__(self):
+        self.app = dash.Dash(__name__, server=flask.Flask(__name__))
+        self.routes = [RouteConfig('/', lambda: html.Div('home')), RouteConfig('/skills', lambda: html.Div('skills'))]
+        self.page_routes = {route.path: route.page for route in self.routes}
+        self.app.layout = html.Div([dcc.Location(id='url', refresh=False), html.Div(id='page-content')])
+
+        @self.app.callback(Output('page-content', 'children'), Input('url', 'pathname'))
+        def display_page(pathname):
+            return self.page_routes.get(pathname, self.page_routes['/'])()
+
+
+@pytest.fixture
+def site(tmp_path):
+    site = Site()
+    version = ContentVersion(str(tmp_path / 'versions'))
+    version.init_app(site)
+    site.page_views = PageViewRecorder(str(tmp_path / 'analytics.sqlite3'), flush_interval=60)
+    site.page_views.init_app(site, variant='test')
+    site.payloads = RoutePayloads()
+    site.payloads.init_app(site, version)
+    return site
+
+
+def _routes(site):
+    return [view.route for view in site.page_views._buffer if view.source == 'location']
+
+
+def test_payloads_are_cached_and_navigation_is_counted_by_beacon(site):
+    client = Client(site.app.server)
+    payload = client.get(f'/_routes/{site.app.server.extensions["content_version"].hash}/skills.json')
+    assert payload.status_code == 200 and 'immutable' in payload.headers['Cache-Control']
+    assert _routes(site) == []
+
+    beacon = client.post(VIEWS_PATH, data='/skills')
+    assert beacon.status_code == 204 and beacon.headers['Cache-Control'] == 'no-store'
+    assert _routes(site) == ['/skills']
+
+
+def test_beacon_ignores_paths_the_site_does_not_have(site):
+    client = Client(site.app.server)
+    client.post(VIEWS_PATH, data='/no-such-page')
+    client.post(VIEWS_PATH, data='/' + 'x' * 1000)
+    assert _routes(site) == []
@@ -0,0 +1,13 @@
+from shell import minify_html
+
+
+def test_collapses_whitespace_between_tags_around_scripts():
+    document = '<html>\n  <body>\n    <div>Hi</div>\n    <script src="a.js"></script>\n  </body>\n</html>\n'
+
+    assert minify_html(document) == '<html><body><div>Hi</div><script src="a.js"></script></body></html>'
+
+
+def test_leaves_script_bodies_alone():
+    script = '<script>\nvar markup = "<b>  </b>";\nvar next = 1\n</script>'
+
+    assert minify_html(f'<body>\n  {script}\n</body>') == f'<body>{script}</body>'
@@ -0,0 +1,84 @@
+import pytest
+
+from spam_filter import BANDS, DUPLICATE, FLOOD, BloomFilter, CountMinSketch, SpamFilter, band_keys, normalize
+
+MESSAGE = 'Hello, I would like to talk about a freelance project for our new analytics dashboard next month.'
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000)
+    items = [f'message {number}'.encode('utf-8') for number in range(1000)]
+    assert not any(bloom.add(item) for item in items)
+    assert all(item in bloom for item in items)
+    assert all(bloom.add(item) for item in items)
+
+
+def test_bloom_filter_false_positive_rate_is_near_its_target():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    for number in range(1000):
+        bloom.add(b'seen %d' % number)
+    false_positives = sum(b'unseen %d' % number in bloom for number in range(10000))
+    assert false_positives < 300
+
+
+def test_bloom_filter_clear_forgets_everything():
+    bloom = BloomFilter(10)
+    bloom.add(b'x')
+    bloom.clear()
+    assert b'x' not in bloom
+
+
+def test_count_min_sketch_never_undercounts():
+    sketch = CountMinSketch(width=64, depth=4)
+    for number in range(200):
+        for _ in range(number % 5):
+            sketch.add(b'key %d' % number)
+    assert all(sketch.estimate(b'key %d' % number) >= number % 5 for number in range(200))
+
+
+def test_near_duplicates_share_a_band():
+    edited = MESSAGE.replace('next month', 'next week')
+    assert len(band_keys(normalize(MESSAGE))) == BANDS
+    assert set(band_keys(normalize(MESSAGE))) & set(band_keys(normalize(edited)))
+
+
+def test_unrelated_messages_share_no_band():
+    other = 'Your invoice for the hosting plan is attached; payment is due within thirty days of receipt.'
+    assert not set(band_keys(normalize(MESSAGE))) & set(band_keys(normalize(other)))
+
+
+def test_normalization_collapses_case_and_punctuation():
+    assert band_keys(normalize(MESSAGE)) == band_keys(normalize(MESSAGE.upper().replace(',', ' ,  ')))
+
+
+def test_exact_repeat_is_a_duplicate():
+    spam = SpamFilter(capacity=100)
+    assert spam.check('A', 'a@example.com', MESSAGE) is None
+    assert spam.check('B', 'b@example.com', MESSAGE.upper()) == DUPLICATE
+    assert spam.rejected['duplicate'] == 1
+
+
+@pytest.mark.parametrize('limit', ['max_per_sender', 'max_near_duplicates'])
+def test_flood_rejections_are_not_remembered(limit):
+    spam = SpamFilter(capacity=100, **{limit: 1})
+    assert spam.check('A', 'a@example.com', MESSAGE) is None
+    if limit == 'max_per_sender':
+        rejected = ('A', 'a@example.com', 'Something else entirely about a different topic and budget.')
+    else:
+        rejected = ('A', 'c@example.com', MESSAGE.replace('next month', 'next week'))
+    assert spam.check(*rejected) == FLOOD
+    # Resent from another address it is judged afresh, not as a duplicate
+    retry = ('B', 'b@example.com', rejected[2])
+    assert spam.check(*retry) == (None if limit == 'max_per_sender' else FLOOD)
+    assert spam.rejected['duplicate'] == 0
+
+
+def test_rotation_forgets_after_two_windows(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('spam_filter.time.monotonic', lambda: clock[0])
+    spam = SpamFilter(window=10, capacity=100)
+    assert spam.check('A', 'a@example.com', MESSAGE) is None
+    clock[0] += 15
+    assert spam.check('A', 'a@example.com', MESSAGE) == DUPLICATE
+    clock[0] += 25
+    assert spam.check('A', 'a@example.com', MESSAGE) is None
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+from dash import html
+
+from contact import SUBMISSION_ID, SUBMIT_ID, ContactForm
+from themes import THEMES, CompiledTemplate, Content, Fragment, ThemedPortfolioApp, ThemeEngine, fragment_list, slot
+
+CONTENT = Content(
+    name='Ada "Countess" Lovelace',
+    tagline='Analytical engines & </script> poetry',
+    projects=[{'name': 'Engine', 'description': 'Notes on the <engine>', 'technologies': ['Punch cards'],
+               'icon': 'fas fa-cog'}],
+    skills={'Maths': ['Bernoulli numbers']}
+)
+
+
+def test_bind_encodes_whole_values_as_json():
+    template = CompiledTemplate(html.H1(slot('title')))
+    bound = json.loads(template.bind(title=CONTENT.name))
+    assert bound['props']['children'] == CONTENT.name
+
+
+def test_bind_splices_inline_slots_into_strings():
+    template = CompiledTemplate(html.I(className=f"{slot('icon')} text-4xl"))
+    bound = json.loads(template.bind(icon='fas "odd" \\ icon'))
+    assert bound['props']['className'] == 'fas "odd" \\ icon text-4xl'
+
+
+def test_bind_inserts_fragments_verbatim():
+    item = CompiledTemplate(html.Li(slot('text')))
+    template = CompiledTemplate(html.Ul(slot('items')))
+    bound = template.bind(items=fragment_list(item.bind(text=text) for text in ('a', 'b')))
+    assert isinstance(bound, Fragment)
+    assert [child['props']['children'] for child in json.loads(bound)['props']['children']] == ['a', 'b']
+
+
+def test_bound_template_matches_the_dash_serialization():
+    template = CompiledTemplate(html.Div([html.H3(slot('name')), html.P(slot('text'))], className=f"card {slot('tone')}"))
+    expected = html.Div([html.H3('Engine'), html.P('x < y')], className='card dark')
+    assert json.loads(template.bind(name='Engine', text='x < y', tone='dark')) == json.loads(
+        CompiledTemplate(expected).bind())
+
+
+def test_render_memo_is_bounded_by_themes_and_routes():
+    engine = ThemeEngine(CONTENT)
+    for number in range(500):
+        engine.render('minimal', f'/junk/{number}')
+    for theme in THEMES:
+        for path, _, _, _ in engine.routes:
+            engine.render(theme, path)
+    assert len(engine._rendered) == len(THEMES) * len(engine.routes)
+    assert engine.render('minimal', '/junk/1') is engine.render('minimal', '/')
+
+
+@pytest.mark.parametrize('theme', sorted(THEMES))
+def test_every_theme_renders_the_skills_route(theme):
+    engine = ThemeEngine(CONTENT)
+    assert 'Bernoulli numbers' in json.dumps(engine.render(theme, '/skills'))
+
+
+def test_contact_form_is_wired_to_contact_form(tmp_path):
+    themed = ThemedPortfolioApp(CONTENT)
+    contact = ContactForm(str(tmp_path / 'contact.sqlite3'))
+    contact.init_app(themed, variant='themes')
+    assert contact.enabled
+    with themed.app.server.test_request_context('/contact'):
+        page = json.dumps(themed.page_routes['/contact']())
+    assert f'"{SUBMIT_ID}"' in page and f'"{SUBMISSION_ID}"' in page
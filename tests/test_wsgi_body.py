@@ -0,0 +1,34 @@
+import pytest
+
+from wsgi_body import ClosingBody
+
+
+class Body(list):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_reports_the_bytes_sent_once_closed():
+    reported = []
+    inner = Body([b'abc', b'de'])
+    body = ClosingBody(inner, reported.append)
+
+    assert b''.join(body) == b'abcde'
+    assert reported == []
+    body.close()
+    assert inner.closed and reported == [5]
+
+
+def test_reports_even_when_the_inner_close_fails():
+    class Failing(Body):
+        def close(self):
+            raise OSError('client went away')
+
+    reported = []
+    body = ClosingBody(Failing([b'abc']), reported.append)
+    next(iter(body))
+    with pytest.raises(OSError):
+        body.close()
+    assert reported == [3]